@@ -10,24 +10,41 @@ salesforce_scraper_gui_v2.py
 
 from __future__ import annotations
 
+import abc
+import asyncio
 import concurrent.futures as _fut
 import contextlib
 import csv
+import hashlib
 import json
+import math
+import mmap
+import multiprocessing
 import pathlib
 import queue
 import random
 import re
+import socket
+import sqlite3
+import struct
 import threading
 import time
 import tkinter as tk
 import traceback
 import unicodedata
+import xml.etree.ElementTree as ET
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 from tkinter import messagebox  # même en CTk on garde pour le modal natif
 from tkinter import filedialog
 from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:  # mémoire de Chrome pour le superviseur (facultatif)
+    import psutil
+except ImportError:
+    psutil = None
 
 import customtkinter as ctk
 import pandas as pd
@@ -36,10 +53,12 @@ import requests
 import undetected_chromedriver as uc
 from selenium.common.exceptions import (ElementClickInterceptedException,
                                         ElementNotInteractableException,
+                                        InvalidSessionIdException,
                                         NoSuchElementException,
                                         NoSuchWindowException,
                                         StaleElementReferenceException,
-                                        TimeoutException)
+                                        TimeoutException,
+                                        WebDriverException)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
@@ -92,7 +111,12 @@ def _clean_acc(acc: str):
     return re.sub(r"\D", "", acc.strip())
 
 
+HEADLESS = False  # True sous cli_main : pas d'explorateur de fichiers
+
+
 def open_folder(p: Path):
+    if HEADLESS:
+        return
     try:
         if sys.platform.startswith("win"):
             os.startfile(p)
@@ -108,7 +132,93 @@ DEFAULT_CFG = {
     "max_parallel_tabs": 5,
     "mfa_timeout_sec": 60,
     "overpass_timeout": 120,
+    "overpass_endpoints": [  # miroirs essayés dans l'ordre en cas d'échec
+        "https://overpass-api.de/api/interpreter",
+        "https://overpass.kumi.systems/api/interpreter",
+        "https://overpass.private.coffee/api/interpreter",
+    ],
+    "overpass_retries": 3,  # tours complets des miroirs
+    "overpass_backoff_sec": 2,  # attente de base entre deux tours (× 2 à chaque tour)
     "selenium_headless": False,
+    "metrics_format": "json",  # json | prom | both | off
+    "metrics_window_sec": 300,
+    "webdriver_trace": False,
+    "profile_run": "off",  # off | cprofile | tracemalloc | both
+    "page_load_strategy": {"sf": "eager", "clic": "eager", "csr": "eager"},  # par site
+    "light_profile": {"sf": True, "clic": True, "csr": True},  # blocage par site
+    "blocked_url_patterns": [  # Network.setBlockedURLs (joker *)
+        "*.png",
+        "*.jpg",
+        "*.jpeg",
+        "*.gif",
+        "*.webp",
+        "*.svg",
+        "*.ico",
+        "*.woff",
+        "*.woff2",
+        "*.ttf",
+        "*.otf",
+        "*.mp4",
+        "*.webm",
+        "*.mp3",
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+    ],
+    "driver_recycle_pages": 50,  # Chrome neuf toutes les N pages (0 = jamais)
+    "driver_max_rss_mb": 2500,  # au-delà : recyclage (0 = pas de limite)
+    "driver_stall_sec": 180,  # sans progrès : Chrome tué puis relancé (0 = off)
+    "driver_max_failures": 3,  # erreurs de suite avant d'abandonner le run
+    "prewarm_driver": True,  # Chrome lancé dès l'ouverture de la GUI
+    "chromedriver_cache": True,  # chromedriver patché gardé dans data/
+    "job_backend": "thread",  # thread | process | service (cf. `serve`)
+    "service_port": 8765,
+    "service_workers": 1,
+    "work_lease_sec": 300,  # bail d'une unité de la file partagée
+    "work_max_attempts": 3,
+    "sf_nav_mode": "fast",  # fast (grandes pages + saut direct) | click
+    "sf_page_size": 200,
+    "detail_workers": 0,  # voies « fiche » parallèles (0 = séquentiel)
+    "account_backends": ["clic", "csr"],  # ordre de préférence du routage
+    "account_lanes": 1,  # Chrome simultanés pour les numéros, tous backends
+    "clic_max_digits": 8,  # comptes servis par Clic+
+    "csr_min_digits": 7,  # CSR cherche sur les 7 derniers chiffres
+    "link_queue_size": 200,
+    "sf_fetch_mode": "ui",  # ui | api (requête groupée sur la session)
+    "sf_api_base": None,  # None → racine du site de login
+    "sf_api_version": "58.0",
+    "sf_api_batch_size": 2000,
+    "street_fetch_workers": 2,  # requêtes Overpass simultanées (GUI)
+    "street_prefetch": 5,  # villes habituelles préchargées à l'ouverture
+    "city_snapshot": "qc_snapshot.bin",  # villes + rues (relatif à data/) ; "" = aucun
+    "rta_index": "rta_index.json",  # RTA postale → villes + rues ; "" = aucun
+    "rta_index_min_coverage": 0.9,  # sinon recherche ville + RTA (rues sans adresse)
+    "shard_sessions": 1,  # > 1 : ville sans rue découpée en recherches par rue
+    "row_filters": [  # lignes écartées sans ouvrir la fiche
+        # liste = 1re colonne non vide : Compte client seulement sans Client
+        {"column": ["Client", "Compte client"], "contains": "fizz"},
+    ],
+    "door_fields": [  # projection des fiches portes (= colonnes des exports)
+        "Résidence",
+        "Client",
+        "Compte client",
+        "Services actuels",
+        "Dernier statut",
+        "Services avant débranchement",
+    ],
+    "door_store": "doors.sqlite3",  # registre des portes (relatif à data/) ; "" = aucun
+    "door_store_fresh_hours": 24,  # fiche relue si plus vieille (0 = toujours)
+    "row_signatures": True,  # ligne de liste inchangée → fiche reprise
+    "signature_columns": [],  # [] = toutes les colonnes visibles
+    "list_only": False,  # fiches construites depuis les colonnes de la liste
+    "list_fields": [
+        "Résidence",
+        "Client",
+        "Compte client",
+        "Services actuels",
+        "Dernier statut",
+        "Services avant débranchement",
+    ],
+    "list_column_map": {},  # {"libellé colonne": "champ fiche"}
 }
 CFG = (
     {**DEFAULT_CFG, **json.loads(CONFIG_PATH.read_text())}
@@ -117,7 +227,6 @@ CFG = (
 )
 CONFIG_PATH.write_text(json.dumps(CFG, indent=2))
 
-OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 HEADERS = {"User-Agent": "QC-Scraper/1.0"}
 
 
@@ -174,68 +283,883 @@ def fetch_or_load_cities(path: Path) -> dict[str, int]:
     return mapping
 
 
+# ── Instantané compact villes + rues (mmap) ─────────────────────────────
+CITY_SNAPSHOT = DATA_DIR / (CFG["city_snapshot"] or "qc_snapshot.bin")
+
+
+class CitySnapshot:
+    """
+    Fichier binaire versionné de toutes les villes (id de relation OSM) et
+    de leurs rues, lu par mmap : aucun JSON à parser à l'ouverture, les
+    noms ne sont décodés qu'à la demande. Disposition (little-endian) :
+
+        en-tête   magic, format, data_version, built (epoch), synced
+                  (epoch), nb villes, nb chaînes, nb références
+        offsets   u32 × (nb chaînes + 1) dans la table de chaînes
+        villes    (nom, relation, 1re réf., nb réfs, flags) u32 × 5, triées
+        réfs      u32 : index de chaîne des rues, triées par ville
+        chaînes   UTF-8 concaténées, dédoublonnées
+
+    flags & 1 : liste de rues connue (0 = jamais récupérée). Une mise à
+    jour (`updated`) réécrit le fichier avec les villes modifiées et
+    incrémente data_version. `synced` est le repère de synchronisation
+    Overpass : les ways modifiés depuis cet instant sont ceux que
+    `snapshot --refresh` doit rattraper (0 = aucune synchro encore).
+    """
+
+    MAGIC = b"HOTBOTSN"
+    FORMAT = 2
+    _HEAD = struct.Struct("<8sIIddIII")
+    _CITY = struct.Struct("<IIIII")
+    REPLACE_TRIES = 10
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        head = self._HEAD.unpack_from(self._mm, 0)
+        magic, fmt, self.data_version, self.built, self.synced, nc, ns, nr = head
+        if magic != self.MAGIC or fmt != self.FORMAT:
+            self._mm.close()
+            raise ValueError(f"{self.path.name} : format d'instantané inconnu")
+        mv = memoryview(self._mm)
+        pos = self._HEAD.size
+        self._offs = mv[pos : pos + 4 * (ns + 1)].cast("I")
+        pos += 4 * (ns + 1)
+        self._cities = mv[pos : pos + self._CITY.size * nc].cast("I")
+        pos += self._CITY.size * nc
+        self._refs = mv[pos : pos + 4 * nr].cast("I")
+        self._blob = pos + 4 * nr
+        self._index: Optional[dict[str, int]] = None
+
+    @classmethod
+    def load(cls, path: Path = CITY_SNAPSHOT) -> Optional["CitySnapshot"]:
+        """L'instantané s'il existe et est lisible, sinon None."""
+        if not CFG["city_snapshot"]:
+            return None
+        try:
+            return cls(path)
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def close(self):
+        for view in (self._offs, self._cities, self._refs):
+            view.release()
+        self._mm.close()
+
+    # ---------- lecture -------------------------------------------------
+    def _str(self, i: int) -> str:
+        a, b = self._offs[i], self._offs[i + 1]
+        return self._mm[self._blob + a : self._blob + b].decode("utf-8")
+
+    def _city(self, k: int) -> tuple[int, int, int, int, int]:
+        return tuple(self._cities[5 * k : 5 * k + 5])
+
+    def __len__(self) -> int:
+        return len(self._cities) // 5
+
+    def city_map(self) -> dict[str, int]:
+        """{ville → relation}, dans l'ordre alphabétique."""
+        out = {}
+        for k in range(len(self)):
+            name, rel, *_ = self._city(k)
+            out[self._str(name)] = rel
+        self._index = {c: k for k, c in enumerate(out)}
+        return out
+
+    def streets(self, city: str) -> Optional[List[str]]:
+        """Rues de `city`, ou None si la liste n'a jamais été récupérée."""
+        if self._index is None:
+            self.city_map()
+        k = self._index.get(city)
+        if k is None:
+            return None
+        _, _, first, count, flags = self._city(k)
+        if not flags & 1:
+            return None
+        return [self._str(i) for i in self._refs[first : first + count]]
+
+    # ---------- écriture ------------------------------------------------
+    @classmethod
+    def write(
+        cls,
+        path: Path,
+        cities: dict[str, int],
+        streets: dict[str, List[str]],
+        data_version: int = 1,
+        synced: float = 0.0,
+    ) -> Path:
+        """Écrit l'instantané (fichier temporaire puis remplacement atomique)."""
+        strings: dict[str, int] = {}
+
+        def sid(s: str) -> int:
+            return strings.setdefault(s, len(strings))
+
+        recs, refs = [], []
+        for city in sorted(cities):
+            sts = streets.get(city)
+            first = len(refs)
+            refs.extend(sid(s) for s in sorted(sts or ()))
+            flags = 1 if sts is not None else 0
+            recs.append((sid(city), cities[city], first, len(refs) - first, flags))
+
+        blob = bytearray()
+        offs = [0]
+        for s in strings:
+            blob += s.encode("utf-8")
+            offs.append(len(blob))
+        head = cls._HEAD.pack(
+            cls.MAGIC,
+            cls.FORMAT,
+            data_version,
+            time.time(),
+            synced,
+            len(recs),
+            len(strings),
+            len(refs),
+        )
+        tmp = Path(path).with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(head)
+            f.write(struct.pack(f"<{len(offs)}I", *offs))
+            for r in recs:
+                f.write(cls._CITY.pack(*r))
+            f.write(struct.pack(f"<{len(refs)}I", *refs))
+            f.write(blob)
+        # Windows : un lecteur qui a le fichier mappé (autre thread, CLI,
+        # processus de job) bloque le remplacement ; les lectures sont brèves
+        for attempt in range(cls.REPLACE_TRIES):
+            try:
+                os.replace(tmp, path)
+                return Path(path)
+            except PermissionError:
+                if attempt == cls.REPLACE_TRIES - 1:
+                    with contextlib.suppress(OSError):
+                        tmp.unlink()
+                    raise
+                time.sleep(0.2)
+
+    def updated(
+        self,
+        streets: dict[str, List[str]],
+        cities: Optional[dict[str, int]] = None,
+        synced: Optional[float] = None,
+    ) -> "CitySnapshot":
+        """
+        Nouvel instantané avec les rues (et villes) données remplacées ; les
+        autres villes sont recopiées telles quelles. `synced` remplace le
+        repère de synchronisation s'il est donné. Ferme celui-ci.
+        """
+        all_cities = self.city_map()
+        all_streets = {c: self.streets(c) for c in all_cities}
+        all_streets = {c: s for c, s in all_streets.items() if s is not None}
+        all_cities.update(cities or {})
+        all_streets.update(streets)
+        version = self.data_version + 1
+        synced = self.synced if synced is None else synced
+        self.close()  # Windows : pas de remplacement d'un fichier mappé
+        try:
+            self.write(self.path, all_cities, all_streets, version, synced)
+        except OSError:
+            self.__init__(self.path)  # ancien fichier intact : reste lisible
+            raise
+        return CitySnapshot(self.path)
+
+    @classmethod
+    def record(cls, city2rel: dict[str, int], streets: dict[str, List[str]]) -> bool:
+        """
+        Ajoute un lot de rues récupérées à l'instantané (créé au besoin), sans
+        garder le fichier mappé. False si l'écriture a échoué : le lot est à
+        réessayer, l'ancien fichier reste intact (remplacement atomique).
+        """
+        if not CFG["city_snapshot"]:
+            return True
+        try:
+            snap = cls.load()
+            if snap is None:
+                cls.write(CITY_SNAPSHOT, city2rel, streets)
+            else:
+                snap.updated(streets).close()
+            return True
+        except OSError:
+            return False
+
+
+# ── Index RTA (code postal) → villes + rues ─────────────────────────────
+RTA_INDEX = DATA_DIR / (CFG["rta_index"] or "rta_index.json")
+_RTA_RE = re.compile(r"^[A-Z]\d[A-Z]$")
+
+
+class RtaIndex:
+    """
+    Pour chaque ville, {RTA → rues} tiré des adresses OSM (`addr:postcode`
+    + `addr:street`). Stocké par ville dans un JSON (construction reprise
+    ville par ville) et inversé à la lecture : RTA → {ville → rues}.
+    """
+
+    def __init__(self, path: Path = RTA_INDEX, data: Optional[dict] = None):
+        self.path = Path(path)
+        self.by_city: dict[str, dict[str, List[str]]] = (data or {}).get(
+            "cities", {}
+        )
+        self._by_rta: Optional[dict[str, dict[str, List[str]]]] = None
+
+    @classmethod
+    def load(cls, path: Path = RTA_INDEX) -> Optional["RtaIndex"]:
+        """L'index s'il existe et est lisible, sinon None."""
+        if not CFG["rta_index"]:
+            return None
+        try:
+            return cls(path, json.loads(Path(path).read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            return None
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        data = {"cities": self.by_city}
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def normalize(rta: Optional[str]) -> Optional[str]:
+        """« h2x », « H2X 1Y4 » → « H2X » ; None si ce n'est pas une RTA postale."""
+        rta = re.sub(r"\s+", "", rta or "").upper()[:3]
+        return rta if _RTA_RE.match(rta) else None
+
+    def set_city(self, city: str, rtas: dict[str, List[str]]):
+        self.by_city[city] = rtas
+        self._by_rta = None
+
+    def _index(self) -> dict[str, dict[str, List[str]]]:
+        if self._by_rta is None:
+            self._by_rta = {}
+            for city, rtas in self.by_city.items():
+                for rta, sts in rtas.items():
+                    self._by_rta.setdefault(rta, {})[city] = sts
+        return self._by_rta
+
+    def cities(self, rta: str) -> List[str]:
+        """Villes qui ont au moins une adresse dans `rta`."""
+        return sorted(self._index().get(self.normalize(rta) or "", {}))
+
+    def streets(self, rta: str, city: str) -> Optional[List[str]]:
+        """Rues de `city` dans `rta`, ou None si l'index ne couvre pas la ville."""
+        if city not in self.by_city:
+            return None
+        return list(self._index().get(self.normalize(rta) or "", {}).get(city, []))
+
+
+def rta_streets(city: str, rta: Optional[str], log=None) -> Optional[List[str]]:
+    """
+    Rues d'une recherche RTA postale, si l'index les connaît et couvre assez
+    la ville : les rues sans adresse postale OSM n'y figurent pas, alors
+    qu'elles peuvent être dans la RTA. Sous CFG["rta_index_min_coverage"]
+    (part des rues de l'instantané présentes dans l'index), ou si la liste
+    des rues de la ville est inconnue, None → recherche ville + RTA.
+    """
+    if not RtaIndex.normalize(rta):
+        return None  # RTA absente ou non postale : rien à découper
+    index = RtaIndex.load()
+    sts = index.streets(rta, city) if index else None
+    if not sts:
+        return None
+    city_sts = snapshot_streets(city)
+    known = {street_key(s) for s in city_sts or ()}
+    indexed = {street_key(s) for v in index.by_city[city].values() for s in v}
+    skipped = len(known - indexed)
+    coverage = 1 - skipped / len(known) if known else 0.0
+    log = log or (lambda msg: None)
+    if not known:
+        log(f"⚠ rues de {city} inconnues → recherche ville + RTA")
+        return None
+    if coverage < CFG["rta_index_min_coverage"]:
+        log(
+            f"⚠ index RTA : {coverage:.0%} des rues de {city} ont une adresse"
+            " postale OSM → recherche ville + RTA"
+        )
+        return None
+    log(
+        f"📮 RTA {RtaIndex.normalize(rta)} : {len(sts)} rue(s) ; {skipped} rue(s)"
+        f" de {city} sans adresse postale OSM ignorées"
+    )
+    return sts
+
+
 # ── Utilitaires Overpass ────────────────────────────────────────────────
+class OverpassError(RuntimeError):
+    """Tous les serveurs Overpass ont échoué (ou refusé la requête)."""
+
+
+class OverpassClient:
+    """
+    Client Overpass partagé : une requests.Session (connexions keep-alive
+    réutilisées par les threads de StreetFetcher), bascule sur les miroirs
+    de CFG["overpass_endpoints"] et attente exponentielle avec gigue sur
+    429/504 et erreurs réseau. Les requêtes demandent `[out:csv(...)]` et
+    la réponse est lue ligne par ligne : pas de JSON complet en mémoire
+    (seuls les diffs augmentés, limités aux changements, arrivent en XML).
+    Le dernier serveur qui a répondu est essayé en premier.
+    """
+
+    RETRY_STATUS = {429, 502, 503, 504}
+
+    def __init__(self, endpoints: Optional[List[str]] = None):
+        self.endpoints = list(endpoints or CFG["overpass_endpoints"])
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        pool = max(4, CFG["street_fetch_workers"])
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=len(self.endpoints), pool_maxsize=pool
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._best = 0
+
+    def rows(self, query: str, timeout: float) -> List[List[str]]:
+        """Lignes CSV (séparateur tabulation) d'une requête `[out:csv(...)]`."""
+
+        def read(r) -> Optional[List[List[str]]]:
+            out = [
+                line.split("\t") for line in r.iter_lines(decode_unicode=True) if line
+            ]
+            # page d'erreur HTML/XML renvoyée en 200 (délai serveur dépassé)
+            return None if out and out[0][0].lstrip().startswith("<") else out
+
+        return self._post(query, timeout, read)
+
+    def xml(self, query: str, timeout: float) -> ET.Element:
+        """Racine `<osm>` d'une requête `[out:xml]` (diffs augmentés)."""
+
+        def read(r) -> Optional[ET.Element]:
+            try:
+                root = ET.fromstring(r.content)
+            except ET.ParseError:
+                return None
+            # délai ou mémoire dépassés : 200 avec un <remark> d'erreur
+            remark = root.findtext("remark") or ""
+            return None if "error" in remark.lower() else root
+
+        return self._post(query, timeout, read)
+
+    def _post(self, query: str, timeout: float, read):
+        """POST avec bascule de miroir ; `read` renvoie None si réponse d'erreur."""
+        last: Optional[Exception] = None
+        n = len(self.endpoints)
+        for attempt in range(CFG["overpass_retries"] * n):
+            i = (self._best + attempt) % n
+            url = self.endpoints[i]
+            try:
+                with self.session.post(
+                    url, data=query, timeout=timeout, stream=True
+                ) as r:
+                    if r.status_code in self.RETRY_STATUS:
+                        raise OverpassError(f"{url} → HTTP {r.status_code}")
+                    r.raise_for_status()
+                    r.encoding = "utf-8"
+                    out = read(r)
+            except (OverpassError, requests.ConnectionError, requests.Timeout) as e:
+                last = e
+                # changement de miroir immédiat ; attente une fois le tour fait
+                if (attempt + 1) % n == 0:
+                    delay = CFG["overpass_backoff_sec"] * 2 ** (attempt // n)
+                    time.sleep(delay * random.uniform(0.5, 1.5))
+                continue
+            if out is None:
+                last = OverpassError(f"{url} : réponse d'erreur Overpass")
+                continue
+            self._best = i
+            return out
+        raise OverpassError(f"Overpass indisponible : {last}")
+
+
+_overpass: Optional[OverpassClient] = None
+_overpass_lock = threading.Lock()
+
+
+def overpass() -> OverpassClient:
+    """Client Overpass du processus (créé au premier appel)."""
+    global _overpass
+    with _overpass_lock:
+        if _overpass is None:
+            _overpass = OverpassClient()
+        return _overpass
+
+
 def fetch_all_cities() -> Dict[str, int]:
     """Renvoie {nom_ville → id_relation OSM} (admin_level=8) pour le Québec."""
     query = (
-        "[out:json][timeout:60];"
+        "[out:csv(name,::id;false)][timeout:60];"
         'area["boundary"="administrative"]["admin_level"="4"]["name"="Québec"]->.prov;'
         'rel["boundary"="administrative"]["admin_level"="8"](area.prov);'
         "out tags;"
     )
-    r = requests.post(
-        OVERPASS_URL, data=query, headers=HEADERS, timeout=CFG["overpass_timeout"]
-    )
-    r.raise_for_status()
-    mapping = {
-        elt["tags"]["name"]: elt["id"]
-        for elt in r.json().get("elements", [])
-        if elt.get("tags", {}).get("name")
-    }
-    return mapping
+    rows = overpass().rows(query, CFG["overpass_timeout"])
+    return {name: int(rel) for name, rel, *_ in rows if name and rel.isdigit()}
 
 
 def fetch_streets_for_city(rel_id: int) -> List[str]:
     """Renvoie la liste triée des rues (way highway name) dans une municipalité."""
     area_id = 3600000000 + rel_id
+    # un seul élément par nom (for … make) : quelques Ko au lieu de chaque way
     query = (
-        "[out:json][timeout:120];"
+        "[out:csv(name;false)][timeout:120];"
         f"area({area_id})->.a;"
-        '(way["highway"]["name"](area.a););'
-        "out tags;"
+        'way["highway"]["name"](area.a);'
+        'for (t["name"]) { make street name=_.val; out; }'
     )
-    r = requests.post(
-        OVERPASS_URL, data=query, headers=HEADERS, timeout=CFG["overpass_timeout"] + 60
+    rows = overpass().rows(query, CFG["overpass_timeout"] + 60)
+    return sorted({row[0].strip() for row in rows if row[0].strip()})
+
+
+# emprise du Québec : les requêtes datées (adiff) n'acceptent pas les aires
+QC_BBOX = "44.99,-79.77,62.59,-57.10"
+IS_IN_BATCH = 400  # points par requête is_in
+
+
+def fetch_changed_cities(since: float) -> set[int]:
+    """
+    Relations des municipalités où une rue a pu apparaître ou disparaître
+    depuis `since` (epoch) : ways highway modifiés (créés, retouchés,
+    renommés) encore présents, plus ceux qui ont cessé de compter comme
+    rue nommée (supprimés, tag highway ou name retiré), pris dans le diff
+    augmenté et rattachés à leur ville par leur ancienne géométrie.
+    """
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(since))
+    query = (
+        "[out:csv(::id;false)][timeout:300];"
+        'area["boundary"="administrative"]["admin_level"="4"]["name"="Québec"]->.prov;'
+        f'way["highway"](changed:"{stamp}")(area.prov);'
+        "node(w);"
+        "is_in;"
+        'area._["boundary"="administrative"]["admin_level"="8"];'
+        "out ids;"
+    )
+    rows = overpass().rows(query, CFG["overpass_timeout"] + 180)
+    # id d'aire = 3600000000 + id de relation
+    changed = {int(r[0]) - 3600000000 for r in rows if r[0].isdigit()}
+    return changed | cities_at(removed_way_points(stamp))
+
+
+def removed_way_points(stamp: str) -> List[tuple[float, float]]:
+    """
+    Extrémités (lat, lon) des ways highway nommés présents à `stamp` et
+    plus maintenant : actions `delete` du diff augmenté, dont le bloc
+    <old> garde la géométrie d'avant (out geom).
+    """
+    query = (
+        f'[out:xml][timeout:300][adiff:"{stamp}"];'
+        f'way["highway"]["name"](changed)({QC_BBOX});'
+        "out geom;"
+    )
+    root = overpass().xml(query, CFG["overpass_timeout"] + 180)
+    points = set()
+    for action in root.iter("action"):
+        if action.get("type") != "delete":
+            continue
+        nds = action.findall("old/way/nd")
+        for nd in nds[:1] + nds[-1:]:
+            if nd.get("lat") and nd.get("lon"):
+                points.add((float(nd.get("lat")), float(nd.get("lon"))))
+    return sorted(points)
+
+
+def cities_at(points: List[tuple[float, float]]) -> set[int]:
+    """Relations des municipalités (admin_level=8) contenant ces points."""
+    rels: set[int] = set()
+    for i in range(0, len(points), IS_IN_BATCH):
+        union = "".join(
+            f"is_in({lat},{lon});" for lat, lon in points[i : i + IS_IN_BATCH]
+        )
+        query = (
+            "[out:csv(::id;false)][timeout:300];"
+            f"({union});"
+            'area._["boundary"="administrative"]["admin_level"="8"];'
+            "out ids;"
+        )
+        rows = overpass().rows(query, CFG["overpass_timeout"] + 180)
+        rels |= {int(r[0]) - 3600000000 for r in rows if r[0].isdigit()}
+    return rels
+
+
+def fetch_postcodes_for_city(rel_id: int) -> dict[str, List[str]]:
+    """
+    {RTA → rues} d'une municipalité, d'après les adresses OSM : une ligne
+    par addr:street avec l'ensemble de ses addr:postcode (agrégat `set`).
+    """
+    area_id = 3600000000 + rel_id
+    query = (
+        "[out:csv(street,postcodes;false)][timeout:180];"
+        f"area({area_id})->.a;"
+        'nwr["addr:street"]["addr:postcode"](area.a);'
+        'for (t["addr:street"]) '
+        '{ make addr street=_.val, postcodes=set(t["addr:postcode"]); out; }'
     )
-    r.raise_for_status()
-    names = {
-        elt["tags"]["name"].strip()
-        for elt in r.json().get("elements", [])
-        if "tags" in elt and "name" in elt["tags"]
-    }
-    return sorted(names)
+    rows = overpass().rows(query, CFG["overpass_timeout"] + 60)
+    out: dict[str, set] = {}
+    for street, *codes in rows:
+        for code in ";".join(codes).split(";"):
+            rta = RtaIndex.normalize(code)
+            if rta and street.strip():
+                out.setdefault(rta, set()).add(street.strip())
+    return {rta: sorted(sts) for rta, sts in sorted(out.items())}
+
+
+# ── Noms de rues : clé canonique + dédoublonnage ────────────────────────
+_STREET_TYPES = {
+    "RUE": "RUE",
+    "AVENUE": "AVENUE",
+    "AV": "AVENUE",
+    "AVE": "AVENUE",
+    "BOULEVARD": "BOULEVARD",
+    "BOUL": "BOULEVARD",
+    "BLVD": "BOULEVARD",
+    "BD": "BOULEVARD",
+    "CHEMIN": "CHEMIN",
+    "CH": "CHEMIN",
+    "ROUTE": "ROUTE",
+    "RTE": "ROUTE",
+    "RANG": "RANG",
+    "RG": "RANG",
+    "MONTEE": "MONTEE",
+    "COTE": "COTE",
+    "PLACE": "PLACE",
+    "PL": "PLACE",
+    "CROISSANT": "CROISSANT",
+    "CRES": "CROISSANT",
+    "IMPASSE": "IMPASSE",
+    "TERRASSE": "TERRASSE",
+    "PROMENADE": "PROMENADE",
+    "ALLEE": "ALLEE",
+    "CARRE": "CARRE",
+    "COURS": "COURS",
+}
+_STREET_WORDS = {"ST": "SAINT", "STE": "SAINTE", "MT": "MONT"}
+_STREET_DIRS = {"O": "OUEST", "E": "EST", "N": "NORD", "S": "SUD", "W": "OUEST"}
+_STREET_PARTICLES = {"DE", "DU", "DES", "LA", "LE", "LES", "D", "L"}
+
+
+def street_key(name: str) -> tuple[str, str]:
+    """
+    (type, nom) canoniques d'une rue : accents retirés, majuscules,
+    ponctuation et tirets → espaces, type abrégé développé (Av → AVENUE),
+    St/Ste → SAINT/SAINTE, O/E final → OUEST/EST. Les articles restent :
+    « Rue Le Royer » et « Rue Royer » sont deux rues.
+    « Av. St-Denis » et « Avenue Saint Denis » → ("AVENUE", "SAINT DENIS").
+    """
+    txt = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    words = re.sub(r"[^A-Z0-9]+", " ", txt.upper()).split()
+    kind = _STREET_TYPES.get(words[0], "") if len(words) > 1 else ""
+    words = words[1:] if kind else words
+    words = [_STREET_WORDS.get(w, w) for w in words]
+    if len(words) > 1:
+        words[-1] = _STREET_DIRS.get(words[-1], words[-1])
+    return kind, " ".join(words)
+
+
+def _bare_street(base: str) -> str:
+    """Nom canonique sans articles de tête (« DE LA GAUCHETIERE » → « GAUCHETIERE »)."""
+    words = base.split()
+    while len(words) > 1 and words[0] in _STREET_PARTICLES:
+        words = words[1:]
+    return " ".join(words)
+
+
+class StreetIndex:
+    """
+    Rues d'une ville regroupées par clé canonique (`street_key`) : une
+    entrée par rue réelle, quelle que soit la graphie OSM. Un nom sans
+    type (« Saint-Denis ») rejoint la rue typée de même nom si elle est
+    unique dans la ville ; à défaut, celle qui n'en diffère que par les
+    articles (« Gauchetière » → « Rue de la Gauchetière »), si elle est
+    unique elle aussi. Deux noms typés ne sont jamais fusionnés sur les
+    seuls articles. Chaque groupe garde un nom représentatif (typé,
+    type écrit en entier, accentué, le plus long) dont la forme de
+    recherche est celle de la GUI : `upper()`.
+    """
+
+    def __init__(self, names: List[str]):
+        groups: dict[tuple[str, str], List[str]] = {}
+        for n in dict.fromkeys(s.strip() for s in names if s and s.strip()):
+            groups.setdefault(street_key(n), []).append(n)
+        for k in [k for k in groups if not k[0]]:
+            target = self._typed_match(groups, k[1])
+            if target:  # sans ambiguïté : Rue X et « X » seul
+                groups[target] += groups.pop(k)
+        self._rep = {k: max(v, key=self._rank) for k, v in groups.items()}
+        self._groups = groups
+        self._of = {n: k for k, v in groups.items() for n in v}
+
+    @staticmethod
+    def _rank(name: str) -> tuple:
+        kind = street_key(name)[0]
+        head = unicodedata.normalize("NFKD", name.split()[0]).upper()
+        full = kind and re.sub(r"[^A-Z]", "", head) == kind  # « Avenue », pas « Av. »
+        return (bool(kind), bool(full), not name.isascii(), len(name), name)
+
+    @staticmethod
+    def _typed_match(groups, base: str) -> Optional[tuple[str, str]]:
+        """Rue typée unique de nom `base`, sinon unique aux articles près."""
+        typed = [g for g in groups if g[0] and g[1] == base]
+        if not typed:
+            bare = _bare_street(base)
+            typed = [g for g in groups if g[0] and _bare_street(g[1]) == bare]
+        return typed[0] if len(typed) == 1 else None
+
+    def _find(self, name: str) -> Optional[tuple[str, str]]:
+        k = self._of.get(name.strip()) or street_key(name)
+        if k in self._groups:
+            return k
+        return None if k[0] else self._typed_match(self._groups, k[1])
+
+    def names(self) -> List[str]:
+        """Un nom représentatif par rue réelle, triés."""
+        return sorted(self._rep.values())
+
+    def search_forms(self) -> List[str]:
+        """Une recherche Salesforce par rue réelle."""
+        return [n.upper() for n in self.names()]
+
+    def search_form(self, name: str) -> str:
+        """Forme de recherche de la rue de `name`, ou `name` tel quel."""
+        k = self._find(name)
+        return (self._rep[k] if k else name.strip()).upper()
+
+    def variants(self, name: str) -> List[str]:
+        """Graphies OSM regroupées avec `name`."""
+        k = self._find(name)
+        return list(self._groups[k]) if k else []
 
 
 # ── Selenium helpers ────────────────────────────────────────────────────
 BASE_DIR = pathlib.Path(__file__).resolve().parent
 
 
-def build_driver() -> uc.Chrome:
+def light_profile(driver, site: str):
+    """
+    Profil « léger » par site (CFG["light_profile"]) : les requêtes dont
+    l'URL correspond à CFG["blocked_url_patterns"] (images, polices, médias,
+    analytics) sont bloquées par DevTools. Rappeler avec un autre site
+    réapplique sa propre règle sur le même Chrome.
+    """
+    on = CFG["light_profile"].get(site, False)
+    patterns = CFG["blocked_url_patterns"] if on else []
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+def build_driver(
+    tracer: Optional[DriverTracer] = None, site: str = "sf"
+) -> uc.Chrome:
     opts = uc.ChromeOptions()
     opts.add_argument("--no-sandbox")
     opts.add_argument("--disable-dev-shm-usage")
     opts.add_argument("--disable-gpu")
     if CFG["selenium_headless"]:
         opts.add_argument("--headless=new")
+    # eager : on rend la main au DOMContentLoaded, sans attendre images & co ;
+    # normal | eager | none par site, comme light_profile (une chaîne = tous)
+    strategy = CFG["page_load_strategy"]
+    if isinstance(strategy, dict):
+        strategy = strategy.get(site, "normal")
+    opts.page_load_strategy = strategy
 
     # ← tell ChromeDriver exactly which chrome.exe to use:
     # opts.binary_location = str(BASE_DIR / "chrome" / "chrome.exe")
 
-    driver = uc.Chrome(options=opts, version_main=136)
+    # chromedriver déjà patché en cache : ni téléchargement ni patch
+    exe = "undetected_chromedriver" + (".exe" if os.name == "nt" else "")
+    cached = DATA_DIR / exe
+    use_cache = CFG["chromedriver_cache"] and cached.exists()
+    driver = uc.Chrome(
+        options=opts,
+        version_main=136,
+        driver_executable_path=str(cached) if use_cache else None,
+    )
+    if CFG["chromedriver_cache"] and not use_cache:
+        with contextlib.suppress(Exception):
+            shutil.copy2(driver.patcher.executable_path, cached)
     driver.maximize_window()
+    with contextlib.suppress(Exception):  # profil complet : plus lent, mais fonctionnel
+        light_profile(driver, site)
+    if tracer or CFG["webdriver_trace"]:
+        (tracer or DriverTracer()).install(driver)
     return driver
 
 
+_CDP_COOKIE_KEYS = {
+    "name",
+    "value",
+    "domain",
+    "path",
+    "expires",
+    "secure",
+    "httpOnly",
+    "sameSite",
+}
+
+
+def session_cookies(src) -> list[dict]:
+    """Cookies de `src` (tous domaines, via DevTools) prêts pour setCookies."""
+    cookies = []
+    for c in src.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]:
+        c = {k: v for k, v in c.items() if k in _CDP_COOKIE_KEYS}
+        if c.get("expires", -1) < 0:
+            c.pop("expires", None)  # cookie de session
+        cookies.append(c)
+    return cookies
+
+
+def restore_session(drv, cookies: list[dict], url: str):
+    """Réinjecte `cookies` dans `drv` puis charge `url`."""
+    drv.execute_cdp_cmd("Network.enable", {})
+    if cookies:
+        drv.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+    drv.get(url)
+
+
+def clone_session(src, tracer: Optional[DriverTracer] = None) -> uc.Chrome:
+    """
+    Ouvre un second Chrome déjà authentifié : les cookies de `src` (tous
+    domaines, via DevTools) sont recopiés, ce qui évite un nouveau login +
+    MFA. Le nouveau driver est positionné sur l'URL courante de `src`.
+    """
+    url = src.current_url
+    cookies = session_cookies(src)
+    drv = build_driver(tracer)
+    try:
+        restore_session(drv, cookies, url)
+        return drv
+    except Exception:
+        with contextlib.suppress(Exception):
+            drv.quit()
+        raise
+
+
+class DriverSupervisor:
+    """
+    Garde-fou d'un Chrome de longue durée. Entre deux pages, `due()` dit
+    s'il faut le recycler (CFG["driver_recycle_pages"] pages depuis son
+    démarrage, ou RSS de Chrome et de ses processus enfants au-delà de
+    CFG["driver_max_rss_mb"]). Un chien de garde tue le Chrome quand
+    `progress()` ne bouge plus pendant CFG["driver_stall_sec"] : l'appel
+    WebDriver bloqué lève alors une erreur au lieu de pendre des minutes.
+    `recycle()` relance un Chrome avec les cookies du dernier point de
+    contrôle.
+    """
+
+    def __init__(
+        self,
+        driver,
+        progress,
+        log,
+        tracer: Optional[DriverTracer] = None,
+        site: str = "sf",
+    ):
+        self.driver = driver
+        self.progress = progress  # () → valeur qui change tant que le job avance
+        self.log = log
+        self.tracer = tracer
+        self.site = site
+        self.pages = 0
+        self.stalled = False
+        self._cookies: list[dict] = []
+        self._mark = (None, time.monotonic())
+        self._stop = threading.Event()
+
+    def start(self) -> "DriverSupervisor":
+        if CFG["driver_stall_sec"] > 0:
+            threading.Thread(target=self._watchdog, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    # ---------- mesures --------------------------------------------------
+    def _procs(self, driver=None) -> list:
+        if psutil is None:
+            return []
+        try:
+            root = psutil.Process((driver or self.driver).service.process.pid)
+            return [root, *root.children(recursive=True)]
+        except Exception:
+            return []
+
+    def rss_mb(self) -> Optional[float]:
+        """Mémoire résidente de chromedriver + Chrome (None sans psutil)."""
+        procs = self._procs()
+        if not procs:
+            return None
+        total = 0
+        for p in procs:
+            with contextlib.suppress(psutil.Error):
+                total += p.memory_info().rss
+        return total / 2**20
+
+    def checkpoint(self, cookies: bool = True):
+        """Fin de page : la compte et mémorise les cookies de la session."""
+        self.pages += 1
+        if cookies:
+            with contextlib.suppress(Exception):
+                self._cookies = session_cookies(self.driver)
+
+    def due(self) -> Optional[str]:
+        """Raison de recycler maintenant, sinon None."""
+        n = CFG["driver_recycle_pages"]
+        if n and self.pages >= n:
+            return f"{self.pages} pages"
+        limit = CFG["driver_max_rss_mb"]
+        rss = self.rss_mb() if limit else None
+        if rss and rss > limit:
+            return f"Chrome {rss:.0f} Mo > {limit} Mo"
+        return None
+
+    # ---------- chien de garde ------------------------------------------
+    def _watchdog(self):
+        limit = CFG["driver_stall_sec"]
+        while not self._stop.wait(5):
+            mark, now = self.progress(), time.monotonic()
+            if mark != self._mark[0]:
+                self._mark = (mark, now)
+            elif now - self._mark[1] > limit and not self.stalled:
+                self.log(f"⏱ aucun progrès depuis {limit}s → arrêt de Chrome")
+                self.stalled = True
+                self._kill()
+
+    def _kill(self, driver=None):
+        for p in reversed(self._procs(driver)):
+            with contextlib.suppress(Exception):
+                p.kill()
+        if psutil is None:
+            with contextlib.suppress(Exception):
+                (driver or self.driver).service.process.kill()
+
+    # ---------- recyclage -----------------------------------------------
+    def recycle(self, url: str):
+        """Remplace le Chrome par un neuf, cookies réinjectés, posé sur `url`."""
+        old = self.driver
+        if self.stalled:
+            self._kill(old)
+        else:
+            with contextlib.suppress(Exception):
+                old.quit()
+        self.driver = build_driver(self.tracer, self.site)
+        restore_session(self.driver, self._cookies, url)
+        self.pages = 0
+        self.stalled = False
+        self._mark = (None, time.monotonic())
+        return self.driver
+
+
+def driver_dead(e: BaseException) -> bool:
+    """
+    Erreur d'un Chrome perdu (session invalide, fenêtre fermée, navigateur
+    injoignable) plutôt que d'une page : inutile de réessayer sur ce driver.
+    """
+    lost = (InvalidSessionIdException, NoSuchWindowException, ConnectionError)
+    # WebDriverException nue : « chrome not reachable », « disconnected »
+    return isinstance(e, lost) or type(e) is WebDriverException
+
+
 def wait_visible(drv, by, val, timeout=20):
     return WebDriverWait(drv, timeout).until(
         EC.visibility_of_element_located((by, val))
@@ -278,94 +1202,881 @@ def safe_click(elem, retries=3, sleep_step=0.3):
             time.sleep(sleep_step * attempt)
 
 
-# ───────────────────────────────────────────────────
-class ClicDetailScraper(threading.Thread):
+# ── Mesures de performance ──────────────────────────────────────────────
+_RANGE_RX = re.compile(r"(\d[\d\s,.]*)\s*-\s*(\d[\d\s,.]*)(?:\D+(\d[\d\s,.]*))?")
+
+
+def _parse_items_range(txt: str) -> tuple[int | None, int | None, int | None]:
     """
-    Lit un fichier *doors_*.json|csv, extrait la colonne « Compte client »,
-    puis va sur Clic+ pour récupérer les infos détaillées de chaque compte.
-    Les résultats sont exportés dans data/specifics_<prefix>_<ts>.csv
+    Décode le texte de `.itemsRange` → (premier, dernier, total).
+    Accepte « (1-25) », « 1-25 of 340 », « 1 - 25 sur 1 234 ». Les valeurs
+    absentes valent None.
     """
+    m = _RANGE_RX.search(txt or "")
+    if not m:
+        return None, None, None
+    num = lambda s: int(re.sub(r"\D", "", s)) if s else None  # noqa: E731
+    return num(m.group(1)), num(m.group(2)), num(m.group(3))
 
-    URL = "https://clicplus.int.videotron.com/vui/#/clic/infos-externes"
 
-    def __init__(
+def _fmt_eta(sec: float | None) -> str:
+    if sec is None:
+        return "--:--:--"
+    sec = int(sec)
+    return f"{sec // 3600:02d}:{sec % 3600 // 60:02d}:{sec % 60:02d}"
+
+
+class RunMetrics:
+    """
+    Chronomètre les phases d'un run (spans), compte les unités traitées et
+    calcule un débit glissant + une ETA. `write()` dépose le résultat à côté
+    des exports (metrics_<prefix>_<ts>.json et/ou .prom).
+    """
+
+    def __init__(self, job: str, window_sec: float | None = None):
+        self.job = job
+        self.window = window_sec or CFG["metrics_window_sec"]
+        self.started = datetime.now()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: dict[str, dict] = {}
+        self.counters: dict[str, int] = {}
+        self.gauges: dict[str, float] = {}
+        self._events: dict[str, deque] = {}
+        self._first: dict[str, float] = {}
+        self.tracer: Optional[DriverTracer] = None
+        self.extra: dict[str, dict] = {}
+
+    def attach(self, driver):
+        """Relie le traceur WebDriver du driver (s'il y en a un) aux spans."""
+        self.tracer = getattr(driver, "tracer", None)
+
+    # ---------- collecte -------------------------------------------------
+    @contextlib.contextmanager
+    def span(self, name: str):
+        t = time.perf_counter()
+        op = self.tracer.operation(name) if self.tracer else contextlib.nullcontext()
+        try:
+            with op:
+                yield
+        finally:
+            self.record(name, time.perf_counter() - t)
+
+    def record(self, name: str, dt: float):
+        with self._lock:
+            s = self.spans.setdefault(
+                name, {"count": 0, "total_sec": 0.0, "max_sec": 0.0}
+            )
+            s["count"] += 1
+            s["total_sec"] += dt
+            s["max_sec"] = max(s["max_sec"], dt)
+
+    def incr(self, name: str, n: int = 1):
+        now = time.perf_counter()
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+            self._first.setdefault(name, now)
+            self._events.setdefault(name, deque()).append((now, n))
+
+    def gauge(self, name: str, value: float):
+        with self._lock:
+            self.gauges[name] = value
+
+    # ---------- dérivés --------------------------------------------------
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def rate(self, name: str) -> float:
+        """Débit glissant de `name` en unités / minute."""
+        now = time.perf_counter()
+        with self._lock:
+            ev = self._events.get(name)
+            if not ev:
+                return 0.0
+            while ev and now - ev[0][0] > self.window:
+                ev.popleft()
+            n = sum(k for _, k in ev)
+            # fenêtre = depuis la 1re unité (le login ne dilue pas le débit)
+            span = max(1.0, min(self.window, now - self._first[name]))
+        return n * 60 / span
+
+    def eta(self, name: str, total: int | None) -> float | None:
+        """Secondes restantes pour atteindre `total` unités de `name`."""
+        if not total:
+            return None
+        r = self.rate(name)
+        left = total - self.counters.get(name, 0)
+        if left <= 0:
+            return 0.0
+        return left * 60 / r if r > 0 else None
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            spans = {k: dict(v) for k, v in self.spans.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+        return {
+            "job": self.job,
+            "started": self.started.isoformat(timespec="seconds"),
+            "elapsed_sec": round(self.elapsed(), 3),
+            "spans": spans,
+            "counters": counters,
+            "gauges": gauges,
+            "rates_per_min": {k: round(self.rate(k), 2) for k in counters},
+            **({"webdriver": self.tracer.summary()} if self.tracer else {}),
+            **self.extra,
+        }
+
+    # ---------- export ---------------------------------------------------
+    def to_prometheus(self) -> str:
+        snap = self.snapshot()
+        lbl = f'job="{self.job}"'
+        out = [
+            "# TYPE hotbot_run_elapsed_seconds gauge",
+            f"hotbot_run_elapsed_seconds{{{lbl}}} {snap['elapsed_sec']}",
+            "# TYPE hotbot_phase_seconds_total counter",
+        ]
+        for name, s in snap["spans"].items():
+            out.append(
+                f'hotbot_phase_seconds_total{{{lbl},phase="{name}"}} '
+                f"{s['total_sec']:.3f}"
+            )
+        out.append("# TYPE hotbot_phase_count_total counter")
+        for name, s in snap["spans"].items():
+            out.append(f'hotbot_phase_count_total{{{lbl},phase="{name}"}} {s["count"]}')
+        out.append("# TYPE hotbot_items_total counter")
+        for name, n in snap["counters"].items():
+            out.append(f'hotbot_items_total{{{lbl},item="{name}"}} {n}')
+        for name, v in snap["gauges"].items():
+            out.append(f'hotbot_{_slug(name)}{{{lbl}}} {v}')
+        if "webdriver" in snap:
+            out.append("# TYPE hotbot_webdriver_commands_total counter")
+            for op, o in snap["webdriver"].items():
+                out.append(
+                    f'hotbot_webdriver_commands_total{{{lbl},op="{op}"}} {o["calls"]}'
+                )
+            out.append("# TYPE hotbot_webdriver_seconds_total counter")
+            for op, o in snap["webdriver"].items():
+                out.append(
+                    f'hotbot_webdriver_seconds_total{{{lbl},op="{op}"}} {o["sec"]:.3f}'
+                )
+        return "\n".join(out) + "\n"
+
+    def write(
         self,
-        doors_path: Path,
-        gui_q: queue.Queue,
-        pause_evt: threading.Event,
         dest_dir: Path,
-        clic_user: str,
-        clic_pwd: str,
-        csr_code: str,
-    ):
-        super().__init__(daemon=True)
-        self.path = doors_path
-        self.gui_q = gui_q
-        self.pause_evt = pause_evt
-        self.driver: Optional[uc.Chrome] = None
-        self.clic_user = clic_user
-        self.clic_pwd = clic_pwd
-        self.csr_code = csr_code
-        self.rows: list[dict] = []
-        self.dest_dir = dest_dir
-        self._stop_evt = threading.Event()
+        prefix: str,
+        ts: str,
+        profiler: Optional[RunProfiler] = None,
+    ) -> list[Path]:
+        fmt = CFG["metrics_format"]
+        written = []
+        if profiler and profiler.enabled:
+            profiler.stop()
+            self.extra["profile"] = profiler.write(dest_dir, prefix, ts)
+            if "cprofile" in self.extra["profile"]:
+                written.append(dest_dir / self.extra["profile"]["cprofile"]["file"])
+        if fmt in ("json", "both"):
+            p = dest_dir / f"metrics_{prefix}_{ts}.json"
+            p.write_text(
+                json.dumps(self.snapshot(), ensure_ascii=False, indent=2),
+                encoding="utf-8",
+            )
+            written.append(p)
+        if fmt in ("prom", "both"):
+            p = dest_dir / f"metrics_{prefix}_{ts}.prom"
+            p.write_text(self.to_prometheus(), encoding="utf-8")
+            written.append(p)
+        return written
 
-    def stop(self):
-        self._stop_evt.set()
 
-    # ---------- helpers --------------------------------------------------
-    def _dbg(self, txt: str):
-        self.gui_q.put(("log", txt))
+# ── Traçage WebDriver & profilage ───────────────────────────────────────
+class DriverTracer:
+    """
+    Compte et chronomètre chaque aller-retour WebDriver. Toutes les commandes
+    (find_element, .text, get_attribute, execute_script, y compris celles
+    émises par les WebElement) passent par `driver.execute` : on l'enveloppe
+    et on impute chaque appel à l'opération logique courante du thread.
+    """
 
-    def _with_retries(self, description: str, func, *args, **kwargs):
-        """Helper method for retrying operations with logging"""
-        max_retries = 3
-        for attempt in range(max_retries):
+    NO_OP = "(hors opération)"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.ops: dict[str, dict] = {}
+
+    def install(self, driver):
+        orig = driver.execute
+
+        def execute(driver_command, params=None):
+            t = time.perf_counter()
             try:
-                self._dbg(
-                    f"  Attempting {description} (try {attempt + 1}/{max_retries})"
-                )
-                result = func(*args, **kwargs)
-                self._dbg(f"  ✓ {description} successful")
-                return result
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    self._dbg(
-                        f"  ❌ {description} failed after {max_retries} attempts: {e}"
-                    )
-                    raise
-                self._dbg(
-                    f"  ⚠ {description} failed (attempt {attempt + 1}), retrying..."
-                )
-                time.sleep(1)
+                return orig(driver_command, params)
+            finally:
+                self._hit(driver_command, time.perf_counter() - t)
 
-    @staticmethod
-    def _accounts_from_file(fp: Path) -> list[str]:
-        if fp.suffix == ".json":
-            data = json.loads(fp.read_text(encoding="utf-8"))
-            return [d.get("Compte client") for d in data if d.get("Compte client")]
-        else:  # csv
-            with fp.open(encoding="utf-8") as f:
-                rdr = csv.DictReader(f)
-                return [
-                    row.get("Compte client") for row in rdr if row.get("Compte client")
-                ]
+        driver.execute = execute
+        driver.tracer = self
+        return driver
 
-    # ---------- selenium -------------------------------------------------
-    def _wait(self, by, sel, to=20):
-        return WebDriverWait(self.driver, to).until(
-            EC.visibility_of_element_located((by, sel))
-        )
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
 
-    # ───── ClicDetailScraper._login_and_ready  (remplace l'ancienne version)
-    def _login_and_ready(self):
-        d = self.driver
-        d.get(self.URL)
+    def _op(self, name: str) -> dict:
+        return self.ops.setdefault(
+            name, {"runs": 0, "calls": 0, "sec": 0.0, "commands": {}}
+        )
 
-        # ① — Fill in Clic+ credentials (username + password)
-        wait = WebDriverWait(d, 20)
+    @contextlib.contextmanager
+    def operation(self, name: str):
+        stack = self._stack()
+        stack.append(name)
+        with self._lock:
+            self._op(name)["runs"] += 1
         try:
-            usr = wait.until(
+            yield
+        finally:
+            stack.pop()
+
+    def _hit(self, cmd: str, dt: float):
+        stack = self._stack()
+        name = stack[-1] if stack else self.NO_OP
+        with self._lock:
+            op = self._op(name)
+            op["calls"] += 1
+            op["sec"] += dt
+            c = op["commands"].setdefault(cmd, [0, 0.0])
+            c[0] += 1
+            c[1] += dt
+
+    def summary(self) -> dict:
+        """{op: {runs, calls, sec, calls_per_run, sec_per_run, commands}}."""
+        with self._lock:
+            out = {}
+            for name, o in self.ops.items():
+                runs = max(1, o["runs"])
+                out[name] = {
+                    "runs": o["runs"],
+                    "calls": o["calls"],
+                    "sec": round(o["sec"], 3),
+                    "calls_per_run": round(o["calls"] / runs, 1),
+                    "sec_per_run": round(o["sec"] / runs, 3),
+                    "commands": {
+                        cmd: {"calls": n, "sec": round(t, 3)}
+                        for cmd, (n, t) in sorted(
+                            o["commands"].items(), key=lambda kv: -kv[1][1]
+                        )
+                    },
+                }
+            return out
+
+    def report_lines(self, top: int = 5) -> list[str]:
+        lines = []
+        ops = sorted(self.summary().items(), key=lambda kv: -kv[1]["sec"])
+        for name, o in ops:
+            lines.append(
+                f"{name}: {o['runs']}× · {o['calls_per_run']} cmd/run · "
+                f"{o['sec_per_run']}s/run · total {o['sec']}s"
+            )
+            for cmd, c in list(o["commands"].items())[:top]:
+                lines.append(f"    {cmd:<28} {c['calls']:>6}× {c['sec']:>9.3f}s")
+        return lines
+
+
+class RunProfiler:
+    """
+    Capture optionnelle cProfile / tracemalloc d'un run (CFG["profile_run"] :
+    off | cprofile | tracemalloc | both). À démarrer DANS le thread du run :
+    cProfile ne profile que le thread appelant.
+    """
+
+    def __init__(self, mode: str | None = None):
+        self.mode = mode or CFG["profile_run"]
+        self._prof = None
+        self._snap = None
+        self._peak = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def start(self):
+        if self.mode in ("cprofile", "both"):
+            import cProfile
+
+            self._prof = cProfile.Profile()
+            self._prof.enable()
+        if self.mode in ("tracemalloc", "both"):
+            import tracemalloc
+
+            tracemalloc.start(10)
+
+    def stop(self):
+        if self._prof:
+            self._prof.disable()
+        if self.mode in ("tracemalloc", "both"):
+            import tracemalloc
+
+            if tracemalloc.is_tracing():
+                self._snap = tracemalloc.take_snapshot()
+                self._peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+    def write(self, dest_dir: Path, prefix: str, ts: str, top: int = 25) -> dict:
+        """Écrit profile_<prefix>_<ts>.pstats et renvoie un résumé JSON-able."""
+        out: dict = {}
+        if self._prof:
+            import io
+            import pstats
+
+            p = dest_dir / f"profile_{prefix}_{ts}.pstats"
+            self._prof.dump_stats(str(p))
+            buf = io.StringIO()
+            pstats.Stats(self._prof, stream=buf).sort_stats("cumulative").print_stats(
+                top
+            )
+            out["cprofile"] = {"file": p.name, "top": buf.getvalue().splitlines()}
+        if self._snap is not None:
+            stats = self._snap.statistics("lineno")[:top]
+            out["tracemalloc"] = {
+                "peak_bytes": self._peak,
+                "top": [
+                    {"where": str(s.traceback[0]), "bytes": s.size, "count": s.count}
+                    for s in stats
+                ],
+            }
+        return out
+
+
+# ── Schéma des enregistrements ──────────────────────────────────────────
+class Record:
+    """
+    Enregistrement compact : un tuple de valeurs dans l'ordre du schéma, sans
+    __dict__ ni clés répétées. Expose get()/keys()/[] comme un dict pour le
+    code qui lisait les anciennes fiches.
+    """
+
+    __slots__ = ("values",)
+    schema: "RecordSchema"
+
+    def __init__(self, values: tuple):
+        self.values = values
+
+    def get(self, field: str, default=None):
+        i = self.schema.index.get(field)
+        v = None if i is None else self.values[i]
+        return default if v is None else v
+
+    def __getitem__(self, field: str):
+        return self.values[self.schema.index[field]]
+
+    def keys(self) -> tuple[str, ...]:
+        return self.schema.fields
+
+    def to_dict(self) -> dict:
+        return dict(zip(self.schema.fields, self.values))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class RecordSchema:
+    """
+    Projection explicite des champs réellement utilisés. Les libellés sont
+    internés et la classe d'enregistrement générée n'a que des __slots__ ;
+    les exports prennent leur en-tête ici au lieu d'unir les clés de
+    toutes les fiches.
+    """
+
+    def __init__(self, name: str, fields):
+        self.fields: tuple[str, ...] = tuple(
+            sys.intern(f) for f in dict.fromkeys(fields)
+        )
+        self.index = {f: i for i, f in enumerate(self.fields)}
+        self.record = type(name, (Record,), {"__slots__": (), "schema": self})
+
+    @property
+    def header(self) -> list[str]:
+        return list(self.fields)
+
+    def make(self, data) -> Record:
+        """Projette un dict (ou un Record de ce schéma) sur les champs."""
+        if isinstance(data, self.record):
+            return data
+        return self.record(tuple(data.get(f) for f in self.fields))
+
+
+DOOR_SCHEMA = RecordSchema("DoorRecord", CFG["door_fields"])
+ACCOUNT_SCHEMA = RecordSchema(
+    "AccountRecord", ("Compte client", "Téléphone", "Courriel")
+)
+
+
+def apply_config(overrides: dict):
+    """
+    CFG.update(overrides) pour un job (spec, processus enfant), puis
+    reconstruit DOOR_SCHEMA si `door_fields` a changé : le schéma est figé
+    à l'import et projetterait sinon les fiches sur les anciens champs.
+    """
+    global DOOR_SCHEMA
+    CFG.update(overrides)
+    if tuple(dict.fromkeys(CFG["door_fields"])) != DOOR_SCHEMA.fields:
+        DOOR_SCHEMA = RecordSchema("DoorRecord", CFG["door_fields"])
+
+
+# ───────────────────────────────────────────────────
+# ── Routage des comptes entre Clic+ et CSR ──────────────────────────────
+class AccountBackend(abc.ABC):
+    """
+    Un backend de recherche de compte : les comptes qu'il sait servir, la
+    préparation d'une voie (Chrome prêt) et la recherche d'un compte sur
+    cette voie. Pour en ajouter un : sous-classer, l'inscrire dans
+    ACCOUNT_BACKENDS et dans CFG["account_backends"].
+    """
+
+    name = ""
+    site = "clic"  # profil léger appliqué au Chrome de la voie
+
+    def can_serve(self, account: str) -> bool:
+        return True
+
+    def open(self, job: "ClicDetailScraper", driver):
+        """Connexion / page de départ ; une exception rend la voie indisponible."""
+
+    @abc.abstractmethod
+    def lookup(self, job: "ClicDetailScraper", driver, account: str) -> Optional[dict]:
+        """Fiche du compte (Téléphone, Courriel…), ou None si introuvable."""
+
+
+class ClicBackend(AccountBackend):
+    name = "clic"
+    site = "clic"
+
+    def can_serve(self, account: str) -> bool:
+        return len(_clean_acc(account)) <= CFG["clic_max_digits"]
+
+    def open(self, job, driver):
+        job._login_and_ready(driver)
+
+    def lookup(self, job, driver, account):
+        return job._scrape_one(account, driver)
+
+
+class CsrBackend(AccountBackend):
+    name = "csr"
+    site = "csr"
+
+    def can_serve(self, account: str) -> bool:
+        # recherche sur les 7 derniers chiffres (custId)
+        return len(_clean_acc(account)) >= CFG["csr_min_digits"]
+
+    def open(self, job, driver):
+        # CSR s'ouvre sur la session Clic+ : même login qu'avant le routage,
+        # quand la boucle CSR reprenait le Chrome connecté à Clic+
+        job._login_and_ready(driver)
+        # la stratégie de chargement reste celle du Chrome (fixée au lancement)
+        with contextlib.suppress(Exception):
+            light_profile(driver, "csr")
+
+    def lookup(self, job, driver, account):
+        return job._scrape_csr(account, driver)
+
+
+ACCOUNT_BACKENDS: dict[str, type] = {"clic": ClicBackend, "csr": CsrBackend}
+
+
+class _LaneStats:
+    """Débit et taux d'échec mesurés d'un backend, toutes voies confondues."""
+
+    def __init__(self):
+        self.ok = 0
+        self.failed = 0
+        self.busy = 0.0  # secondes passées en recherche, toutes voies
+        self.open_failures = 0
+        self.peak = 0
+
+    def rate(self) -> Optional[float]:
+        """Comptes réussis par minute et par voie (None tant que trop tôt)."""
+        if self.ok + self.failed < 3 or self.busy <= 0:
+            return None
+        return 60 * self.ok / self.busy
+
+    def error_rate(self) -> float:
+        n = self.ok + self.failed
+        return self.failed / n if n else 0.0
+
+
+class AccountRouter:
+    """
+    Répartit les comptes d'un ClicDetailScraper entre backends : chaque
+    compte va au premier backend de CFG["account_backends"] qui sait le
+    servir, puis chaque backend a son pool de voies (un Chrome chacune)
+    parmi CFG["account_lanes"]. Une voie dont la file est vide prend les
+    comptes d'une autre file qu'elle sait servir ; un compte en échec est
+    renvoyé vers un autre backend qui ne l'a pas encore essayé.
+
+    Toutes les 0,5 s, les voies libres vont d'abord à chaque backend dont
+    la file n'est pas vide (une voie chacun, dans l'ordre de préférence),
+    puis au backend le plus rapide (comptes réussis par minute et par voie :
+    les échecs comptent dans le temps passé). Une voie en surplus d'un
+    backend nettement plus lent est rendue au plus rapide, au plus une fois
+    toutes les RESHUFFLE_SEC (chaque déplacement coûte un Chrome et un
+    login). Avec une seule voie, l'ordre est celui d'avant : Clic+ puis CSR.
+    """
+
+    RESHUFFLE_SEC = 30
+
+    def __init__(self, job: "ClicDetailScraper", accounts: List[str]):
+        self.job = job
+        names = [n for n in CFG["account_backends"] if n in ACCOUNT_BACKENDS]
+        self.backends = {n: ACCOUNT_BACKENDS[n]() for n in names}
+        self.queues: dict[str, deque] = {n: deque() for n in names}
+        self.stats = {n: _LaneStats() for n in names}
+        self.lanes: list[tuple[str, threading.Thread, threading.Event]] = []
+        self.tried: dict[str, set] = {}
+        self.failed: List[str] = []
+        self.disabled: set[str] = set()
+        self.total = len(accounts)
+        self.done = 0
+        self._lock = threading.Lock()
+        self._shifted = 0.0
+        for acc in accounts:
+            self._route(acc)
+
+    # ---------- files ---------------------------------------------------
+    def _can(self, name: str, acc: str) -> bool:
+        return (
+            name not in self.disabled
+            and name not in self.tried.get(acc, ())
+            and self.backends[name].can_serve(acc)
+        )
+
+    def _route(self, acc: str) -> Optional[str]:
+        """File du premier backend qui peut servir `acc` (verrou tenu)."""
+        for name in self.backends:
+            if self._can(name, acc):
+                self.queues[name].append(acc)
+                return name
+        self.failed.append(acc)
+        self._tick()
+        return None
+
+    def _tick(self):
+        self.done += 1
+        self.job._progress(self.done, self.total)
+
+    def _take(self, name: str) -> Optional[str]:
+        with self._lock:
+            if self.queues[name]:
+                return self.queues[name].popleft()
+            for other, q in self.queues.items():
+                acc = next((a for a in q if self._can(name, a)), None)
+                if other != name and acc is not None:
+                    q.remove(acc)
+                    return acc
+        return None
+
+    def _finish(self, name: str, acc: str, info: Optional[dict], dt: float):
+        with self._lock:
+            st = self.stats[name]
+            st.busy += dt
+            if info:
+                st.ok += 1
+                self.job.rows.append(ACCOUNT_SCHEMA.make(info))
+                self._tick()
+                return
+            st.failed += 1
+            self.tried.setdefault(acc, set()).add(name)
+            alt = self._route(acc)
+        if alt:
+            self.job._dbg(f"↪ compte {acc} : échec {name} → {alt}")
+        else:
+            self.job._dbg(f"❌ compte {acc} : aucun backend n'a répondu")
+
+    def _disable(self, name: str):
+        """Backend injoignable : ses comptes repartent vers les autres."""
+        self.disabled.add(name)
+        todo, self.queues[name] = list(self.queues[name]), deque()
+        for acc in todo:
+            self._route(acc)
+        self.job._dbg(f"⚠ backend {name} désactivé, {len(todo)} compte(s) réorientés")
+
+    # ---------- voies ---------------------------------------------------
+    def _lane(self, name: str, retire: threading.Event):
+        job, backend = self.job, self.backends[name]
+        drv = None
+        try:
+            with job.metrics.span("driver_start"):
+                drv = build_driver(site=backend.site)
+            with self._lock:
+                if job.metrics.tracer is None:
+                    job.metrics.attach(drv)
+            with job.metrics.span("login"):
+                backend.open(job, drv)
+        except Exception as e:
+            job._dbg(f"❌ voie {name} indisponible : {e}")
+            with self._lock:
+                self.stats[name].open_failures += 1
+                if self.stats[name].open_failures >= 2:
+                    self._disable(name)
+            if drv:
+                with contextlib.suppress(Exception):
+                    drv.quit()
+            return
+        done = [0]  # comptes traités par la voie : repère du chien de garde
+
+        def mark():
+            return time.monotonic() if job.pause_evt.is_set() else done[0]
+
+        sup = DriverSupervisor(drv, mark, job._dbg, site=backend.site).start()
+        limit = CFG["driver_max_failures"]
+        fails = 0  # exceptions de suite, comme les pages de _run_ui
+        try:
+            while not (job._stop_evt.is_set() or retire.is_set()):
+                while job.pause_evt.is_set() and not job._stop_evt.is_set():
+                    time.sleep(0.3)
+                acc = self._take(name)
+                if acc is None:
+                    return
+                t, dead = time.perf_counter(), False
+                try:
+                    with job.metrics.span(f"scrape_{name}"):
+                        info = backend.lookup(job, sup.driver, acc)
+                    fails = 0
+                except Exception as e:
+                    job._dbg(f"❌ {name} {acc} : {e}")
+                    info, dead = None, driver_dead(e)
+                    fails += 1
+                done[0] += 1
+                if dead and fails <= limit:
+                    self._requeue(name, acc)  # Chrome perdu, pas le compte
+                else:
+                    self._finish(name, acc, info, time.perf_counter() - t)
+                # pas de cookies : la voie recyclée refait le login du backend
+                sup.checkpoint(cookies=False)
+                reason = (
+                    ("Chrome figé" if sup.stalled else None)
+                    or ("erreur" if dead or fails >= limit else None)
+                    or sup.due()
+                )
+                if reason and not self._recycle(name, sup, reason):
+                    return
+        finally:
+            sup.stop()
+            with contextlib.suppress(Exception):
+                sup.driver.quit()
+
+    def _requeue(self, name: str, acc: str):
+        """Remet `acc` en tête de la file `name`, sans le compter en échec."""
+        with self._lock:
+            self.queues[name].appendleft(acc)
+
+    def _recycle(self, name: str, sup: DriverSupervisor, reason: str) -> bool:
+        """Chrome neuf pour la voie, reconnecté ; False si la voie doit fermer."""
+        job, backend = self.job, self.backends[name]
+        job._dbg(f"♻ voie {name} : Chrome neuf ({reason})")
+        job.metrics.incr("driver_recycles")
+        try:
+            with job.metrics.span("driver_recycle"):
+                backend.open(job, sup.recycle(job.URL))
+            return True
+        except Exception as e:  # ses comptes restent en file pour les autres voies
+            job._dbg(f"❌ voie {name} : recyclage impossible ({e})")
+            return False
+
+    def _spawn(self, name: str):
+        retire = threading.Event()
+        t = threading.Thread(target=self._lane, args=(name, retire), daemon=True)
+        self.lanes.append((name, t, retire))
+        t.start()
+        n = sum(1 for ln in self.lanes if ln[0] == name)
+        self.stats[name].peak = max(self.stats[name].peak, n)
+        self.job._dbg(f"▶ voie {name} #{n}")
+
+    def _plan(self):
+        """Attribue les voies libres ; déplace au besoin une voie lente."""
+        with self._lock:
+            live = [n for n in self.backends if n not in self.disabled]
+            pending = [a for q in self.queues.values() for a in q]
+            servable = {n: sum(self._can(n, a) for a in pending) for n in live}
+            own = {n: bool(self.queues[n]) for n in live}
+        alive = {n: 0 for n in live}
+        for n, _, retire in self.lanes:
+            if n in alive and not retire.is_set():
+                alive[n] += 1
+        free = CFG["account_lanes"] - len(self.lanes)
+
+        for n in live:  # 1) une voie par backend qui a sa propre file
+            if free > 0 and own[n] and not alive[n]:
+                self._spawn(n)
+                alive[n] += 1
+                free -= 1
+        # 2) le reste au plus rapide qui a encore du travail pour une voie de plus
+        order = sorted(
+            (n for n in live if servable[n]),
+            key=lambda n: (self.stats[n].rate() or 0.0, servable[n]),
+            reverse=True,
+        )
+        for n in order:
+            while free > 0 and alive[n] < servable[n]:
+                self._spawn(n)
+                alive[n] += 1
+                free -= 1
+        # 3) voie rendue par un backend nettement plus lent
+        if free or not order or time.monotonic() - self._shifted < self.RESHUFFLE_SEC:
+            return
+        fast = order[0]
+        fast_rate = self.stats[fast].rate()
+        if fast_rate is None or alive[fast] >= servable[fast]:
+            return
+        for n, _, retire in self.lanes:
+            rate = self.stats[n].rate()
+            keep = 1 if own.get(n) else 0
+            if (
+                n != fast
+                and not retire.is_set()
+                and rate is not None
+                and rate < 0.8 * fast_rate
+                and alive[n] > keep
+            ):
+                retire.set()
+                self._shifted = time.monotonic()
+                self.job._dbg(
+                    f"⇄ voie {n} ({rate:.1f}/min) → {fast} ({fast_rate:.1f}/min)"
+                )
+                return
+
+    def run(self):
+        """Bloque jusqu'à ce que tous les comptes soient traités (ou stop)."""
+        for n, q in self.queues.items():
+            self.job._dbg(f"Routage – {n} : {len(q)} compte(s)")
+        if self.failed:
+            self.job._dbg(f"⚠ {len(self.failed)} compte(s) sans backend possible")
+        while not self.job._stop_evt.is_set():
+            self.lanes = [ln for ln in self.lanes if ln[1].is_alive()]
+            with self._lock:
+                pending = any(self.queues.values())
+            if not pending and not self.lanes:
+                break
+            if pending:
+                self._plan()
+            time.sleep(0.5)
+        for _, t, _ in self.lanes:
+            t.join()
+        for n, st in self.stats.items():
+            rate = st.rate()
+            self.job._dbg(
+                f"📊 {n} : {st.ok} ok, {st.failed} échec(s) "
+                f"({st.error_rate():.0%}), "
+                f"{'-' if rate is None else f'{rate:.1f}'}/min par voie, "
+                f"{st.peak} voie(s) max"
+            )
+
+
+class ClicDetailScraper(threading.Thread):
+    """
+    Lit un fichier *doors_*.json|csv, extrait la colonne « Compte client »,
+    puis va sur Clic+ pour récupérer les infos détaillées de chaque compte.
+    Les résultats sont exportés dans data/specifics_<prefix>_<ts>.csv
+    """
+
+    URL = "https://clicplus.int.videotron.com/vui/#/clic/infos-externes"
+
+    def __init__(
+        self,
+        doors_path: Path,
+        gui_q: queue.Queue,
+        pause_evt: threading.Event,
+        dest_dir: Path,
+        clic_user: str,
+        clic_pwd: str,
+        csr_code: str,
+    ):
+        super().__init__(daemon=True)
+        self.path = doors_path
+        self.gui_q = gui_q
+        self.pause_evt = pause_evt
+        self.driver: Optional[uc.Chrome] = None
+        self.clic_user = clic_user
+        self.clic_pwd = clic_pwd
+        self.csr_code = csr_code
+        self.rows: list[Record] = []  # ACCOUNT_SCHEMA
+        self.dest_dir = dest_dir
+        self._stop_evt = threading.Event()
+        self.metrics = RunMetrics("numbers")
+        self.profiler = RunProfiler()
+
+    def stop(self):
+        self._stop_evt.set()
+
+    # ---------- helpers --------------------------------------------------
+    def _dbg(self, txt: str):
+        self.gui_q.put(("log", txt))
+
+    def _progress(self, idx: int, total: int):
+        self.metrics.incr("accounts")
+        self.gui_q.put(("detail_progress", idx, total))
+        self.gui_q.put(
+            (
+                "metrics",
+                "accounts",
+                self.metrics.rate("accounts"),
+                self.metrics.eta("accounts", total),
+            )
+        )
+
+    def _with_retries(self, description: str, func, *args, **kwargs):
+        """Helper method for retrying operations with logging"""
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                self._dbg(
+                    f"  Attempting {description} (try {attempt + 1}/{max_retries})"
+                )
+                result = func(*args, **kwargs)
+                self._dbg(f"  ✓ {description} successful")
+                return result
+            except Exception as e:
+                if attempt == max_retries - 1:
+                    self._dbg(
+                        f"  ❌ {description} failed after {max_retries} attempts: {e}"
+                    )
+                    raise
+                self._dbg(
+                    f"  ⚠ {description} failed (attempt {attempt + 1}), retrying..."
+                )
+                time.sleep(1)
+
+    @staticmethod
+    def _accounts_from_file(fp: Path) -> list[str]:
+        if fp.suffix == ".json":
+            data = json.loads(fp.read_text(encoding="utf-8"))
+            return [d.get("Compte client") for d in data if d.get("Compte client")]
+        else:  # csv
+            with fp.open(encoding="utf-8") as f:
+                rdr = csv.DictReader(f)
+                return [
+                    row.get("Compte client") for row in rdr if row.get("Compte client")
+                ]
+
+    # ---------- selenium -------------------------------------------------
+    def _wait(self, by, sel, to=20):
+        return WebDriverWait(self.driver, to).until(
+            EC.visibility_of_element_located((by, sel))
+        )
+
+    # ───── ClicDetailScraper._login_and_ready  (remplace l'ancienne version)
+    def _login_and_ready(self, driver=None):
+        d = driver or self.driver
+        d.get(self.URL)
+
+        # ① — Fill in Clic+ credentials (username + password)
+        wait = WebDriverWait(d, 20)
+        try:
+            usr = wait.until(
                 EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='userName']"))
             )
             usr.clear()
@@ -432,9 +2143,9 @@ class ClicDetailScraper(threading.Thread):
             )
             self._dbg("✔ champ compte visible")
 
-    def _scrape_one(self, account: str) -> Optional[dict]:
+    def _scrape_one(self, account: str, driver=None) -> Optional[dict]:
         """Return a dict of all header fields—or None if phone never appeared."""
-        d = self.driver
+        d = driver or self.driver
         wait = WebDriverWait(d, 15)  # Increased timeout
         out = {"Compte client": account}
         self._dbg(f"\n🔍 Starting scrape for account: {account}")
@@ -589,8 +2300,8 @@ class ClicDetailScraper(threading.Thread):
         self._dbg(f"✓ Successfully scraped account {account}")
         return out
 
-    def _scrape_csr(self, account: str) -> Optional[dict]:
-        d = self.driver
+    def _scrape_csr(self, account: str, driver=None) -> Optional[dict]:
+        d = driver or self.driver
         wait = WebDriverWait(d, 20)
         out = {"Compte client": account}
         self._dbg(f"\n🔍 Starting CSR scrape for account: {account}")
@@ -760,6 +2471,7 @@ class ClicDetailScraper(threading.Thread):
 
     # ---------- thread main ---------------------------------------------
     def run(self):
+        self.profiler.start()
         try:
             # ── 0) read doors_* file, keep leading zeros ───────────────────
             self._dbg(f"\n📂 Reading input file: {self.path}")
@@ -793,64 +2505,19 @@ class ClicDetailScraper(threading.Thread):
             self._dbg(f"\n📋 Found {len(accts)} accounts to process")
             self._dbg(f"First 5 accounts: {accts[:5]}")
 
-            # split ⇢ Clic+ vs CSR
-            clic_accts = [a for a in accts if len(_clean_acc(a)) <= 8]
-            csr_accts = [a for a in accts if len(_clean_acc(a)) > 8]
-            self._dbg(
-                f"Split accounts - Clic+: {len(clic_accts)}, CSR: {len(csr_accts)}"
-            )
-            if clic_accts:
-                self._dbg(f"First 5 Clic+ accounts: {clic_accts[:5]}")
-            if csr_accts:
-                self._dbg(f"First 5 CSR accounts: {csr_accts[:5]}")
-
-            self.driver = build_driver()
-            self._dbg("✓ Initialized Chrome driver")
-
-            # ── 1) scrape Clic+ ------------------------------------------------
-            if clic_accts:
-                self._dbg("\n🔄 Starting Clic+ scraping")
-                self._login_and_ready()
-                for idx, acc in enumerate(clic_accts, 1):
-                    if self._stop_evt.is_set():
-                        break
-                    while self.pause_evt.is_set():
-                        time.sleep(0.3)
-                    info = self._scrape_one(acc)
-                    if info:
-                        self.rows.append(info)
-                        self._dbg(f"✓ Added Clic+ data for account {acc}")
-                        self._dbg(f"  • Phone: {info.get('Téléphone', 'N/A')}")
-                        self._dbg(f"  • Email: {info.get('Courriel', 'N/A')}")
-                    else:
-                        self._dbg(f"❌ Failed to get Clic+ data for account {acc}")
-                    self.gui_q.put(("detail_progress", idx, len(accts)))
-
-            # ── 2) scrape CSR --------------------------------------------------
-            if csr_accts:
-                self._dbg("\n🔄 Starting CSR scraping")
-                for idx, acc in enumerate(csr_accts, len(clic_accts) + 1):
-                    if self._stop_evt.is_set():
-                        break
-                    while self.pause_evt.is_set():
-                        time.sleep(0.3)
-                    info = self._scrape_csr(acc)
-                    if info:
-                        self.rows.append(info)
-                        self._dbg(f"✓ Added CSR data for account {acc}")
-                        self._dbg(f"  • Phone: {info.get('Téléphone', 'N/A')}")
-                        self._dbg(f"  • Email: {info.get('Courriel', 'N/A')}")
-                    else:
-                        self._dbg(f"❌ Failed to get CSR data for account {acc}")
-                    self.gui_q.put(("detail_progress", idx, len(accts)))
+            # ── 1) Clic+ / CSR : voies réparties par le routeur ─────────────
+            AccountRouter(self, accts).run()
 
-            # ── 3) merge phones/emails back into doors_df ---------------------
+            # ── 2) merge phones/emails back into doors_df ---------------------
             if not self.rows:
                 self._dbg("❌ No results found during scraping")
                 return
 
             self._dbg(f"\n🔄 Starting merge process with {len(self.rows)} results")
-            specs_df = pd.DataFrame(self.rows)
+            t_merge = time.perf_counter()
+            specs_df = pd.DataFrame(
+                [r.values for r in self.rows], columns=ACCOUNT_SCHEMA.header
+            )
 
             # Debug: Show the specs data
             self._dbg(f"\n📊 Specs data preview:")
@@ -917,7 +2584,7 @@ class ClicDetailScraper(threading.Thread):
             else:
                 self._dbg("✓ All accounts have phone numbers!")
 
-            # ── 4) build the 8-column template --------------------------------
+            # ── 3) build the 8-column template --------------------------------
             get = lambda col: merged[col] if col in merged.columns else ""
             output = pd.DataFrame(
                 {
@@ -932,19 +2599,22 @@ class ClicDetailScraper(threading.Thread):
                 }
             )
             self._dbg("✓ Built output template")
+            self.metrics.record("merge", time.perf_counter() - t_merge)
 
             # Debug: Show the final output data
             self._dbg(f"\n📊 Final output preview:")
             self._dbg(f"Columns: {', '.join(output.columns)}")
             self._dbg(f"First 5 rows:\n{output.head().to_string()}")
 
-            # ── 5) export ------------------------------------------------------
+            # ── 4) export ------------------------------------------------------
             ts = datetime.now().strftime("%Y%m%d-%H%M%S")
             prefix = _slug(self.path.stem.replace("doors_", ""))
             out_xlsx = self.dest_dir / f"specifics_{prefix}_{ts}.xlsx"
 
             self._dbg(f"\n💾 Exporting to Excel: {out_xlsx}")
-            with pd.ExcelWriter(out_xlsx, engine="openpyxl") as wr:
+            with self.metrics.span("export"), pd.ExcelWriter(
+                out_xlsx, engine="openpyxl"
+            ) as wr:
                 output.to_excel(wr, index=False)
             self._dbg(f"✓ Successfully exported to Excel")
 
@@ -970,7 +2640,9 @@ class ClicDetailScraper(threading.Thread):
 
                 # If we have any scraped data, merge it
                 if hasattr(self, "rows") and self.rows:
-                    specs_df = pd.DataFrame(self.rows)
+                    specs_df = pd.DataFrame(
+                        [r.values for r in self.rows], columns=ACCOUNT_SCHEMA.header
+                    )
 
                     # Normalize account numbers for matching
                     doors_df["acct_digits"] = doors_df["Compte client"].str.replace(
@@ -1047,60 +2719,777 @@ class ClicDetailScraper(threading.Thread):
             self.gui_q.put(("error", str(e)))
 
         finally:
+            self._write_metrics()
             if self.driver:
                 with contextlib.suppress(Exception):
                     self._dbg("Closing Chrome driver")
                     self.driver.quit()
 
+    def _write_metrics(self):
+        try:
+            ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+            prefix = _slug(self.path.stem.replace("doors_", ""))
+            for p in self.metrics.write(self.dest_dir, prefix, ts, self.profiler):
+                self._dbg(f"📈 Metrics → {p.name}")
+            if self.metrics.tracer:
+                self._dbg("\n📊 WebDriver commands per operation:")
+                for line in self.metrics.tracer.report_lines():
+                    self._dbg("  " + line)
+        except Exception as e:
+            self._dbg(f"⚠ Could not save metrics: {e}")
+
+
+# ── Pagination Salesforce ───────────────────────────────────────────────
+_JS_PICK_PAGE_SIZE = """
+const [target, pager] = arguments;
+const boxes = [...document.querySelectorAll(pager)];
+const sels = new Set(boxes.flatMap(b => [...b.querySelectorAll('select')]));
+for (const sel of sels) {
+  const vals = [...sel.options].map(o => parseInt(o.value, 10));
+  if (vals.length < 2 || vals.some(isNaN)) continue;
+  const best = Math.max(...vals.filter(v => v <= target));
+  if (!isFinite(best) || parseInt(sel.value, 10) === best) continue;
+  sel.value = String(best);
+  sel.dispatchEvent(new Event('change', {bubbles: true}));
+  return best;
+}
+return null;
+"""
 
-# ── Thread Worker ───────────────────────────────────────────────────────
-class SalesforceScraper(threading.Thread):
-    LOGIN_URL = "https://v.my.site.com/resi/login"
 
-    def __init__(
-        self,
-        user: str,
-        pwd: str,
-        city: str,
-        street: Optional[str],
-        rta: Optional[str],  # déjà présent
-        gui_q: queue.Queue,
-        pause_evt: threading.Event,
-        dest_dir: Path,
-    ):
-        super().__init__(daemon=True)
+class ResultsPager:
+    """
+    Navigation dans la liste de résultats Salesforce (`table.list`).
+
+    • `enlarge()` demande la plus grande taille de page que la vue accepte
+      (sélecteur « lignes par page », paramètre d'URL ou liens « Afficher
+      plus ») : moins de pages, donc moins d'allers-retours.
+    • `goto(n)` saute directement à la page n quand la pagination est portée
+      par l'URL du lien « suivant » ; sinon on clique « suivant » sans
+      ouvrir les fiches — c'est ce qu'utilise une reprise de run.
+    • `next()` reprend la logique historique (flèche `nextArrow`).
+    """
 
-        # ── mémorisation complète ───────────────────────────
-        self.user = user
-        self.pwd = pwd
-        self.city = city
-        self.street = street
-        self.rta = rta  # ← AJOUT OBLIGATOIRE
-        self.dest_dir = dest_dir
-        # ----------------------------------------------------
+    ROWS = (By.CSS_SELECTOR, "table.list tr.dataRow")
+    # conteneurs de pagination de la vue liste : seul endroit où chercher le
+    # sélecteur « lignes par page » (pas les filtres ni les listes de la page)
+    PAGER = ".pSearchShowMore, .paginator, .listElementBottomNav, .bNext"
+    BUSY = (By.CSS_SELECTOR, ".waitingSearchDiv, .loadingIndicator, .x-mask-loading")
+    QUIET_SEC = 1.5  # sans sablier ni changement après ce délai : rien ne recharge
+    NEXT_IMG = (By.CSS_SELECTOR, ".pSearchShowMore a.nextArrow > img")
+    PAGE_KEYS = ("page", "pgNum", "pageNum")
+    OFFSET_KEYS = ("lsr", "offset", "start")
+    SIZE_KEYS = ("rowsperpage", "rpp", "pageSize")
+    SHOW_MORE = (
+        By.XPATH,
+        "//div[contains(@class,'pSearchShowMore')]//a["
+        "contains(normalize-space(.),'Afficher plus') or "
+        "contains(normalize-space(.),'Show more')]",
+    )
 
-        self.gui_q = gui_q
-        self.pause_evt = pause_evt
-        self._stop_evt = threading.Event()
-        self.driver: Optional[uc.Chrome] = None
-        self.doors: List[dict] = []
-        self.curr_page = 0
+    def __init__(self, driver, log):
+        self.d = driver
+        self._log = log
+        self.page = 1
+        self.page_size: Optional[int] = None
+        self._url_paging: Optional[tuple[str, str, str]] = None  # url, kind, key
 
-        ts = datetime.utcnow().strftime("%Y%m%d")
-        self.log_path = LOG_DIR / f"scraper_{ts}.log"
+    # ---------- helpers --------------------------------------------------
+    def rows(self) -> int:
+        return len(self.d.find_elements(*self.ROWS))
 
-    # ---- helpers de log -------------------------------------------------
-    def _dbg(self, msg: str):
-        ts = datetime.now().strftime("[%H:%M:%S] ")
-        # vers GUI
-        self.gui_q.put(("log", ts + msg))
-        # vers fichier
-        with open(self.log_path, "a", encoding="utf-8") as f:
-            f.write(ts + msg + "\n")
+    def _table(self):
+        tables = self.d.find_elements(By.CSS_SELECTOR, "table.list")
+        return tables[0] if tables else None
 
-    def _safe(self, label: str, func, *args, **kwargs):
-        """Exécute func en loguant début/fin/erreur."""
-        self._dbg(f"⇒ {label}…")
+    def _wait_rows_change(self, before: int, old=None, timeout: int = 10):
+        """
+        Attend que la liste soit rechargée : ancien tableau `old` détaché ou
+        nombre de lignes changé, et plus de sablier. Si ni sablier ni
+        changement n'apparaît dans les QUIET_SEC premières secondes, la vue
+        n'a pas rechargé : on rend la main sans attendre `timeout`.
+        """
+        t0, busy_seen = time.monotonic(), [False]
+
+        def settled(d):
+            if any(e.is_displayed() for e in d.find_elements(*self.BUSY)):
+                busy_seen[0] = True
+                return False
+            if old is not None and EC.staleness_of(old)(d):
+                return len(d.find_elements(*self.ROWS)) > 0
+            if len(d.find_elements(*self.ROWS)) not in (0, before) or busy_seen[0]:
+                return True
+            return time.monotonic() - t0 > self.QUIET_SEC
+
+        with contextlib.suppress(TimeoutException):
+            WebDriverWait(self.d, timeout, poll_frequency=0.2).until(settled)
+
+    def _detect_url_paging(self) -> Optional[tuple[str, str, str]]:
+        """(url du lien suivant, 'page'|'offset', clé) si l'URL porte la page."""
+        try:
+            a = self.d.find_element(By.CSS_SELECTOR, ".pSearchShowMore a.nextArrow")
+            href = a.get_attribute("href") or ""
+        except NoSuchElementException:
+            return None
+        if not href.startswith("http"):
+            return None  # javascript:… → état côté page
+        q = dict(parse_qsl(urlsplit(href).query))
+        for kind, keys in (("page", self.PAGE_KEYS), ("offset", self.OFFSET_KEYS)):
+            for k in keys:
+                if k in q:
+                    return href, kind, k
+        return None
+
+    def _url_for(self, page: int, size: Optional[int] = None) -> str:
+        href, kind, key = self._url_paging
+        parts = urlsplit(href)
+        q = dict(parse_qsl(parts.query))
+        size = size or self.page_size
+        q[key] = str(page if kind == "page" else (page - 1) * (size or 0))
+        for k in self.SIZE_KEYS:
+            if k in q and size:
+                q[k] = str(size)
+        return urlunsplit(parts._replace(query=urlencode(q)))
+
+    def _load(self, url: str):
+        self.d.get(url)
+        WebDriverWait(self.d, 15).until(EC.visibility_of_element_located(self.ROWS))
+
+    # ---------- API ------------------------------------------------------
+    def enlarge(self, target: int) -> int:
+        """Agrandit la page courante jusqu'à `target` lignes si possible."""
+        before, old = self.rows(), self._table()
+        try:
+            picked = self.d.execute_script(_JS_PICK_PAGE_SIZE, target, self.PAGER)
+            if picked:
+                self._wait_rows_change(before, old)
+                self._log(f"✔ taille de page → {picked}")
+            else:
+                self._url_paging = self._detect_url_paging()
+                href = self._url_paging[0] if self._url_paging else ""
+                if any(f"{k}=" in href for k in self.SIZE_KEYS):
+                    self._load(self._url_for(1, target))
+                    self._log(f"✔ taille de page → {target} (URL)")
+                else:
+                    for _ in range(max(0, target // max(1, before) - 1)):
+                        links = self.d.find_elements(*self.SHOW_MORE)
+                        if not links or self.rows() >= target:
+                            break
+                        n, old = self.rows(), self._table()
+                        self.d.execute_script("arguments[0].click();", links[0])
+                        self._wait_rows_change(n, old)
+                        if self.rows() <= n:
+                            break
+        except Exception as e:
+            self._log(f"⚠ agrandissement de page impossible ({e})")
+        self.page_size = self.rows() or before
+        self._url_paging = self._detect_url_paging()
+        self._log(
+            f"pagination : {self.page_size} lignes/page, "
+            + ("saut par URL" if self._url_paging else "clic « suivant »")
+        )
+        return self.page_size
+
+    def is_last(self) -> bool:
+        self.d.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        img = WebDriverWait(self.d, 5).until(
+            EC.presence_of_element_located(self.NEXT_IMG)
+        )
+        return "disabled" in (img.get_attribute("src") or "")
+
+    def next(self) -> bool:
+        """Passe à la page suivante ; False si on était sur la dernière."""
+        if self.is_last():
+            return False
+        if self._url_paging:
+            self._load(self._url_for(self.page + 1))
+        else:
+            old_tbl = self.d.find_element(By.CSS_SELECTOR, "table.list")
+            nxt_img = self.d.find_element(*self.NEXT_IMG)
+            self._log("click Page suivante")
+            self.d.execute_script("arguments[0].parentElement.click()", nxt_img)
+            # ❶ attendre que l'ancien tableau devienne obsolète,
+            #    puis ❷ attendre que le nouveau soit prêt
+            WebDriverWait(self.d, 10).until(EC.staleness_of(old_tbl))
+            WebDriverWait(self.d, 15).until(
+                EC.visibility_of_element_located(self.ROWS)
+            )
+        self.page += 1
+        return True
+
+    def goto(self, page: int) -> bool:
+        """Va directement à la page `page` (sans ouvrir de fiche)."""
+        if page == self.page:
+            return True
+        if self._url_paging:
+            self._load(self._url_for(page))
+            self.page = page
+            self._log(f"↷ saut direct page {page}")
+            return True
+        if page < self.page:
+            return False
+        while self.page < page:
+            if not self.next():
+                return False
+        self._log(f"↷ page {page} atteinte")
+        return True
+
+
+# ── Pipeline liste → fiches ─────────────────────────────────────────────
+class DetailPipeline:
+    """
+    File bornée producteur → consommateurs. La voie « liste » (driver
+    principal de `scraper`) pousse les hrefs de chaque page pendant que les
+    voies « fiche » (un Chrome cloné par voie) les consomment : pagination et
+    chargement des fiches se recouvrent. Stop/pause sont ceux du scraper ;
+    la progression d'une page n'est émise qu'une fois toutes ses fiches
+    traitées, et dans l'ordre des pages.
+    """
+
+    def __init__(self, scraper: "SalesforceScraper", drivers: list):
+        self.s = scraper
+        self.drivers = drivers
+        self.q: queue.Queue = queue.Queue(maxsize=CFG["link_queue_size"])
+        self._lock = threading.Lock()
+        self._pending: dict[int, int] = {}
+        self._pages: deque = deque()  # (page_no, range_text) dans l'ordre
+        self._threads = [
+            threading.Thread(target=self._work, args=(i,), daemon=True)
+            for i in range(len(drivers))
+        ]
+        self._closed = False
+
+    def start(self) -> "DetailPipeline":
+        for t in self._threads:
+            t.start()
+        return self
+
+    def feed(self, page_no: int, range_text: str, links: list[str]):
+        """Publie les hrefs d'une page ; bloque quand la file est pleine."""
+        with self._lock:
+            self._pending[page_no] = len(links)
+            self._pages.append((page_no, range_text))
+        if not links:  # page entièrement pré-filtrée
+            self._flush()
+        for href in links:
+            while not self.s._stop_evt.is_set():
+                with contextlib.suppress(queue.Full):
+                    self.q.put((page_no, href), timeout=0.5)
+                    break
+
+    def _work(self, i: int):
+        """
+        Voie « fiche » sous superviseur : chaque fiche compte comme une page
+        (recyclage, RSS) ; le chien de garde ne surveille que la fiche en
+        cours, une voie qui attend la file n'est pas figée.
+        """
+        s = self.s
+        busy = [False, 0]  # fiche en cours ?, fiches traitées
+
+        def mark():
+            if not busy[0] or s.pause_evt.is_set():
+                return time.monotonic()
+            return busy[1]
+
+        sup = DriverSupervisor(self.drivers[i], mark, s._dbg, s.metrics.tracer)
+        sup.start()
+        try:
+            while True:
+                try:
+                    item = self.q.get(timeout=0.5)
+                except queue.Empty:
+                    if s._stop_evt.is_set():
+                        return
+                    continue
+                if item is None or s._stop_evt.is_set():
+                    return
+                s._wait_if_paused()
+                page_no, href = item
+                busy[0] = True
+                try:
+                    s._process_href(href, sup.driver)
+                except Exception as e:  # une fiche ratée ne ferme pas la voie
+                    s._dbg(f"❌ fiche {href} : {e}")
+                finally:
+                    busy[0] = False
+                    busy[1] += 1
+                    self._done(page_no)
+                sup.checkpoint()
+                reason = ("Chrome figé" if sup.stalled else None) or sup.due()
+                if reason:
+                    self._recycle(i, sup, reason)
+        finally:
+            sup.stop()
+
+    def _recycle(self, i: int, sup: DriverSupervisor, reason: str):
+        s = self.s
+        s._dbg(f"♻ voie fiche #{i + 1} : Chrome neuf ({reason})")
+        s.metrics.incr("driver_recycles")
+        try:
+            with s.metrics.span("driver_recycle"):
+                self.drivers[i] = sup.recycle(s.home_url or s.LOGIN_URL)
+        except Exception as e:  # les fiches suivantes échoueront et seront notées
+            s._dbg(f"⚠ voie fiche #{i + 1} : recyclage impossible ({e})")
+
+    def _done(self, page_no: int):
+        with self._lock:
+            self._pending[page_no] -= 1
+        self._flush()
+
+    def _flush(self):
+        ready = []
+        with self._lock:
+            while self._pages and self._pending[self._pages[0][0]] <= 0:
+                ready.append(self._pages.popleft())
+        for done_page, range_text in ready:
+            self.s._page_progress(done_page, range_text)
+
+    def close(self):
+        """Vide la file (sentinelles), attend les voies et ferme leurs Chrome."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._threads:
+            while any(t.is_alive() for t in self._threads):
+                with contextlib.suppress(queue.Full):
+                    self.q.put(None, timeout=0.5)
+                    break
+        for t in self._threads:
+            t.join()
+        for drv in self.drivers:
+            with contextlib.suppress(Exception):
+                drv.quit()
+
+
+# ── API Salesforce (requête groupée) ────────────────────────────────────
+class SalesforceAPI:
+    """
+    Client REST minimal qui réutilise la session ouverte par `_login`
+    (cookie `sid` du navigateur). `base_url` est la racine du site, p. ex.
+    https://v.my.site.com/resi ; CFG["sf_api_base"] permet de viser un
+    endpoint local de substitution pour les essais.
+    """
+
+    def __init__(self, base_url: str, sid: str, session=None):
+        self.base = base_url.rstrip("/")
+        self.version = CFG["sf_api_version"]
+        self.s = session or requests.Session()
+        self.s.headers.update(
+            {"Authorization": f"Bearer {sid}", "Accept": "application/json"}
+        )
+
+    @classmethod
+    def from_driver(cls, driver, login_url: str) -> "SalesforceAPI":
+        base = CFG["sf_api_base"] or login_url.rsplit("/login", 1)[0]
+        sid = next(
+            (c["value"] for c in driver.get_cookies() if c.get("name") == "sid"), None
+        )
+        if not sid:
+            raise RuntimeError("cookie de session 'sid' introuvable")
+        return cls(base, sid)
+
+    def _url(self, path: str) -> str:
+        if path.startswith("http"):
+            return path
+        parts = urlsplit(self.base)
+        if parts.path and path.startswith(parts.path + "/"):
+            return f"{parts.scheme}://{parts.netloc}{path}"  # déjà préfixé
+        return self.base + path
+
+    def _get(self, path: str, **kw) -> dict:
+        r = self.s.get(self._url(path), timeout=60, **kw)
+        r.raise_for_status()
+        return r.json()
+
+    def describe(self, sobject: str) -> dict:
+        return self._get(f"/services/data/v{self.version}/sobjects/{sobject}/describe")
+
+    def query_pages(self, soql: str, batch_size: int = 2000):
+        """Itère les pages serveur d'une SOQL : (records, totalSize)."""
+        res = self._get(
+            f"/services/data/v{self.version}/query",
+            params={"q": soql},
+            headers={"Sforce-Query-Options": f"batchSize={batch_size}"},
+        )
+        while True:
+            yield res.get("records", []), res.get("totalSize")
+            if res.get("done", True) or not res.get("nextRecordsUrl"):
+                return
+            res = self._get(res["nextRecordsUrl"])
+
+
+def _soql_str(v: str, like: bool = False) -> str:
+    v = v.replace("\\", "\\\\").replace("'", "\\'")
+    if like:
+        v = v.replace("%", "\\%").replace("_", "\\_")
+    return v
+
+
+class BulkDoorQuery:
+    """
+    Les filtres de `_search_and_filter` (Actif=Oui, RTA, Ville, Rue) en une
+    seule SOQL sur Residences__c. Les champs sont retrouvés par LIBELLÉ via
+    describe, si bien que chaque enregistrement sort avec les mêmes clés
+    que la fiche HTML (« Client », « Compte client », …).
+    """
+
+    SOBJECT = "Residences__c"
+    SKIP_TYPES = {"address", "location", "base64"}
+
+    def __init__(self, api: SalesforceAPI):
+        self.api = api
+        fields = api.describe(self.SOBJECT)["fields"]
+        self.by_label = {f["label"]: f for f in fields}
+        # chemin SOQL → libellé ; les lookups exposent le Name de la cible
+        self.select: dict[str, str] = {}
+        for f in fields:
+            if f["type"] in self.SKIP_TYPES or f["name"] == "Id":
+                continue
+            if f["type"] == "reference" and f.get("relationshipName"):
+                self.select[f"{f['relationshipName']}.Name"] = f["label"]
+            else:
+                self.select[f["name"]] = f["label"]
+
+    def _cond(self, label: str, value: str) -> str:
+        f = self.by_label.get(label)
+        if not f:
+            raise KeyError(f"champ « {label} » absent de {self.SOBJECT}")
+        if f["type"] == "boolean":
+            return f"{f['name']} = {'true' if value == 'Oui' else 'false'}"
+        if f["type"] in ("picklist", "multipicklist"):
+            return f"{f['name']} = '{_soql_str(value)}'"
+        # texte : « contient », comme le panneau de filtres
+        return f"{f['name']} LIKE '%{_soql_str(value, like=True)}%'"
+
+    def soql(self, city: str, street: Optional[str], rta: Optional[str]) -> str:
+        where = [self._cond("Actif", "Oui"), self._cond("Ville", city)]
+        if street:
+            where.append(self._cond("Rue", street))
+        if rta:
+            where.append(self._cond("RTA", rta))
+        cols = ", ".join(["Id", *self.select])
+        return f"SELECT {cols} FROM {self.SOBJECT} WHERE {' AND '.join(where)}"
+
+    def _record(self, raw: dict) -> dict:
+        rec = {}
+        for path, label in self.select.items():
+            v = raw
+            for part in path.split("."):
+                v = v.get(part) if isinstance(v, dict) else None
+            if isinstance(v, bool):
+                v = "Oui" if v else "Non"
+            elif v is not None and not isinstance(v, str):
+                v = str(v)
+            rec[label] = (v.strip() or None) if isinstance(v, str) else v
+        return rec
+
+    def batches(self, city: str, street: Optional[str], rta: Optional[str]):
+        """Itère (liste de (Id, fiche), totalSize) par page serveur."""
+        soql = self.soql(city, street, rta)
+        for records, total in self.api.query_pages(soql, CFG["sf_api_batch_size"]):
+            yield [(r.get("Id"), self._record(r)) for r in records], total
+
+
+_SFID_RX = re.compile(r"^[a-zA-Z0-9]{15}(?:[a-zA-Z0-9]{3})?$")
+
+
+def _row_signature(cells: dict) -> str:
+    """
+    Empreinte d'une ligne de résultats : ses colonnes visibles, ou seulement
+    CFG["signature_columns"] (ex. une colonne « Dernière modification »).
+    """
+    cols = CFG["signature_columns"] or sorted(cells)
+    raw = json.dumps([[c, cells.get(c)] for c in cols], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def door_key(href_or_id: str, rec=None) -> str:
+    """
+    Clé stable d'une résidence, la même pour le run et le registre : l'Id
+    Salesforce (15 car.) tiré du lien de la fiche (…/a0r5G00000abcDE?srPos=0)
+    ou de l'Id API ; sinon le compte client de `rec` (fiche ou cellules de
+    la ligne) en « acct:<chiffres> » ; sinon le lien tel quel.
+    """
+    parts = urlsplit(href_or_id or "")
+    q = dict(parse_qsl(parts.query))
+    for seg in [q.get("id", ""), *reversed(parts.path.split("/"))]:
+        if _SFID_RX.match(seg):
+            return seg[:15]
+    acct = re.sub(r"\D", "", str((rec or {}).get("Compte client") or ""))
+    return f"acct:{acct}" if acct else href_or_id
+
+
+# ── Pré-filtrage des lignes de résultats ────────────────────────────────
+_JS_READ_ROWS = """
+const tbl = document.querySelector('table.list');
+if (!tbl) return [];
+const hdr = tbl.querySelector('tr.headerRow');
+const labels = hdr ? [...hdr.children].map(c => c.innerText.trim()) : [];
+return [...tbl.querySelectorAll('tr.dataRow')].map(tr => {
+  const a = tr.querySelector('th a');
+  const cells = {};
+  [...tr.children].forEach((c, i) => {
+    if (labels[i]) cells[labels[i]] = c.innerText.trim();
+  });
+  return {href: a ? a.href : null, cells: cells};
+});
+"""
+
+
+class RowFilter:
+    """
+    Règles d'exclusion de CFG["row_filters"], évaluées sur les colonnes
+    visibles d'une ligne de `table.list` AVANT d'ouvrir la fiche, puis sur
+    les champs de la fiche en filet de sécurité. Une règle :
+    {"column": "Client", "contains" | "equals" | "regex": "…"}. Avec une
+    liste de colonnes, seule la première non vide est testée (« Client,
+    sinon Compte client »), comme l'ancien test des fiches. Sur une ligne
+    de liste (`partial`), une colonne absente de la vue ne décide rien ; sur
+    une fiche, un champ absent compte comme vide.
+    """
+
+    def __init__(self, rules: Optional[list] = None):
+        self.rules: list[tuple[tuple[str, ...], re.Pattern]] = []
+        for r in CFG["row_filters"] if rules is None else rules:
+            if "regex" in r:
+                rx = re.compile(r["regex"], re.I)
+            elif "equals" in r:
+                rx = re.compile(rf"^\s*{re.escape(r['equals'])}\s*$", re.I)
+            else:
+                rx = re.compile(re.escape(r["contains"]), re.I)
+            cols = r["column"]
+            self.rules.append(((cols,) if isinstance(cols, str) else tuple(cols), rx))
+
+    @staticmethod
+    def _first(fields, cols: tuple[str, ...], partial: bool):
+        """(colonne, valeur) de la 1re colonne non vide ; None si indécidable."""
+        for col in cols:
+            if partial and col not in fields:
+                return None  # on ne sait pas si elle aurait été vide
+            v = fields.get(col)
+            if v:
+                return col, v
+        return None
+
+    def rejects(self, fields: dict, partial: bool = False) -> Optional[str]:
+        """Renvoie « colonne=valeur » de la 1re règle qui écarte, sinon None."""
+        for cols, rx in self.rules:
+            hit = self._first(fields, cols, partial)
+            if hit and rx.search(hit[1]):
+                return f"{hit[0]}={hit[1]}"
+        return None
+
+
+# ── Registre des portes (SQLite) ────────────────────────────────────────
+class DoorStore:
+    """
+    Registre local de toutes les portes déjà collectées, d'un run à l'autre :
+    une ligne par résidence (clé stable), avec la fiche, le lieu de la
+    recherche, la signature de sa ligne de liste et les horodatages
+    first_seen / last_seen / fetched_at. Les
+    exports sont des requêtes sur ce registre. Partagé entre threads (voies
+    du pipeline, rues d'une ville) : une connexion, un verrou.
+    """
+
+    def __init__(self, path: Path | str | None = None):
+        path = Path(path or CFG["door_store"])
+        self.path = path if path.is_absolute() else DATA_DIR / path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS doors (
+                   key        TEXT PRIMARY KEY,
+                   city       TEXT,
+                   street     TEXT,
+                   rta        TEXT,
+                   record     TEXT NOT NULL,
+                   first_seen REAL NOT NULL,
+                   last_seen  REAL NOT NULL,
+                   fetched_at REAL,
+                   signature  TEXT
+               )"""
+        )
+        cols = {r[1] for r in self._db.execute("PRAGMA table_info(doors)")}
+        if "signature" not in cols:  # registre créé avant les signatures
+            self._db.execute("ALTER TABLE doors ADD COLUMN signature TEXT")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS doors_scope ON doors (city, last_seen)"
+        )
+
+    def upsert(
+        self,
+        key: str,
+        rec: Record,
+        city: str,
+        street: Optional[str],
+        rta: Optional[str],
+        fetched: bool = True,
+        signature: Optional[str] = None,
+    ):
+        """
+        Insère ou met à jour la porte `key` et la signature de la ligne d'où
+        vient la fiche. `fetched=False` (fiche reprise du registre) ne fait
+        que repousser last_seen.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                """INSERT INTO doors
+                       (key, city, street, rta, record,
+                        first_seen, last_seen, fetched_at, signature)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (key) DO UPDATE SET
+                       city       = excluded.city,
+                       street     = coalesce(excluded.street, doors.street),
+                       rta        = coalesce(excluded.rta, doors.rta),
+                       last_seen  = excluded.last_seen,
+                       record     = CASE WHEN excluded.fetched_at IS NULL
+                                         THEN doors.record
+                                         ELSE excluded.record END,
+                       signature  = CASE WHEN excluded.fetched_at IS NULL
+                                         THEN doors.signature
+                                         ELSE excluded.signature END,
+                       fetched_at = coalesce(excluded.fetched_at, doors.fetched_at)
+                """,
+                (
+                    key,
+                    city,
+                    street,
+                    rta,
+                    json.dumps(rec.to_dict(), ensure_ascii=False),
+                    now,
+                    now,
+                    now if fetched else None,
+                    signature,
+                ),
+            )
+
+    def reusable(
+        self,
+        keys: list[str],
+        max_age_sec: float,
+        signatures: Optional[dict[str, str]] = None,
+    ) -> dict[str, Record]:
+        """
+        Fiches des `keys` qu'il est inutile de relire : ligne inchangée
+        (même signature que `signatures[key]`) ou fiche lue il y a moins de
+        `max_age_sec` secondes.
+        """
+        if not keys:
+            return {}
+        signatures = signatures or {}
+        since = time.time() - max_age_sec if max_age_sec > 0 else math.inf
+        out: dict[str, Record] = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):  # limite de variables SQLite
+                chunk = keys[i : i + 500]
+                rows = self._db.execute(
+                    f"""SELECT key, record, fetched_at, signature FROM doors
+                        WHERE fetched_at IS NOT NULL
+                          AND key IN ({",".join("?" * len(chunk))})""",
+                    chunk,
+                )
+                for key, record, fetched_at, sig in rows:
+                    if fetched_at >= since or (sig and sig == signatures.get(key)):
+                        out[key] = DOOR_SCHEMA.make(json.loads(record))
+        return out
+
+    def select(self, keys: list[str]) -> list[Record]:
+        """
+        Portes `keys` dans cet ordre (celles d'un run) : un run concurrent
+        sur la même ville, ou une autre RTA, n'y ajoute rien.
+        """
+        found: dict[str, Record] = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):  # limite de variables SQLite
+                chunk = keys[i : i + 500]
+                rows = self._db.execute(
+                    f"""SELECT key, record FROM doors
+                        WHERE key IN ({",".join("?" * len(chunk))})""",
+                    chunk,
+                )
+                for key, record in rows:
+                    found[key] = DOOR_SCHEMA.make(json.loads(record))
+        return [found[k] for k in keys if k in found]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# ── Thread Worker ───────────────────────────────────────────────────────
+class SalesforceScraper(threading.Thread):
+    LOGIN_URL = "https://v.my.site.com/resi/login"
+
+    def __init__(
+        self,
+        user: str,
+        pwd: str,
+        city: str,
+        street: Optional[str],
+        rta: Optional[str],  # déjà présent
+        gui_q: queue.Queue,
+        pause_evt: threading.Event,
+        dest_dir: Path,
+        start_page: int = 1,
+        warm: Optional["DriverWarmer"] = None,
+    ):
+        super().__init__(daemon=True)
+        self.warm = warm  # Chrome pré-chauffé par la GUI
+        self._t_start: Optional[float] = None  # Start → page de login
+
+        # ── mémorisation complète ───────────────────────────
+        self.user = user
+        self.pwd = pwd
+        self.city = city
+        self.street = street
+        self.rta = rta  # ← AJOUT OBLIGATOIRE
+        self.dest_dir = dest_dir
+        self.start_page = start_page  # reprise : page où le run précédent s'est arrêté
+        self.done_page = start_page - 1  # dernière page dont toutes les fiches sont lues
+        self.walked_page = start_page - 1  # dernière page lue et confiée/traitée
+        self.home_url: Optional[str] = None  # page d'accueil après login
+        # ----------------------------------------------------
+
+        self.gui_q = gui_q
+        self.pause_evt = pause_evt
+        self._stop_evt = threading.Event()
+        self.driver: Optional[uc.Chrome] = None
+        self.doors: List[Record] = []  # DOOR_SCHEMA
+        self.curr_page = 0
+        self.total_items: Optional[int] = None
+        self.total_pages: Optional[int] = None
+        self._doors_lock = threading.Lock()
+        self._door_keys: dict[str, int] = {}  # clé résidence → index dans doors
+        self.detail_workers = CFG["detail_workers"]
+        self.row_filter = RowFilter()
+        self._pipe: Optional[DetailPipeline] = None
+        self.supervisor: Optional[DriverSupervisor] = None
+        self._rows_seen = 0  # propre à ce scraper (métriques partagées par les rues)
+        self.store: Optional[DoorStore] = None
+        self._row_sigs: dict[str, str] = {}  # lien de ligne → signature (à relire)
+        self.started = time.time()  # début du run
+        self.metrics = RunMetrics("doors")
+        self.profiler = RunProfiler()
+
+        ts = datetime.utcnow().strftime("%Y%m%d")
+        self.log_path = LOG_DIR / f"scraper_{ts}.log"
+
+    # ---- helpers de log -------------------------------------------------
+    def _dbg(self, msg: str):
+        ts = datetime.now().strftime("[%H:%M:%S] ")
+        # vers GUI
+        self.gui_q.put(("log", ts + msg))
+        # vers fichier
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(ts + msg + "\n")
+
+    def _safe(self, label: str, func, *args, **kwargs):
+        """Exécute func en loguant début/fin/erreur."""
+        self._dbg(f"⇒ {label}…")
         try:
             res = func(*args, **kwargs)
             self._dbg(f"✔ {label} OK")
@@ -1117,10 +3506,16 @@ class SalesforceScraper(threading.Thread):
     def _login(self) -> bool:
         d = self.driver
         self._dbg("Nav → login page")
-        d.get(self.LOGIN_URL)
+        if not d.current_url.startswith(self.LOGIN_URL):  # pas pré-chargée
+            d.get(self.LOGIN_URL)
 
         # username
         usr = self._safe("find #username", wait_visible, d, By.ID, "username")
+        if self._t_start is not None:  # 1er login du run seulement
+            ttl = time.perf_counter() - self._t_start
+            self._t_start = None
+            self.metrics.gauge("time_to_login_page_sec", round(ttl, 2))
+            self._dbg(f"page de login en {ttl:.1f}s")
         usr.clear()
         usr.send_keys(self.user)
 
@@ -1138,6 +3533,11 @@ class SalesforceScraper(threading.Thread):
         self._safe("click #Login", wait_visible, d, By.ID, "Login").click()
 
         # attendre phSearchInput (MFA incluse)
+        with self.metrics.span("mfa"):
+            return self._wait_logged_in()
+
+    def _wait_logged_in(self) -> bool:
+        d = self.driver
         try:
             self._dbg("⏳ wait phSearchInput")
             wait_visible(d, By.ID, "phSearchInput", timeout=CFG["mfa_timeout_sec"])
@@ -1256,331 +3656,2099 @@ class SalesforceScraper(threading.Thread):
         except Exception as e:
             self._dbg(f"❌ Impossible de saisir ville/rue : {e}")
 
-        # 5) Cliquer sur Appliquer les filtres
+        # 5) Cliquer sur Appliquer les filtres
+        try:
+            apply_btn = WebDriverWait(d, 15).until(
+                EC.element_to_be_clickable((By.ID, "save_filter_Residences__c"))
+            )
+            d.execute_script("arguments[0].scrollIntoView(true);", apply_btn)
+            apply_btn.click()
+            self._dbg("✔ filtres appliqués (ID)")
+        except TimeoutException:
+            self._dbg("⚠ bouton apply non trouvé par ID, tentative XPath…")
+            try:
+                apply_btn = WebDriverWait(d, 5).until(
+                    EC.element_to_be_clickable(
+                        (By.XPATH, "//input[@value='Appliquer les filtres']")
+                    )
+                )
+                d.execute_script("arguments[0].scrollIntoView(true);", apply_btn)
+                apply_btn.click()
+                self._dbg("✔ filtres appliqués (XPath)")
+            except Exception as e2:
+                self._dbg(f"❌ échec apply fallback XPath ({e2})")
+                raise
+
+        time.sleep(5)
+        # 5) Attendre la table des résultats
+        WebDriverWait(d, 15).until(
+            EC.visibility_of_element_located((By.CSS_SELECTOR, "table.list"))
+        )
+        self._dbg("✔ table.list visible, prêt à parser")
+
+    # ─── telebot/handlers/salesforce_scraper.py  (ou le fichier équivalent) ────
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    def _parse_door(self, d) -> dict | None:
+        """Parse la fiche affichée dans `d` (paires <td> label / valeur)."""
+        tbl = safe_find(d, "#ep table.detailList")  # votre helper existant
+        tds = [td.text.strip() or None for td in tbl.find_elements(By.TAG_NAME, "td")]
+
+        rec = {
+            tds[i]: tds[i + 1]
+            for i in range(0, len(tds), 2)
+            if i + 1 < len(tds) and tds[i]
+        }
+
+        # ← NEW: drop any "fizz" clients (row_filters)
+        why = self.row_filter.rejects(rec)
+        if why:
+            self._dbg(f"⚠ Skipping {why}")
+            return None
+
+        self._dbg(f"✓ parsed {len(rec)} fields")
+        return rec
+
+    def _scrape_door(self, href: str, driver=None) -> dict | None:
+        """
+        1. Ouvre <href> dans un NOUVEL onglet (fini les filtres qui sautent).
+        2. Parse exactement comme avant avec safe_find + <td> pairs.
+        3. Ferme l'onglet et revient sur la liste.
+        Avec `driver` (voie « fiche » du pipeline) la fiche est chargée
+        directement dans ce Chrome dédié, sans jeu d'onglets.
+        """
+        if self._stop_evt.is_set():
+            return None
+
+        if driver is not None:
+            try:
+                driver.get(href)
+                return self._parse_door(driver)
+            except Exception as e:
+                self._dbg(f"❌ detail fail ({e})")
+                return None
+
+        d = self.driver
+        wait = WebDriverWait(d, 5)
+        main = d.current_window_handle
+
+        # ── 1) nouvel onglet vierge
+        d.switch_to.new_window("tab")
+        d.get(href)
+
+        try:
+            # ── 2) parsing "ancien style" — on ne change rien
+            return self._parse_door(d)
+
+        except Exception as e:
+            self._dbg(f"❌ detail fail ({e})")
+            return None
+
+        finally:
+            # ── 3) nettoyage
+            try:
+                d.close()  # referme l'onglet détail
+            finally:
+                d.switch_to.window(main)  # retourne à la liste
+                # petit wait pour garantir que la table est de nouveau interactive
+                wait.until(
+                    EC.visibility_of_element_located(
+                        (By.CSS_SELECTOR, "table.list tr.dataRow")
+                    )
+                )
+
+    # ---- exports ---------------------------------------------------------
+    def _prefix(self) -> str:
+        parts = [_slug(self.city)]
+        if self.street:
+            parts.append(_slug(self.street))
+        if self.rta:
+            parts.append(_slug(self.rta))
+        return "_".join(parts)
+
+    def _export(self, ts: str) -> tuple[Path, Path]:
+        """Écrit doors_<prefix>_<ts>.json/.csv dans le dossier choisi."""
+        prefix = self._prefix()
+        out_json = self.dest_dir / f"doors_{prefix}_{ts}.json"
+        out_csv = self.dest_dir / f"doors_{prefix}_{ts}.csv"
+
+        # les fiches vues pendant ce run, lues dans le registre s'il y en a un
+        if self.store:
+            doors = self.store.select(list(self._door_keys))
+        else:
+            doors = self.doors
+
+        # ① JSON (toujours, même vide)
+        out_json.write_text(
+            json.dumps([rec.to_dict() for rec in doors], ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+
+        # ② CSV — en-tête donné par le schéma, même sans porte
+        with out_csv.open("w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["city", "street", "rta"] + DOOR_SCHEMA.header)
+            loc = (self.city, self.street or "", self.rta or "")
+            for rec in doors:
+                w.writerow([*loc, *("" if v is None else v for v in rec.values)])
+        return out_json, out_csv
+
+    # ---- pages & fiches ------------------------------------------------
+    def _wait_if_paused(self):
+        while self.pause_evt.is_set() and not self._stop_evt.is_set():
+            time.sleep(0.3)
+
+    def _read_page(self, page_no: int) -> tuple[str, list[dict]]:
+        """
+        Lit `.itemsRange` (→ total) puis, en UN aller-retour, toutes les lignes
+        de la page : [{"href": …, "cells": {colonne: texte}}].
+        """
+        try:
+            range_text = (
+                WebDriverWait(self.driver, 5)
+                .until(
+                    EC.visibility_of_element_located((By.CSS_SELECTOR, ".itemsRange"))
+                )
+                .text
+            )  # ex. "(1-25)" ou "1-25 de 340"
+        except TimeoutException:
+            range_text = "(?)"
+
+        first, last, total = _parse_items_range(range_text)
+        if total and first and last and self.total_pages is None:
+            self.total_items = total
+            self.total_pages = math.ceil(total / max(1, last - first + 1))
+            self.metrics.gauge("total_items", total)
+            self.metrics.gauge("total_pages", self.total_pages)
+            self._dbg(f"≈ {total} fiches sur {self.total_pages} pages")
+
+        self._dbg(f"=== PAGE {page_no} {range_text} ===")
+
+        with self.metrics.span("read_rows"):
+            rows = self.driver.execute_script(_JS_READ_ROWS) or []
+        return range_text, [r for r in rows if r.get("href")]
+
+    def _select_rows(self, rows: list[dict]) -> list[str]:
+        """Hrefs des lignes qui méritent une fiche ; les autres sont comptées."""
+        kept = []
+        for r in rows:
+            why = self.row_filter.rejects(r["cells"], partial=True)
+            if why:
+                self._dbg(f"⚠ ligne écartée sans ouvrir la fiche ({why})")
+                continue
+            kept.append(r)
+        skipped = len(rows) - len(kept)
+        if skipped:
+            self._count_rows(skipped)
+            self.metrics.incr("rows_prefiltered", skipped)
+        if self._door_keys:  # déjà collectées (p. ex. par l'API avant la reprise UI)
+            kept = [
+                r
+                for r in kept
+                if door_key(r["href"], r["cells"]) not in self._door_keys
+            ]
+        kept = self._carry_known(kept)
+        if CFG["list_only"]:
+            return self._records_from_rows(kept)
+        return [r["href"] for r in kept]
+
+    def _carry_known(self, rows: list[dict]) -> list[dict]:
+        """
+        Reprend du registre les résidences dont la ligne n'a pas changé
+        depuis la dernière lecture de la fiche (signature identique) ou dont
+        la fiche date de moins de CFG["door_store_fresh_hours"] ; renvoie
+        les lignes nouvelles ou modifiées.
+        """
+        if not self.store or not rows:
+            return rows
+        keys = [door_key(r["href"], r["cells"]) for r in rows]
+        sigs = {}
+        if CFG["row_signatures"]:
+            sigs = {k: _row_signature(r["cells"]) for k, r in zip(keys, rows)}
+        known = self.store.reusable(keys, CFG["door_store_fresh_hours"] * 3600, sigs)
+        # seules les lignes à relire gardent leur signature, jusqu'à leur fiche
+        for k, r in zip(keys, rows):
+            if k in sigs and k not in known:
+                self._row_sigs[r["href"]] = sigs[k]
+        if not known:
+            return rows
+        for key in known:
+            self._count_rows()
+            self.metrics.incr("rows_from_store")
+            if self._add_door(key, known[key], fetched=False):
+                self.metrics.incr("doors")
+        self._emit_metrics()
+        self._dbg(f"{len(known)} fiche(s) inchangée(s) reprise(s) du registre")
+        return [r for r, k in zip(rows, keys) if k not in known]
+
+    def _records_from_rows(self, rows: list[dict]) -> list[str]:
+        """
+        Mode « liste seule » : la fiche est construite à partir des colonnes
+        de la ligne (CFG["list_fields"], renommées via CFG["list_column_map"]
+        si la vue les libelle autrement). Une cellule vide donne un champ vide
+        (None), comme une valeur vide de la fiche ; seules les lignes où une
+        colonne manque à la vue repartent vers la fiche détaillée, leurs hrefs
+        sont renvoyés.
+        """
+        col_of = {f: f for f in CFG["list_fields"]}
+        col_of.update({f: col for col, f in CFG["list_column_map"].items()})
+        fallback = []
+        for r in rows:
+            cells = r["cells"]
+            if any(col not in cells for col in col_of.values()):
+                fallback.append(r["href"])
+                continue
+            rec = {f: cells[col] or None for f, col in col_of.items()}
+            self._count_rows()
+            self.metrics.incr("rows_from_list")
+            if self._add_door(r["href"], rec):
+                self.metrics.incr("doors")
+        if len(fallback) < len(rows):
+            self._emit_metrics()
+        if fallback:
+            self._dbg(f"colonne(s) absente(s) de la vue → {len(fallback)} fiche(s)")
+        return fallback
+
+    def _count_rows(self, n: int = 1):
+        """Lignes traitées : métriques du job et repère de ce scraper."""
+        self._rows_seen += n
+        self.metrics.incr("rows", n)
+
+    def _process_href(self, href: str, driver=None):
+        with self.metrics.span("scrape_door"):
+            rec = self._scrape_door(href, driver)
+        self._count_rows()
+        if rec and self._add_door(href, rec):
+            self.metrics.incr("doors")
+        self._row_sigs.pop(href, None)  # fiche écartée ou illisible
+        self._emit_metrics()
+
+    def _add_door(self, ref: str, rec, fetched: bool = True) -> bool:
+        """
+        Enregistre la fiche (projetée sur DOOR_SCHEMA) dans le registre puis
+        l'ajoute au run sauf si la résidence (lien, Id ou clé) est déjà
+        collectée.
+        """
+        rec = DOOR_SCHEMA.make(rec)
+        key = door_key(ref, rec)
+        if self.store:
+            self.store.upsert(
+                key,
+                rec,
+                self.city,
+                self.street,
+                self.rta,
+                fetched,
+                self._row_sigs.pop(ref, None),
+            )
+        return self._remember(key, rec)
+
+    def _remember(self, key: str, rec: Record) -> bool:
+        with self._doors_lock:
+            if key in self._door_keys:
+                return False
+            self._door_keys[key] = len(self.doors)
+            self.doors.append(rec)
+            return True
+
+    def _page_progress(self, page_no: int, range_text: str):
+        self.done_page = max(self.done_page, page_no)
+        if self.total_items:
+            pct = min(1.0, self.metrics.counters.get("rows", 0) / self.total_items)
+        else:
+            pct = None if self.total_pages is None else page_no / self.total_pages
+        self.gui_q.put(("progress", page_no, range_text, len(self.doors), pct))
+
+    def _start_pipeline(self) -> Optional[DetailPipeline]:
+        """Ouvre les voies « fiche » (sessions clonées) si configurées."""
+        n = min(self.detail_workers, CFG["max_parallel_tabs"])
+        if n <= 0:
+            return None
+        drivers = []
+        for i in range(n):
+            try:
+                with self.metrics.span("driver_start"):
+                    drivers.append(clone_session(self.driver, self.metrics.tracer))
+            except Exception as e:
+                self._dbg(f"⚠ voie fiche #{i + 1} indisponible ({e})")
+                break
+        if not drivers:
+            self._dbg("⚠ pipeline indisponible → mode séquentiel")
+            return None
+        self._dbg(f"✔ pipeline : {len(drivers)} voie(s) fiche")
+        return DetailPipeline(self, drivers).start()
+
+    def _emit_metrics(self):
+        self.gui_q.put(
+            (
+                "metrics",
+                "doors",
+                self.metrics.rate("doors"),
+                self.metrics.eta("rows", self.total_items),
+            )
+        )
+
+    def _run_api(self) -> bool:
+        """
+        Mode requête groupée (CFG["sf_fetch_mode"] = "api") : une SOQL paginée
+        côté serveur au lieu du parcours fiche par fiche. Renvoie False si
+        l'API est inaccessible ou tombe en cours de pagination, pour que run()
+        retombe sur le parcours UI : les fiches déjà reçues sont gardées et
+        leurs lignes ne rouvrent pas de fiche (même clé de résidence).
+        """
+        try:
+            with self.metrics.span("api_connect"):
+                api = SalesforceAPI.from_driver(self.driver, self.LOGIN_URL)
+                query = BulkDoorQuery(api)
+                self._dbg(f"API → {query.soql(self.city, self.street, self.rta)}")
+                pages = query.batches(self.city, self.street, self.rta)
+                batch, total = next(pages, (None, None))
+        except Exception as e:
+            self._dbg(f"⚠ API indisponible ({e}) → parcours UI")
+            return False
+
+        page_no = 0
+        while batch is not None and not self._stop_evt.is_set():
+            page_no += 1
+            self.total_items = total
+            for rid, rec in batch:
+                self._count_rows()
+                if self.row_filter.rejects(rec):
+                    continue
+                if self._add_door(rid, rec):
+                    self.metrics.incr("doors")
+            self._emit_metrics()
+            self._page_progress(page_no, f"({len(self.doors)}/{total})")
+            self._wait_if_paused()
+            try:
+                with self.metrics.span("api_page"):
+                    batch, total = next(pages, (None, None))
+            except Exception as e:
+                self._dbg(
+                    f"⚠ API : échec après la page {page_no} ({e}) → parcours UI, "
+                    f"{len(self.doors)} fiche(s) gardée(s)"
+                )
+                return False
+        return True
+
+    def _open_results(self, page: int) -> ResultsPager:
+        """Recherche + filtres, grandes pages, puis saut direct à `page`."""
+        with self.metrics.span("search_and_filter"):
+            self._search_and_filter()
+
+        pager = ResultsPager(self.driver, self._dbg)
+        if CFG["sf_nav_mode"] == "fast":
+            with self.metrics.span("enlarge_page"):
+                pager.enlarge(CFG["sf_page_size"])
+        if page > 1:
+            with self.metrics.span("pagination"):
+                if not pager.goto(page):
+                    raise RuntimeError(f"page {page} inaccessible")
+        return pager
+
+    def _walk_page(self, pager: ResultsPager) -> bool:
+        """Traite la page courante puis avance ; False après la dernière."""
+        page_no = self.curr_page = pager.page
+
+        # ── (1) plage "x‑y de N" + (2) lignes de la page ────────────
+        range_text, rows = self._read_page(page_no)
+        if not rows:  # aucune ligne => on s'arrête
+            self._dbg("🚨 aucun enregistrement trouvé, arrêt boucle")
+            return False
+        links = self._select_rows(rows)
+
+        # ── (3) fiches : en ligne, ou confiées aux voies du pipeline
+        if self._pipe:
+            self._pipe.feed(page_no, range_text, links)
+        else:
+            for href in links:
+                if self._stop_evt.is_set():
+                    return False
+                self._wait_if_paused()
+                self._process_href(href)
+            self._page_progress(page_no, range_text)
+        self.walked_page = max(self.walked_page, page_no)
+
+        # --- (4) tenter d'avancer ------------------------------------------------
+        with self.metrics.span("pagination"):
+            try:
+                if not pager.next():  # dernière page ?
+                    self.total_pages = page_no
+                    return False
+
+            except StaleElementReferenceException as e:
+                self._dbg(f"stale element récupéré → retry ({e})")
+                return True  # relance immédiatement la boucle
+
+            except Exception as e:
+                self._dbg(f"no next page ({e})")
+                self.total_pages = page_no
+                return False
+        return True
+
+    def _progress_mark(self):
+        """Repère du chien de garde : bouge tant que le job avance (ou en pause)."""
+        if self.pause_evt.is_set():
+            return time.monotonic()
+        return self._rows_seen, self.walked_page
+
+    def _recycle(self, reason: str) -> ResultsPager:
+        """
+        Chrome neuf (cookies du dernier point de contrôle, sinon nouveau
+        login), puis reprise à la page qui suit la dernière parcourue. Les
+        fiches déjà collectées restent dans self.doors.
+        """
+        page = self.walked_page + 1
+        self._dbg(f"♻ recyclage Chrome ({reason}) → reprise page {page}")
+        self.metrics.incr("driver_recycles")
+        with self.metrics.span("driver_recycle"):
+            self.driver = self.supervisor.recycle(self.home_url or self.LOGIN_URL)
+            self.metrics.attach(self.driver)
+            try:
+                wait_visible(self.driver, By.ID, "phSearchInput", timeout=15)
+            except Exception:
+                self._dbg("session expirée → nouveau login")
+                if not self._login():
+                    raise RuntimeError("reconnexion impossible")
+        return self._open_results(page)
+
+    def _run_ui(self):
+        """Parcours historique : recherche + filtres puis page par page."""
+        pager = self._open_results(self.start_page)
+        self._pipe = self._start_pipeline()
+        own = self.supervisor is None  # sinon celui de la session (rues)
+        if own:
+            self.supervisor = DriverSupervisor(
+                self.driver, self._progress_mark, self._dbg, self.metrics.tracer
+            ).start()
+        failures = 0
+        more = True
+        try:
+            while more and not self._stop_evt.is_set():
+                self._wait_if_paused()
+                try:
+                    more = self._walk_page(pager)
+                    failures = 0
+                except Exception as e:
+                    failures += 1
+                    if (
+                        self._stop_evt.is_set()
+                        or failures > CFG["driver_max_failures"]
+                    ):
+                        raise
+                    self._dbg(f"❌ page {self.walked_page + 1} : {e}")
+                    stalled = self.supervisor.stalled
+                    pager = self._recycle("Chrome figé" if stalled else "erreur")
+                    continue
+                self.supervisor.checkpoint()
+                reason = more and self.supervisor.due()
+                if reason:
+                    pager = self._recycle(reason)
+        finally:
+            # voies fiche vidées et arrêtées avant tout export, même sur erreur
+            if self._pipe:
+                self._pipe.close()
+            if own:
+                self.supervisor.stop()
+                self.supervisor = None
+
+    # ---- main thread method --------------------------------------------
+    def run(self):
+        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+        exported = False
+        self.started = time.time()
+        self._t_start = time.perf_counter()
+        self.profiler.start()
+        try:
+            with self.metrics.span("driver_start"):
+                self.driver = (self.warm and self.warm.take()) or build_driver()
+            self.metrics.attach(self.driver)
+            if CFG["door_store"]:
+                self.store = DoorStore()
+            with self.metrics.span("login"):
+                if not self._login():
+                    return
+            self.home_url = self.driver.current_url
+            if not (CFG["sf_fetch_mode"] == "api" and self._run_api()):
+                self._run_ui()
+
+            # ── (5) EXPORTS ─────────────────────────────────────────────
+            with self.metrics.span("export"):
+                out_json, out_csv = self._export(ts)
+            exported = True
+
+            # ③ notification GUI + ouverture du dossier
+            self.gui_q.put(("done", str(out_json), str(out_csv), len(self.doors)))
+            open_folder(self.dest_dir)
+
+        except Exception as e:
+            self._dbg(f"FATAL ERROR {e}")
+            self.gui_q.put(("error", str(e)))
+        finally:
+            # — EXPORT inconditionnel (si le run a avorté) ---------------------
+            try:
+                if not exported and self.doors:
+                    out_json, out_csv = self._export(ts)
+                    self.gui_q.put(
+                        ("done", str(out_json), str(out_csv), len(self.doors))
+                    )
+                elif not exported:
+                    self._dbg("aucune porte collectée — rien à exporter")
+                for p in self.metrics.write(
+                    self.dest_dir, self._prefix(), ts, self.profiler
+                ):
+                    self._dbg(f"📈 metrics → {p.name}")
+                if self.metrics.tracer:
+                    self._dbg("📊 commandes WebDriver par opération :")
+                    for line in self.metrics.tracer.report_lines():
+                        self._dbg("  " + line)
+            except Exception as exp:
+                self._dbg(f"❌ export final failed : {exp}")
+            finally:
+                if self._pipe:
+                    with contextlib.suppress(Exception):
+                        self._pipe.close()
+                if self.store:
+                    self.store.close()
+                if self.driver:
+                    with contextlib.suppress(Exception):
+                        self._dbg("Quitting Chrome")
+                        self.driver.quit()
+
+
+# ── Découpage d'une ville en rues (sessions parallèles) ─────────────────
+class _ShardRelay:
+    """File vers la GUI qui ne laisse passer que les logs d'un sous-job."""
+
+    FORWARD = {"log", "mfa_wait"}
+
+    def __init__(self, gui_q: queue.Queue):
+        self.gui_q = gui_q
+
+    def put(self, item, *args, **kwargs):
+        if item[0] in self.FORWARD:
+            self.gui_q.put(item)
+
+
+class ShardedCityScraper(SalesforceScraper):
+    """
+    Job « ville entière » découpé en une recherche par rue. Un seul login
+    (MFA comprise), puis CFG["shard_sessions"] sessions clonées se partagent
+    la liste des rues ; les fiches sont fusionnées et dédoublonnées par Id
+    de résidence dans un unique export doors_<ville>_<ts>.
+    """
+
+    def __init__(self, *args, streets: Optional[List[str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.streets = streets
+        self.failed_streets: List[str] = []
+        self._streets_done = 0
+
+    def _resolve_streets(self) -> List[str]:
+        self.streets = city_streets(self.city, self.streets)
+        return self.streets
+
+    def _child(self, street: str, driver) -> SalesforceScraper:
+        child = SalesforceScraper(
+            self.user,
+            self.pwd,
+            self.city,
+            street,
+            self.rta,
+            _ShardRelay(self.gui_q),
+            self.pause_evt,
+            self.dest_dir,
+        )
+        child.driver = driver
+        child.home_url = self.home_url
+        child._stop_evt = self._stop_evt
+        child.metrics = self.metrics
+        child.store = self.store
+        child.started = self.started
+        child.log_path = self.log_path
+        child.detail_workers = 0  # le parallélisme vient des sessions
+        return child
+
+    def _lane(self, i: int, drivers: list, todo: queue.Queue, total: int):
+        """
+        Une session : ses rues l'une après l'autre, sous un superviseur
+        unique (les pages comptent d'une rue à l'autre ; le repère du chien
+        de garde est celui de la rue en cours, pas celui des autres sessions).
+        """
+        cur: list = [None]
+
+        def mark():
+            child = cur[0]
+            if child is None:
+                return time.monotonic()  # entre deux rues
+            return child.street, *child._progress_mark()
+
+        sup = DriverSupervisor(drivers[i], mark, self._dbg, self.metrics.tracer)
+        sup.start()
+        try:
+            self._lane_streets(i, drivers, todo, total, sup, cur)
+        finally:
+            sup.stop()
+
+    def _lane_streets(self, i, drivers, todo, total, sup, cur):
+        while not self._stop_evt.is_set():
+            try:
+                street = todo.get_nowait()
+            except queue.Empty:
+                return
+            self._wait_if_paused()
+            child = self._child(street, drivers[i])
+            child.supervisor = sup
+            cur[0] = child
+            try:
+                with self.metrics.span("shard_street"):
+                    child._run_ui()
+            except Exception as e:
+                self._dbg(f"❌ rue {street} : {e}")
+                self.failed_streets.append(street)
+            cur[0] = None
+            drivers[i] = child.driver  # Chrome éventuellement recyclé par la rue
+            added = sum(  # déjà dans le registre via la rue
+                self._remember(k, child.doors[i]) for k, i in child._door_keys.items()
+            )
+            with self._doors_lock:
+                self._streets_done += 1
+                done = self._streets_done
+            self._dbg(f"✔ rue {street} : {len(child.doors)} fiches, {added} nouvelles")
+            self.metrics.incr("streets")
+            self.gui_q.put(("progress", done, street, len(self.doors), done / total))
+            self.gui_q.put(
+                (
+                    "metrics",
+                    "doors",
+                    self.metrics.rate("doors"),
+                    self.metrics.eta("streets", total),
+                )
+            )
+
+    def _run_ui(self):
+        streets = self._resolve_streets()
+        if not streets:
+            self._dbg("⚠ aucune rue connue → recherche ville entière")
+            return super()._run_ui()
+        todo: queue.Queue = queue.Queue()
+        for st in streets:
+            todo.put(st)
+
+        drivers = [self.driver]
+        n = min(CFG["shard_sessions"], CFG["max_parallel_tabs"], len(streets))
+        for i in range(1, n):
+            try:
+                with self.metrics.span("driver_start"):
+                    drivers.append(clone_session(self.driver, self.metrics.tracer))
+            except Exception as e:
+                self._dbg(f"⚠ session #{i + 1} indisponible ({e})")
+                break
+        self._dbg(f"▶ {len(streets)} rues sur {len(drivers)} session(s)")
+
+        lanes = [
+            threading.Thread(
+                target=self._lane, args=(i, drivers, todo, len(streets)), daemon=True
+            )
+            for i in range(len(drivers))
+        ]
+        for t in lanes:
+            t.start()
+        for t in lanes:
+            t.join()
+        self.driver = drivers[0]
+        for drv in drivers[1:]:
+            with contextlib.suppress(Exception):
+                drv.quit()
+        if self.failed_streets:
+            self._dbg(f"⚠ rues en échec : {', '.join(self.failed_streets)}")
+
+
+def make_doors_scraper(
+    user: str,
+    pwd: str,
+    city: str,
+    street: Optional[str],
+    rta: Optional[str],
+    gui_q: queue.Queue,
+    pause_evt: threading.Event,
+    dest_dir: Path,
+    warm: Optional[DriverWarmer] = None,
+    start_page: int = 1,
+) -> SalesforceScraper:
+    """
+    Job « portes » : découpé par rue pour une ville entière si configuré,
+    ou pour les seules rues d'une RTA postale connue de l'index. Une reprise
+    (`start_page` > 1) continue une recherche unique : pas de découpage.
+    """
+    args = (user, pwd, city, street, rta, gui_q, pause_evt)
+    if start_page > 1:
+        return SalesforceScraper(
+            *args, dest_dir=dest_dir, warm=warm, start_page=start_page
+        )
+    in_rta = None
+    if not street:
+        in_rta = rta_streets(city, rta, lambda msg: gui_q.put(("log", msg)))
+    if in_rta:
+        # RTA postale indexée : une recherche par rue de la RTA, pas la ville
+        return ShardedCityScraper(
+            *args, dest_dir=dest_dir, warm=warm, streets=in_rta
+        )
+    if not street and CFG["shard_sessions"] > 1:
+        return ShardedCityScraper(*args, dest_dir=dest_dir, warm=warm)
+    return SalesforceScraper(*args, dest_dir=dest_dir, warm=warm)
+
+
+class DriverWarmer:
+    """
+    Chrome préparé en arrière-plan dès l'ouverture de la GUI, pendant que
+    l'utilisateur saisit ses identifiants : chromedriver patché (ou repris
+    du cache), navigateur lancé et page de login Salesforce déjà chargée.
+    Le job qui le prend (`take`) démarre donc directement sur le login.
+    """
+
+    def __init__(self, log):
+        self.log = log
+        self.t0 = time.perf_counter()
+        self.login_page_sec: Optional[float] = None
+        self._driver = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._warm, daemon=True)
+
+    def start(self) -> "DriverWarmer":
+        self._thread.start()
+        return self
+
+    def _warm(self):
+        try:
+            drv = build_driver()
+            drv.get(SalesforceScraper.LOGIN_URL)
+            self.login_page_sec = time.perf_counter() - self.t0
+        except Exception as e:
+            self.log(f"⚠ pré-chauffage Chrome impossible ({e})")
+            return
+        with self._lock:
+            self._driver = drv
+        self.log(f"⚡ Chrome prêt : page de login en {self.login_page_sec:.1f}s")
+
+    def take(self):
+        """Le Chrome préparé (attend la fin du pré-chauffage), ou None."""
+        self._thread.join()
+        with self._lock:
+            drv, self._driver = self._driver, None
+        if drv is not None:
+            with contextlib.suppress(Exception):
+                drv.title  # encore vivant ?
+                return drv
+            with contextlib.suppress(Exception):
+                drv.quit()
+        return None
+
+    def taken(self) -> bool:
+        return not self._thread.is_alive() and self._driver is None
+
+    def close(self):
+        with self._lock:
+            drv, self._driver = self._driver, None
+        if drv is not None:
+            with contextlib.suppress(Exception):
+                drv.quit()
+
+
+# ── Exécution des jobs : thread du GUI ou processus dédié ───────────────
+def _job_factory(kind: str):
+    return {"doors": make_doors_scraper, "numbers": ClicDetailScraper}[kind]
+
+
+def _job_main(kind: str, kwargs: dict, events, pause_evt, stop_evt, cfg: dict):
+    """Point d'entrée du processus d'un job (doit rester importable)."""
+    apply_config(cfg)  # réglages en mémoire du parent
+    job = _job_factory(kind)(gui_q=events, pause_evt=pause_evt, **kwargs)
+
+    def relay_stop():
+        stop_evt.wait()
+        job.stop()
+
+    threading.Thread(target=relay_stop, daemon=True).start()
+    job.run()  # dans le thread principal du processus
+
+
+class ProcessJob:
+    """
+    Job exécuté dans son propre processus, avec la même interface que les
+    scrapers-threads (start / stop / is_alive). Logs et progression
+    reviennent par `events` (multiprocessing.Queue, mêmes tuples que
+    gui_q) ; pause et arrêt passent par des multiprocessing.Event. Un
+    processus qui meurt sans message final est signalé par ("error", …).
+    """
+
+    def __init__(self, kind: str, events, pause_evt, **kwargs):
+        ctx = multiprocessing.get_context("spawn")
+        self.kind = kind
+        self.events = events
+        self._stop_evt = ctx.Event()
+        self.proc = ctx.Process(
+            target=_job_main,
+            args=(kind, kwargs, events, pause_evt, self._stop_evt, dict(CFG)),
+            name=f"hotbot-{kind}",
+            daemon=True,
+        )
+
+    def start(self):
+        self.proc.start()
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def _watch(self):
+        self.proc.join()
+        if self.proc.exitcode:
+            self.events.put(
+                (
+                    "error",
+                    f"job {self.kind} : processus arrêté (code {self.proc.exitcode})",
+                )
+            )
+
+    def stop(self):
+        self._stop_evt.set()
+
+    def is_alive(self) -> bool:
+        return self.proc.is_alive()
+
+
+def job_channel():
+    """
+    (file d'événements, événement de pause) adaptés à CFG["job_backend"] :
+    queue.Queue / threading.Event pour « thread », leurs équivalents
+    multiprocessing pour « process ».
+    """
+    if CFG["job_backend"] == "process":
+        ctx = multiprocessing.get_context("spawn")
+        return ctx.Queue(), ctx.Event()
+    return queue.Queue(), threading.Event()
+
+
+def make_job(kind: str, gui_q, pause_evt, **kwargs):
+    """Job « doors » ou « numbers » (non démarré) selon CFG["job_backend"]."""
+    if CFG["job_backend"] == "service":
+        return ServiceJob(kind, gui_q, pause_evt, **kwargs)
+    if CFG["job_backend"] == "process":
+        return ProcessJob(kind, gui_q, pause_evt, **kwargs)
+    return _job_factory(kind)(gui_q=gui_q, pause_evt=pause_evt, **kwargs)
+
+
+# ── Exécution sans interface (CLI) ──────────────────────────────────────
+EXIT_OK, EXIT_FAILED, EXIT_USAGE, EXIT_PARTIAL, EXIT_INTERRUPTED = 0, 1, 2, 3, 130
+
+# champs nommés des tuples gui_q, pour la sortie JSON-lines
+_EVENT_FIELDS = {
+    "log": ("message",),
+    "progress": ("page", "range", "doors", "pct"),
+    "metrics": ("unit", "rate", "eta"),
+    "detail_progress": ("done", "total"),
+    "done": ("json", "csv", "count"),
+    "detail_done": ("output", "count"),
+    "error": ("message",),
+    "mfa_wait": (),
+}
+
+
+class JsonLinesSink:
+    """
+    Remplace gui_q hors GUI : chaque événement devient une ligne JSON sur
+    `out` ({"ts", "job", "event", …champs}). Garde le résultat du job
+    (fichiers produits, erreur) pour le code de sortie. Une attente MFA
+    relâche la pause au bout de `mfa_wait_sec` : sans personne pour cliquer
+    sur « Resume », le login échoue proprement au lieu de bloquer.
+    """
+
+    def __init__(self, job: str, pause_evt, mfa_wait_sec: float, out=None):
+        self.job = job
+        self.pause_evt = pause_evt
+        self.mfa_wait_sec = mfa_wait_sec
+        self.out = out or sys.stdout
+        self.result: dict = {}
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields):
+        line = {"ts": datetime.now().isoformat(timespec="seconds"), "job": self.job}
+        line.update(event=event, **fields)
+        with self._lock:
+            self.out.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+            self.out.flush()
+
+    def put(self, item, *args, **kwargs):
+        tag, *payload = item
+        fields = dict(zip(_EVENT_FIELDS.get(tag, ()), payload))
+        if tag in ("done", "detail_done"):
+            self.result = fields
+        elif tag == "error":
+            self.error = fields["message"]
+        elif tag == "mfa_wait":
+            threading.Timer(self.mfa_wait_sec, self.pause_evt.clear).start()
+        self.emit(tag, **fields)
+
+
+def load_job_spec(path: Path) -> dict:
+    """Lit une spec de job JSON, ou YAML si PyYAML est installé."""
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("spec YAML : installez PyYAML ou utilisez du JSON")
+        spec = yaml.safe_load(text)
+    else:
+        spec = json.loads(text)
+    return check_job_spec(spec)
+
+
+def check_job_spec(spec) -> dict:
+    """Valide la forme d'une spec de job (ValueError sinon)."""
+    if not isinstance(spec, dict):
+        raise ValueError("la spec doit être un objet")
+    if spec.get("stages", "doors") not in ("doors", "numbers", "full"):
+        raise ValueError("stages : doors | numbers | full")
+    if spec.get("stages", "doors") == "numbers":
+        if not spec.get("doors_files"):
+            raise ValueError("stages=numbers : doors_files requis")
+    elif not spec.get("targets"):
+        raise ValueError("targets : au moins une ville")
+    for t in spec.get("targets") or ():
+        page = t.get("start_page", 1) if isinstance(t, dict) else 1
+        if not isinstance(page, int) or page < 1:
+            raise ValueError("start_page : entier ≥ 1")
+    return spec
+
+
+def _cred(spec: dict, section: str, key: str, env: str) -> str:
+    return str(spec.get(section, {}).get(key) or os.environ.get(env, ""))
+
+
+class StdinControl:
+    """
+    Commandes lues sur stdin par `run --control` (une par ligne) : pause,
+    resume, stop. Elles visent le job en cours ; après « stop » les cibles
+    restantes sont abandonnées.
+    """
+
+    def __init__(self):
+        self.job = None
+        self.pause_evt: Optional[threading.Event] = None
+        self.stopped = False
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in sys.stdin:
+            cmd, job, pause_evt = line.strip().lower(), self.job, self.pause_evt
+            if cmd == "stop":
+                self.stopped = True
+                if job:
+                    job.stop()
+                    pause_evt.clear()
+            elif pause_evt is None:
+                continue
+            elif cmd == "pause":
+                pause_evt.set()
+            elif cmd == "resume":
+                pause_evt.clear()
+
+
+def _run_cli_job(
+    kind: str,
+    name: str,
+    spec: dict,
+    control: Optional[StdinControl] = None,
+    **kwargs,
+) -> JsonLinesSink:
+    """Exécute un job dans le thread courant ; Ctrl-C l'arrête proprement."""
+    pause_evt = threading.Event()
+    sink = JsonLinesSink(name, pause_evt, spec.get("mfa_wait_sec", 300))
+    job = _job_factory(kind)(gui_q=sink, pause_evt=pause_evt, **kwargs)
+    if control:
+        control.job, control.pause_evt = job, pause_evt
+    sink.emit("start", kind=kind)
+    job.start()
+    try:
+        while job.is_alive():
+            job.join(0.5)
+    except KeyboardInterrupt:
+        job.stop()
+        pause_evt.clear()
+        job.join()
+        raise
+    return sink
+
+
+def run_job_spec(spec: dict, control: Optional[StdinControl] = None) -> int:
+    """Déroule la spec (doors / numbers / full) ; renvoie le code de sortie."""
+    apply_config(spec.get("config", {}))
+    stages = spec.get("stages", "doors")
+    dest = Path(spec.get("dest") or DATA_DIR).expanduser()
+    dest.mkdir(parents=True, exist_ok=True)
+    clic = dict(
+        dest_dir=dest,
+        clic_user=_cred(spec, "clic", "user", "HOTBOT_CLIC_USER"),
+        clic_pwd=_cred(spec, "clic", "password", "HOTBOT_CLIC_PASSWORD"),
+        csr_code=_cred(spec, "clic", "employee_code", "HOTBOT_CSR_CODE"),
+    )
+    ok = failed = 0
+
+    if stages == "numbers":
+        for fp in map(Path, spec["doors_files"]):
+            if control and control.stopped:
+                break
+            sink = _run_cli_job(
+                "numbers", fp.stem, spec, control, doors_path=fp, **clic
+            )
+            if sink.result and not sink.error:
+                ok += 1
+            else:
+                failed += 1
+    else:
+        user = _cred(spec, "salesforce", "user", "HOTBOT_SF_USER")
+        pwd = _cred(spec, "salesforce", "password", "HOTBOT_SF_PASSWORD")
+        if not user or not pwd:
+            raise ValueError("identifiants Salesforce manquants")
+        for t in spec["targets"]:
+            if control and control.stopped:
+                break
+            t = {"city": t} if isinstance(t, str) else t
+            street = (t.get("street") or "").strip().upper() or None
+            name = _slug("_".join(filter(None, [t["city"], street, t.get("rta")])))
+            sink = _run_cli_job(
+                "doors",
+                name,
+                spec,
+                control,
+                user=user,
+                pwd=pwd,
+                city=t["city"],
+                street=street,
+                rta=t.get("rta") or None,
+                dest_dir=dest,
+                start_page=t.get("start_page", 1),
+            )
+            sinks = [sink]
+            if stages == "full" and sink.result.get("csv"):
+                doors_fp = Path(sink.result["csv"])
+                sinks.append(
+                    _run_cli_job(
+                        "numbers", name, spec, control, doors_path=doors_fp, **clic
+                    )
+                )
+            # une étape en erreur (même avec un export partiel) fait échouer la cible
+            if all(s.result and not s.error for s in sinks):
+                ok += 1
+            else:
+                failed += 1
+
+    if control and control.stopped:
+        return EXIT_INTERRUPTED
+    if not failed:
+        return EXIT_OK
+    return EXIT_PARTIAL if ok else EXIT_FAILED
+
+
+# ── Service local de jobs (HTTP + server-sent events) ───────────────────
+_SECRET_ENV = {  # secrets jamais écrits dans la file : passés au runner par env
+    ("salesforce", "password"): "HOTBOT_SF_PASSWORD",
+    ("clic", "password"): "HOTBOT_CLIC_PASSWORD",
+}
+_EXIT_STATE = {EXIT_OK: "done", EXIT_PARTIAL: "partial", EXIT_INTERRUPTED: "cancelled"}
+
+
+def _runner_cmd(*args: str) -> list[str]:
+    """Ligne de commande du runner CLI (script ou exécutable PyInstaller)."""
+    if getattr(sys, "frozen", False):
+        return [sys.executable, *args]
+    return [sys.executable, str(Path(__file__).resolve()), *args]
+
+
+class JobService:
+    """
+    Service asyncio sur 127.0.0.1 : file de jobs persistante (SQLite,
+    data/jobs/jobs.sqlite3) exécutée par CFG["service_workers"] workers.
+    Chaque job est une spec du runner CLI lancée dans son propre processus
+    (`run --control`) ; sa sortie JSON-lines est journalisée dans
+    data/jobs/<id>.jsonl et diffusée en server-sent events.
+
+        POST /jobs                 spec JSON → {"id": …}
+        GET  /jobs, /jobs/<id>     états
+        GET  /jobs/<id>/events     flux SSE (historique puis direct)
+        POST /jobs/<id>/pause|resume|cancel
+
+    Les mots de passe ne sont gardés qu'en mémoire ; un job repris après
+    redémarrage du service prend ceux de l'environnement (HOTBOT_*).
+    """
+
+    def __init__(self, port: int, workers: int, root: Path = DATA_DIR / "jobs"):
+        self.port = port
+        self.workers = max(1, workers)
+        self.root = root
+        self.root.mkdir(exist_ok=True)
+        self.db = sqlite3.connect(str(root / "jobs.sqlite3"), isolation_level=None)
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                   id        TEXT PRIMARY KEY,
+                   spec      TEXT NOT NULL,
+                   state     TEXT NOT NULL,
+                   exit_code INTEGER,
+                   created   REAL NOT NULL,
+                   started   REAL,
+                   finished  REAL
+               )"""
+        )
+        # jobs interrompus par un arrêt du service : remis en file
+        self.db.execute("UPDATE jobs SET state = 'queued' WHERE state = 'running'")
+        self._secrets: dict[str, dict[str, str]] = {}
+        self._procs: dict[str, asyncio.subprocess.Process] = {}
+        self._events: dict[str, list[str]] = {}
+        self._subs: dict[str, list[asyncio.Queue]] = {}
+        self._todo: Optional[asyncio.Queue] = None
+
+    # ---------- file persistante ----------------------------------------
+    def _job(self, job_id: str) -> Optional[dict]:
+        row = self.db.execute(
+            "SELECT id, spec, state, exit_code, created, started, finished"
+            " FROM jobs WHERE id = ?",
+            (job_id,),
+        ).fetchone()
+        if not row:
+            return None
+        keys = ("id", "spec", "state", "exit_code", "created", "started", "finished")
+        job = dict(zip(keys, row))
+        job["spec"] = json.loads(job["spec"])
+        job["events"] = f"/jobs/{job_id}/events"
+        return job
+
+    def _set(self, job_id: str, **cols):
+        sets = ", ".join(f"{k} = ?" for k in cols)
+        self.db.execute(
+            f"UPDATE jobs SET {sets} WHERE id = ?", (*cols.values(), job_id)
+        )
+
+    def submit(self, spec: dict) -> str:
+        spec = json.loads(json.dumps(spec))  # copie profonde
+        job_id = f"{datetime.now():%Y%m%d%H%M%S}-{random.randrange(16**4):04x}"
+        secrets = {}
+        for (section, key), env in _SECRET_ENV.items():
+            val = spec.get(section, {}).pop(key, None)
+            if val:
+                secrets[env] = val
+        self._secrets[job_id] = secrets
+        self.db.execute(
+            "INSERT INTO jobs (id, spec, state, created) VALUES (?, ?, 'queued', ?)",
+            (job_id, json.dumps(spec, ensure_ascii=False), time.time()),
+        )
+        self._todo.put_nowait(job_id)
+        return job_id
+
+    # ---------- exécution -----------------------------------------------
+    def _publish(self, job_id: str, line: str):
+        self._events.setdefault(job_id, []).append(line)
+        for q in self._subs.get(job_id, []):
+            q.put_nowait(line)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._todo.get()
+            job = self._job(job_id)
+            if job and job["state"] == "queued":
+                await self._run(job)
+
+    async def _run(self, job: dict):
+        job_id = job["id"]
+        spec_path = self.root / f"{job_id}.json"
+        spec_path.write_text(json.dumps(job["spec"], ensure_ascii=False), "utf-8")
+        self._set(job_id, state="running", started=time.time())
+        self._events[job_id] = []
+        proc, code, shutdown = None, None, False
         try:
-            apply_btn = WebDriverWait(d, 15).until(
-                EC.element_to_be_clickable((By.ID, "save_filter_Residences__c"))
+            proc = await asyncio.create_subprocess_exec(
+                *_runner_cmd("run", str(spec_path), "--control"),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                env={**os.environ, **self._secrets.pop(job_id, {})},
             )
-            d.execute_script("arguments[0].scrollIntoView(true);", apply_btn)
-            apply_btn.click()
-            self._dbg("✔ filtres appliqués (ID)")
-        except TimeoutException:
-            self._dbg("⚠ bouton apply non trouvé par ID, tentative XPath…")
-            try:
-                apply_btn = WebDriverWait(d, 5).until(
-                    EC.element_to_be_clickable(
-                        (By.XPATH, "//input[@value='Appliquer les filtres']")
-                    )
-                )
-                d.execute_script("arguments[0].scrollIntoView(true);", apply_btn)
-                apply_btn.click()
-                self._dbg("✔ filtres appliqués (XPath)")
-            except Exception as e2:
-                self._dbg(f"❌ échec apply fallback XPath ({e2})")
-                raise
+            self._procs[job_id] = proc
+            with (self.root / f"{job_id}.jsonl").open("a", encoding="utf-8") as log:
+                async for raw in proc.stdout:
+                    line = raw.decode("utf-8", "replace").strip()
+                    if line:
+                        log.write(line + "\n")
+                        log.flush()
+                        self._publish(job_id, line)
+            code = await proc.wait()
+        except asyncio.CancelledError:
+            shutdown = True  # arrêt du service : le job sera repris au démarrage
+            raise
+        except Exception as e:  # lancement ou lecture impossible : job en échec
+            err = {"event": "error", "message": f"runner: {e}"}
+            self._publish(job_id, json.dumps(err, ensure_ascii=False))
+            if proc and proc.returncode is None:
+                with contextlib.suppress(ProcessLookupError):
+                    proc.kill()
+        finally:
+            self._procs.pop(job_id, None)
+            if not shutdown:
+                if self._job(job_id)["state"] == "running":
+                    self._set(job_id, state=_EXIT_STATE.get(code, "failed"))
+                self._set(job_id, exit_code=code, finished=time.time())
+            self._publish(job_id, "")  # fin de flux, toujours publiée
+            self._events.pop(job_id, None)
+
+    async def control(self, job_id: str, cmd: str) -> bool:
+        job = self._job(job_id)
+        if not job or job["state"] not in ("queued", "running"):
+            return False
+        if cmd == "cancel":
+            self._set(job_id, state="cancelled", finished=time.time())
+            if job["state"] == "queued":  # jamais lancé : on ferme les flux
+                self._secrets.pop(job_id, None)
+                self._publish(job_id, "")
+                self._events.pop(job_id, None)
+                return True
+            cmd = "stop"
+        proc = self._procs.get(job_id)
+        if proc and proc.stdin:
+            proc.stdin.write(f"{cmd}\n".encode())
+            await proc.stdin.drain()
+        return True
+
+    # ---------- HTTP ----------------------------------------------------
+    async def _handle(self, reader, writer):
+        try:
+            method, target, _ = (await reader.readline()).decode().split(" ", 2)
+            headers = {}
+            while (line := (await reader.readline()).decode().strip()):
+                k, _, v = line.partition(":")
+                headers[k.strip().lower()] = v.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            parts = [p for p in urlsplit(target).path.split("/") if p]
+            await self._route(method, parts, body, writer)
+        except Exception as e:
+            with contextlib.suppress(Exception):
+                self._reply(writer, 400, {"error": str(e)})
+        finally:
+            with contextlib.suppress(Exception):
+                await writer.drain()
+                writer.close()
+
+    def _reply(self, writer, status: int, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
 
-        time.sleep(5)
-        # 5) Attendre la table des résultats
-        WebDriverWait(d, 15).until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, "table.list"))
+    async def _route(self, method: str, parts: list[str], body: bytes, writer):
+        if parts == ["jobs"] and method == "POST":
+            spec = check_job_spec(json.loads(body or b"{}"))
+            return self._reply(writer, 201, {"id": self.submit(spec)})
+        if parts == ["jobs"]:
+            rows = self.db.execute("SELECT id FROM jobs ORDER BY created DESC")
+            return self._reply(writer, 200, [self._job(i) for (i,) in rows])
+        job = self._job(parts[1]) if len(parts) > 1 and parts[0] == "jobs" else None
+        if not job:
+            return self._reply(writer, 404, {"error": "job inconnu"})
+        if len(parts) == 2:
+            return self._reply(writer, 200, job)
+        if parts[2] == "events":
+            return await self._stream(job, writer)
+        if method == "POST" and parts[2] in ("pause", "resume", "cancel"):
+            ok = await self.control(job["id"], parts[2])
+            return self._reply(writer, 200 if ok else 409, {"ok": ok})
+        return self._reply(writer, 404, {"error": "route inconnue"})
+
+    async def _stream(self, job: dict, writer):
+        """SSE : événements passés (mémoire ou journal) puis en direct."""
+        job_id = job["id"]
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n"
         )
-        self._dbg("✔ table.list visible, prêt à parser")
+        live = job_id in self._events or job["state"] in ("queued", "running")
+        q: asyncio.Queue = asyncio.Queue()
+        if job_id in self._events:
+            past = list(self._events[job_id])
+        else:
+            log = self.root / f"{job_id}.jsonl"
+            past = log.read_text("utf-8").splitlines() if log.exists() else []
+        if live:
+            self._subs.setdefault(job_id, []).append(q)
+        try:
+            for line in past:
+                writer.write(f"data: {line}\n\n".encode())
+            await writer.drain()
+            while live:
+                line = await q.get()
+                if not line:
+                    break
+                writer.write(f"data: {line}\n\n".encode())
+                await writer.drain()
+            end = json.dumps({"state": self._job(job_id)["state"]})
+            writer.write(f"event: end\ndata: {end}\n\n".encode())
+        finally:
+            if live:
+                self._subs[job_id].remove(q)
+
+    async def serve(self):
+        self._todo = asyncio.Queue()
+        for (job_id,) in self.db.execute(
+            "SELECT id FROM jobs WHERE state = 'queued' ORDER BY created"
+        ).fetchall():
+            self._todo.put_nowait(job_id)
+        server = await asyncio.start_server(self._handle, "127.0.0.1", self.port)
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        print(f"hotbot job service → http://127.0.0.1:{self.port}/jobs", flush=True)
+        async with server:
+            try:
+                await server.serve_forever()
+            finally:
+                for w in workers:
+                    w.cancel()
 
-    # ─── telebot/handlers/salesforce_scraper.py  (ou le fichier équivalent) ────
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.support.ui import WebDriverWait
 
-    def _scrape_door(self, href: str) -> dict | None:
-        """
-        1. Ouvre <href> dans un NOUVEL onglet (fini les filtres qui sautent).
-        2. Parse exactement comme avant avec safe_find + <td> pairs.
-        3. Ferme l'onglet et revient sur la liste.
-        """
-        if self._stop_evt.is_set():
-            return None
+class ServiceJob:
+    """
+    Client GUI du service : soumet le job (même interface start / stop /
+    is_alive que les scrapers) puis relit le flux SSE et le retraduit en
+    tuples gui_q. La pause de la GUI est relayée au runner.
+    """
 
-        d = self.driver
-        wait = WebDriverWait(d, 5)
-        main = d.current_window_handle
+    def __init__(self, kind: str, gui_q, pause_evt, **kw):
+        self.base = f"http://127.0.0.1:{CFG['service_port']}"
+        self.gui_q = gui_q
+        self.pause_evt = pause_evt
+        self.job_id: Optional[str] = None
+        self._remote_paused = False
+        self._final = False  # done / detail_done / error relayé
+        self._stop_evt = threading.Event()
+        self._thread = threading.Thread(target=self._follow, daemon=True)
+        dest = str(kw["dest_dir"])
+        if kind == "doors":
+            target = {k: kw[k] for k in ("city", "street", "rta")}
+            target["start_page"] = kw.get("start_page", 1)  # reprise
+            self.spec = {
+                "stages": "doors",
+                "dest": dest,
+                "targets": [target],
+                "salesforce": {"user": kw["user"], "password": kw["pwd"]},
+            }
+        else:
+            self.spec = {
+                "stages": "numbers",
+                "dest": dest,
+                "doors_files": [str(kw["doors_path"])],
+                "clic": {
+                    "user": kw["clic_user"],
+                    "password": kw["clic_pwd"],
+                    "employee_code": kw["csr_code"],
+                },
+            }
 
-        # ── 1) nouvel onglet vierge
-        d.switch_to.new_window("tab")
-        d.get(href)
+    def start(self):
+        self._thread.start()
 
-        try:
-            # ── 2) parsing "ancien style" — on ne change rien
-            tbl = safe_find(d, "#ep table.detailList")  # votre helper existant
-            tds = [
-                td.text.strip() or None for td in tbl.find_elements(By.TAG_NAME, "td")
-            ]
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
 
-            rec = {
-                tds[i]: tds[i + 1]
-                for i in range(0, len(tds), 2)
-                if i + 1 < len(tds) and tds[i]
-            }
+    def stop(self):
+        self._stop_evt.set()
+        self._post("cancel")
 
-            # ← NEW: drop any "fizz" clients
-            client_val = rec.get("Client", "") or rec.get("Compte client", "")
-            if "fizz" in client_val.lower():
-                self._dbg(f"⚠ Skipping fizz client: {client_val}")
-                return None
+    def _post(self, cmd: str):
+        if self.job_id:
+            with contextlib.suppress(requests.RequestException):
+                requests.post(f"{self.base}/jobs/{self.job_id}/{cmd}", timeout=5)
 
-            self._dbg(f"✓ parsed {len(rec)} fields")
-            return rec
+    def _relay_pause(self):
+        while self.is_alive() and not self._stop_evt.wait(0.5):
+            paused = self.pause_evt.is_set()
+            if paused != self._remote_paused:
+                self._remote_paused = paused
+                self._post("pause" if paused else "resume")
 
+    def _follow(self):
+        try:
+            r = requests.post(f"{self.base}/jobs", json=self.spec, timeout=10)
+            r.raise_for_status()
+            self.job_id = r.json()["id"]
+            self.gui_q.put(("log", f"job {self.job_id} soumis au service"))
+            threading.Thread(target=self._relay_pause, daemon=True).start()
+            with requests.get(
+                f"{self.base}/jobs/{self.job_id}/events", stream=True, timeout=None
+            ) as sse:
+                kind = "message"
+                for raw in sse.iter_lines(decode_unicode=True):
+                    if raw.startswith("event: "):
+                        kind = raw[7:]
+                    elif raw.startswith("data: "):
+                        data = json.loads(raw[6:])
+                        if kind == "end" and not self._final:
+                            state = data.get("state")
+                            self.gui_q.put(("error", f"job {self.job_id} : {state}"))
+                        elif kind == "message":
+                            self._relay(data)
+                        kind = "message"
         except Exception as e:
-            self._dbg(f"❌ detail fail ({e})")
-            return None
+            self.gui_q.put(("error", f"service de jobs : {e}"))
 
-        finally:
-            # ── 3) nettoyage
+    def _relay(self, ev: dict):
+        tag = ev.get("event")
+        if tag not in _EVENT_FIELDS:
+            return
+        if tag == "mfa_wait":  # le runner est en pause : la GUI aussi
+            self._remote_paused = True
+            self.pause_evt.set()
+        self._final |= tag in ("done", "detail_done", "error")
+        self.gui_q.put((tag, *(ev.get(k) for k in _EVENT_FIELDS[tag])))
+
+
+# ── File de travail partagée (SQLite + baux, sans broker) ───────────────
+class WorkQueue:
+    """
+    File d'unités de travail dans un fichier SQLite, partageable entre
+    processus et entre postes (dossier réseau). Une unité (« street » :
+    une rue d'une ville ; « accounts » : un lot de comptes à compléter) est
+    prise à bail pour CFG["work_lease_sec"] secondes ; le worker renouvelle
+    le bail par heartbeat. Un bail expiré est repris par le prochain lease(),
+    jusqu'à CFG["work_max_attempts"] tentatives. La connexion est partagée
+    avec le thread de heartbeat : chaque transaction prend `_lock`.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        # journal classique : WAL n'est pas fiable sur un partage réseau
+        self.db = sqlite3.connect(
+            str(self.path), timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS units (
+                   id          INTEGER PRIMARY KEY,
+                   kind        TEXT NOT NULL,
+                   payload     TEXT NOT NULL,
+                   state       TEXT NOT NULL DEFAULT 'pending',
+                   attempts    INTEGER NOT NULL DEFAULT 0,
+                   owner       TEXT,
+                   lease_until REAL,
+                   result      TEXT,
+                   error       TEXT,
+                   updated     REAL NOT NULL
+               )"""
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS units_state ON units (state, id)")
+
+    @contextlib.contextmanager
+    def _tx(self):
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")  # verrou d'écriture dès le début
             try:
-                d.close()  # referme l'onglet détail
-            finally:
-                d.switch_to.window(main)  # retourne à la liste
-                # petit wait pour garantir que la table est de nouveau interactive
-                wait.until(
-                    EC.visibility_of_element_located(
-                        (By.CSS_SELECTOR, "table.list tr.dataRow")
-                    )
-                )
+                yield
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
 
-    # ---- main thread method --------------------------------------------
-    def run(self):
-        try:
-            self.driver = build_driver()
-            if not self._login():
-                return
-            self._search_and_filter()
+    def put(self, kind: str, payloads: list[dict]) -> int:
+        now = time.time()
+        with self._tx():
+            self.db.executemany(
+                "INSERT INTO units (kind, payload, updated) VALUES (?, ?, ?)",
+                [(kind, json.dumps(p, ensure_ascii=False), now) for p in payloads],
+            )
+        return len(payloads)
+
+    def _reclaim(self, now: float):
+        """Baux expirés : l'unité repart en file, ou échoue si trop d'essais."""
+        self.db.execute(
+            """UPDATE units
+               SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                   error = CASE WHEN attempts >= ? THEN 'bail expiré' ELSE error END,
+                   owner = NULL, lease_until = NULL, updated = ?
+               WHERE state = 'leased' AND lease_until < ?""",
+            (CFG["work_max_attempts"], CFG["work_max_attempts"], now, now),
+        )
 
-            page_no = 0
-            total_pages = None
-            more = True
+    def lease(self, owner: str, kinds: tuple[str, ...]) -> Optional[dict]:
+        """Prend la plus ancienne unité libre d'un des `kinds`, sinon None."""
+        now = time.time()
+        with self._tx():
+            self._reclaim(now)
+            marks = ",".join("?" * len(kinds))
+            row = self.db.execute(
+                f"""SELECT id, kind, payload FROM units
+                    WHERE state = 'pending' AND kind IN ({marks})
+                    ORDER BY id LIMIT 1""",
+                kinds,
+            ).fetchone()
+            if not row:
+                return None
+            self.db.execute(
+                """UPDATE units SET state = 'leased', owner = ?, lease_until = ?,
+                          attempts = attempts + 1, updated = ?
+                   WHERE id = ?""",
+                (owner, now + CFG["work_lease_sec"], now, row[0]),
+            )
+        return {"id": row[0], "kind": row[1], "payload": json.loads(row[2])}
+
+    def heartbeat(self, unit_id: int, owner: str) -> bool:
+        """Prolonge le bail ; False s'il a été perdu (expiré puis repris)."""
+        now = time.time()
+        with self._tx():
+            cur = self.db.execute(
+                """UPDATE units SET lease_until = ?, updated = ?
+                   WHERE id = ? AND owner = ? AND state = 'leased'""",
+                (now + CFG["work_lease_sec"], now, unit_id, owner),
+            )
+        return cur.rowcount == 1
 
-            while more and not self._stop_evt.is_set():
-                page_no += 1
+    def finish(
+        self,
+        unit_id: int,
+        owner: str,
+        result: Optional[dict] = None,
+        error: Optional[str] = None,
+    ):
+        """Écrit le résultat ; une erreur remet l'unité en file s'il reste des essais."""
+        with self._tx():
+            self.db.execute(
+                """UPDATE units
+                   SET state = CASE WHEN ? IS NULL THEN 'done'
+                                    WHEN attempts >= ? THEN 'failed'
+                                    ELSE 'pending' END,
+                       result = ?, error = ?, owner = NULL, lease_until = NULL,
+                       updated = ?
+                   WHERE id = ? AND owner = ?""",
+                (
+                    error,
+                    CFG["work_max_attempts"],
+                    json.dumps(result, ensure_ascii=False) if result else None,
+                    error,
+                    time.time(),
+                    unit_id,
+                    owner,
+                ),
+            )
 
-                # ── (1) info plage "x‑y" ─────────────────────────────────────
-                try:
-                    range_text = (
-                        WebDriverWait(self.driver, 5)
-                        .until(
-                            EC.visibility_of_element_located(
-                                (By.CSS_SELECTOR, ".itemsRange")
-                            )
-                        )
-                        .text
-                    )  # ex. "(1-25)"
-                except TimeoutException:
-                    range_text = "(?)"
-
-                self._dbg(f"=== PAGE {page_no} {range_text} ===")
-
-                # ── (2) collecter tous les liens de la page ──────────────────
-                links = [
-                    a.get_attribute("href")
-                    for a in self.driver.find_elements(
-                        By.CSS_SELECTOR, "table.list tr.dataRow th a"
-                    )
-                ]
-                if not links:  # aucune ligne => on s'arrête
-                    self._dbg("🚨 aucun enregistrement trouvé, arrêt boucle")
+    def counts(self) -> dict[str, int]:
+        with self._lock:
+            rows = self.db.execute("SELECT state, count(*) FROM units GROUP BY state")
+            return dict(rows.fetchall())
+
+
+def snapshot_streets(city: str) -> Optional[List[str]]:
+    """Rues de `city` dans l'instantané, mappé le temps de la lecture."""
+    snap = CitySnapshot.load()
+    if snap is None:
+        return None
+    try:
+        return snap.streets(city)
+    finally:
+        snap.close()
+
+
+def city_streets(city: str, streets: Optional[List[str]] = None) -> List[str]:
+    """Rues d'une ville (Overpass si non fournies), sous la forme de la GUI."""
+    if streets is None:
+        streets = snapshot_streets(city)
+    if streets is None:
+        rel = fetch_or_load_cities(CITIES_CACHE)[city]
+        streets = fetch_streets_for_city(rel)
+    # une recherche par rue réelle, même forme que la GUI (upper())
+    return StreetIndex(streets).search_forms()
+
+
+def enqueue_work(wq: WorkQueue, args) -> int:
+    """`enqueue` : rues d'une ville, ou lots de comptes d'un fichier doors."""
+    dest = str(Path(args.dest).resolve())
+    Path(dest).mkdir(parents=True, exist_ok=True)
+    if args.doors_file:
+        src = Path(args.doors_file)
+        df = (
+            pd.read_json(src, dtype={"Compte client": str})
+            if src.suffix == ".json"
+            else pd.read_csv(src, dtype={"Compte client": str})
+        )
+        units = []
+        for i in range(0, len(df), args.batch_size):
+            part = Path(dest) / f"{src.stem}_part{i // args.batch_size + 1:03d}.csv"
+            df.iloc[i : i + args.batch_size].to_csv(part, index=False)
+            units.append({"doors_file": str(part), "dest": dest})
+        return wq.put("accounts", units)
+    streets = args.streets or rta_streets(
+        args.city,
+        args.rta,
+        lambda msg: print(
+            json.dumps({"event": "log", "message": msg}, ensure_ascii=False)
+        ),
+    )
+    streets = city_streets(args.city, streets or None)
+    units = [
+        {"city": args.city, "street": st, "rta": args.rta, "dest": dest}
+        for st in streets
+    ]
+    return wq.put("street", units)
+
+
+def run_work_worker(wq: WorkQueue, kinds: tuple[str, ...], wait: bool) -> int:
+    """
+    `worker` : prend des unités tant qu'il y en a (ou indéfiniment avec
+    `wait`). Les rues partagent un Chrome connecté une seule fois ; chaque
+    unité est exportée dans son `dest` et le chemin écrit dans la file.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    pause_evt = threading.Event()
+    sink = JsonLinesSink(owner, pause_evt, CFG["work_lease_sec"])
+    session: Optional[SalesforceScraper] = None
+    failed = 0
+    try:
+        while True:
+            unit = wq.lease(owner, kinds)
+            if not unit:
+                if not wait:
                     break
+                time.sleep(10)
+                continue
+            p, sink.job = unit["payload"], f"{owner}#{unit['id']}"
+            sink.result, sink.error = {}, None
+            sink.emit("lease", unit=unit["id"], kind=unit["kind"], payload=p)
+            ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+            if unit["kind"] == "street":
+                job = SalesforceScraper(
+                    os.environ.get("HOTBOT_SF_USER", ""),
+                    os.environ.get("HOTBOT_SF_PASSWORD", ""),
+                    p["city"],
+                    p.get("street"),
+                    p.get("rta"),
+                    sink,
+                    pause_evt,
+                    Path(p["dest"]),
+                )
+                if session is None:  # premier login (MFA comprise)
+                    session = job
+                    session.driver = build_driver()
+                    session.metrics.attach(session.driver)
+                    if not session._login():
+                        # l'unité repart en file pour un autre worker
+                        msg = "login Salesforce impossible"
+                        wq.finish(unit["id"], owner, error=msg)
+                        raise RuntimeError(msg)
+                    session.home_url = session.driver.current_url
+                job.driver, job.home_url = session.driver, session.home_url
+                if CFG["door_store"]:
+                    job.store = session.store = session.store or DoorStore()
+
+                def body():
+                    job._run_ui()
+                    out_json, out_csv = job._export(ts)
+                    sink.result = {
+                        "json": str(out_json),
+                        "csv": str(out_csv),
+                        "count": len(job.doors),
+                    }
+
+            else:
+                job = ClicDetailScraper(
+                    Path(p["doors_file"]),
+                    sink,
+                    pause_evt,
+                    dest_dir=Path(p["dest"]),
+                    clic_user=os.environ.get("HOTBOT_CLIC_USER", ""),
+                    clic_pwd=os.environ.get("HOTBOT_CLIC_PASSWORD", ""),
+                    csr_code=os.environ.get("HOTBOT_CSR_CODE", ""),
+                )
+                body = job.run  # exporte et émet detail_done lui-même
 
-                import re
+            beat = threading.Event()
 
-                for href in links:
-                    rec = self._scrape_door(href)
-                    if not rec:
+            def heartbeat(unit_id=unit["id"], job=job):
+                while not beat.wait(CFG["work_lease_sec"] / 3):
+                    try:
+                        kept = wq.heartbeat(unit_id, owner)
+                    except sqlite3.Error as e:  # partage indisponible : on réessaie
+                        sink.emit("heartbeat_error", unit=unit_id, message=str(e))
                         continue
+                    if not kept:
+                        sink.emit("lease_lost", unit=unit_id)
+                        job.stop()
+                        return
 
-                    # grab the raw "Compte client" value (fall back to empty string)
-                    acct = rec.get("Compte client", "")
-                    # strip out non‐digits and count
-                    digits = re.sub(r"\D", "", acct)
+            threading.Thread(target=heartbeat, daemon=True).start()
+            try:
+                body()
+            except Exception as e:
+                sink.error = str(e)
+            finally:
+                beat.set()
+            if unit["kind"] == "street":
+                session.driver = job.driver  # éventuellement recyclé
+            error = sink.error or (None if sink.result else "aucun résultat")
+            wq.finish(unit["id"], owner, sink.result or None, error)
+            failed += error is not None
+            sink.emit("finish", unit=unit["id"], result=sink.result, error=error)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    finally:
+        if session and session.driver:
+            with contextlib.suppress(Exception):
+                session.driver.quit()
+        if session and session.store:
+            session.store.close()
+    return EXIT_PARTIAL if failed else EXIT_OK
+
+
+SNAPSHOT_SYNC_MARGIN = 3600  # retard toléré de la base Overpass sur l'heure locale
+
+
+def refresh_city_snapshot() -> int:
+    """
+    `snapshot --refresh` : ne récupère à nouveau que les villes (déjà
+    pourvues de rues) où un way highway a changé, disparu ou perdu son nom
+    depuis le repère, puis avance le repère. En cas d'échec, le repère
+    reste en place et le prochain refresh reprend les mêmes changements.
+    """
+    snap = CitySnapshot.load()
+    if snap is None or not snap.synced:
+        msg = "no sync watermark: run 'snapshot --streets' first"
+        print(json.dumps({"event": "error", "message": msg}))
+        return EXIT_USAGE
+    started = time.time() - SNAPSHOT_SYNC_MARGIN
+    city2rel = snap.city_map()
+    rel2city = {rel: c for c, rel in city2rel.items()}
+    try:
+        changed = fetch_changed_cities(snap.synced)
+    except OverpassError as e:  # sans diff complet, le repère ne bouge pas
+        snap.close()
+        print(json.dumps({"event": "error", "message": str(e)}))
+        return EXIT_FAILED
+    todo = [rel2city[r] for r in changed if r in rel2city]
+    todo = [c for c in todo if snap.streets(c) is not None]
+    print(json.dumps({"event": "changed", "cities": len(todo)}, ensure_ascii=False))
+    failed, added, removed, batch = 0, 0, 0, {}
+    for city in todo:
+        try:
+            new = fetch_streets_for_city(city2rel[city])
+        except Exception as e:
+            failed += 1
+            print(json.dumps({"event": "error", "city": city, "message": str(e)}))
+            continue
+        old = set(snap.streets(city))
+        added += len(set(new) - old)
+        removed += len(old - set(new))
+        batch[city] = new
+    snap = snap.updated(batch, synced=None if failed else started)
+    print(
+        json.dumps(
+            {
+                "event": "done",
+                "cities": len(batch),
+                "added": added,
+                "removed": removed,
+                "synced": time.strftime(
+                    "%Y-%m-%dT%H:%M:%SZ", time.gmtime(snap.synced)
+                ),
+                "data_version": snap.data_version,
+            }
+        )
+    )
+    snap.close()
+    return EXIT_PARTIAL if failed else EXIT_OK
 
-                    self.doors.append(rec)
 
-                # ── (3) progression GUI ─────────────────────────────────────
-                pct = None if total_pages is None else page_no / total_pages
-                self.gui_q.put(("progress", page_no, range_text, len(self.doors), pct))
+def build_city_snapshot(streets: bool, only: Optional[List[str]] = None) -> int:
+    """
+    `snapshot` : (re)crée data/qc_snapshot.bin depuis le cache des villes,
+    puis y ajoute les rues des villes qui n'en ont pas encore (ou de celles
+    de `only`, récupérées à nouveau). Enregistré toutes les 25 villes :
+    une construction interrompue reprend là où elle s'était arrêtée.
+    """
+    if not CFG["city_snapshot"]:
+        print(json.dumps({"event": "error", "message": "city_snapshot is empty"}))
+        return EXIT_USAGE
+    city2rel = fetch_or_load_cities(CITIES_CACHE)
+    snap = CitySnapshot.load()
+    if snap is None:
+        CitySnapshot.write(CITY_SNAPSHOT, city2rel, {})
+        snap = CitySnapshot(CITY_SNAPSHOT)
+    elif set(snap.city_map()) != set(city2rel):
+        snap = snap.updated({}, city2rel)
+    todo = [c for c in (only or ()) if c in city2rel]
+    if streets and not only:
+        todo = [c for c in city2rel if snap.streets(c) is None]
+    if todo and not snap.synced:
+        # repère posé avant le 1er fetch, jamais avancé par une reprise :
+        # --refresh rattrapera tout ce qui a changé depuis le début
+        snap = snap.updated({}, synced=time.time() - SNAPSHOT_SYNC_MARGIN)
+    failed, batch = 0, {}
+    for i, city in enumerate(todo, 1):
+        try:
+            batch[city] = fetch_streets_for_city(city2rel[city])
+        except Exception as e:
+            failed += 1
+            print(json.dumps({"event": "error", "city": city, "message": str(e)}))
+        if batch and (len(batch) >= 25 or i == len(todo)):
+            try:
+                snap = snap.updated(batch)
+            except OSError as e:  # fichier verrouillé : lot gardé pour la suite
+                print(json.dumps({"event": "error", "message": str(e)}))
+                if i < len(todo):
+                    continue
+                failed += len(batch)
+            batch = {}
+            print(json.dumps({"event": "progress", "done": i, "total": len(todo)}))
+    print(
+        json.dumps(
+            {
+                "event": "done",
+                "path": str(CITY_SNAPSHOT),
+                "cities": len(snap),
+                "data_version": snap.data_version,
+                "bytes": CITY_SNAPSHOT.stat().st_size,
+            }
+        )
+    )
+    snap.close()
+    return EXIT_PARTIAL if failed else EXIT_OK
 
-                from selenium.common.exceptions import \
-                    StaleElementReferenceException
 
-                # --- (4) tenter d'avancer ------------------------------------------------
-                try:
-                    # garder une référence au tableau courant
-                    old_tbl = self.driver.find_element(By.CSS_SELECTOR, "table.list")
+def build_rta_index(only: Optional[List[str]] = None) -> int:
+    """
+    `rta-index` : ajoute à data/rta_index.json les RTA des villes qui n'y
+    sont pas encore (ou de celles de `only`, récupérées à nouveau).
+    Enregistré toutes les 25 villes, comme l'instantané.
+    """
+    if not CFG["rta_index"]:
+        print(json.dumps({"event": "error", "message": "rta_index is empty"}))
+        return EXIT_USAGE
+    snap = CitySnapshot.load()
+    city2rel = snap.city_map() if snap else fetch_or_load_cities(CITIES_CACHE)
+    if snap:
+        snap.close()
+    index = RtaIndex.load() or RtaIndex()
+    todo = [c for c in (only or city2rel) if c in city2rel]
+    if not only:
+        todo = [c for c in todo if c not in index.by_city]
+    failed = 0
+    for i, city in enumerate(todo, 1):
+        try:
+            index.set_city(city, fetch_postcodes_for_city(city2rel[city]))
+        except Exception as e:
+            failed += 1
+            print(json.dumps({"event": "error", "city": city, "message": str(e)}))
+        if i % 25 == 0 or i == len(todo):
+            index.save()
+            print(json.dumps({"event": "progress", "done": i, "total": len(todo)}))
+    print(
+        json.dumps(
+            {
+                "event": "done",
+                "path": str(index.path),
+                "cities": len(index.by_city),
+                "rtas": len(index._index()),
+            }
+        )
+    )
+    return EXIT_PARTIAL if failed else EXIT_OK
 
-                    # rendre le footer visible + récupérer le bouton flèche
-                    self.driver.execute_script(
-                        "window.scrollTo(0, document.body.scrollHeight);"
-                    )
-                    nxt_img = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located(
-                            (By.CSS_SELECTOR, ".pSearchShowMore a.nextArrow > img")
-                        )
-                    )
 
-                    # dernière page ?
-                    if "disabled" in nxt_img.get_attribute("src"):
-                        total_pages = page_no
-                        more = False
-                    else:
-                        self._dbg("click Page suivante")
-                        self.driver.execute_script(
-                            "arguments[0].parentElement.click()", nxt_img
-                        )
+def cli_main(argv: list[str]) -> int:
+    """
+    Point d'entrée ligne de commande : run, serve, enqueue, worker,
+    snapshot, rta-index.
+    """
+    import argparse
 
-                        # ❶ attendre que l'ancien tableau devienne obsolète,
-                        #    puis ❷ attendre que le nouveau soit prêt
-                        WebDriverWait(self.driver, 10).until(EC.staleness_of(old_tbl))
-                        WebDriverWait(self.driver, 15).until(
-                            EC.visibility_of_element_located(
-                                (By.CSS_SELECTOR, "table.list tr.dataRow")
-                            )
-                        )
+    global HEADLESS
+    HEADLESS = True
+
+    ap = argparse.ArgumentParser(
+        prog="salesforce_scraper_gui",
+        description="Runs hotbot jobs without the GUI (JSON-lines progress on stdout).",
+    )
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    run_p = sub.add_parser("run", help="run a JSON/YAML job spec")
+    run_p.add_argument("spec", type=Path)
+    run_p.add_argument(
+        "--control", action="store_true", help="read pause/resume/stop on stdin"
+    )
+    serve_p = sub.add_parser("serve", help="local job service (HTTP + SSE)")
+    serve_p.add_argument("--port", type=int, default=CFG["service_port"])
+    serve_p.add_argument("--workers", type=int, default=CFG["service_workers"])
+    enq_p = sub.add_parser("enqueue", help="add street or account units to a queue")
+    enq_p.add_argument("queue", type=Path, help="work queue file (.sqlite3)")
+    enq_p.add_argument("--dest", required=True, help="shared output folder")
+    enq_p.add_argument("--city")
+    enq_p.add_argument("--rta")
+    enq_p.add_argument("--streets", nargs="*", help="default: every street")
+    enq_p.add_argument("--doors-file", help="split this doors export instead")
+    enq_p.add_argument("--batch-size", type=int, default=200)
+    work_p = sub.add_parser("worker", help="take units from a queue and run them")
+    work_p.add_argument("queue", type=Path)
+    work_p.add_argument("--kinds", default="street,accounts")
+    work_p.add_argument("--wait", action="store_true", help="keep polling")
+    snap_p = sub.add_parser("snapshot", help="build/update the city+street snapshot")
+    snap_p.add_argument(
+        "--streets", action="store_true", help="fetch streets of cities lacking them"
+    )
+    snap_p.add_argument("--cities", nargs="*", help="only these cities (refetched)")
+    snap_p.add_argument(
+        "--refresh", action="store_true", help="only cities changed since last sync"
+    )
+    rta_p = sub.add_parser("rta-index", help="build the postal RTA → streets index")
+    rta_p.add_argument("--cities", nargs="*", help="only these cities (refetched)")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "enqueue":
+        if not (args.city or args.doors_file):
+            ap.error("enqueue: --city or --doors-file")
+        n = enqueue_work(WorkQueue(args.queue), args)
+        print(json.dumps({"event": "enqueued", "units": n}))
+        return EXIT_OK
+    if args.cmd == "worker":
+        kinds = tuple(k.strip() for k in args.kinds.split(","))
+        return run_work_worker(WorkQueue(args.queue), kinds, args.wait)
+    if args.cmd == "rta-index":
+        return build_rta_index(args.cities)
+    if args.cmd == "snapshot":
+        try:
+            if args.refresh:
+                return refresh_city_snapshot()
+            return build_city_snapshot(args.streets, args.cities)
+        except OSError as e:  # instantané verrouillé ou illisible
+            print(json.dumps({"event": "error", "message": str(e)}))
+            return EXIT_FAILED
+    if args.cmd == "serve":
+        try:
+            asyncio.run(JobService(args.port, args.workers).serve())
+        except KeyboardInterrupt:
+            pass
+        return EXIT_OK
+    try:
+        spec = load_job_spec(args.spec)
+        return run_job_spec(spec, StdinControl() if args.control else None)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    except (OSError, ValueError, KeyError) as e:
+        print(json.dumps({"event": "error", "message": str(e)}, ensure_ascii=False))
+        return EXIT_USAGE
 
-                except StaleElementReferenceException as e:
-                    self._dbg(f"stale element récupéré → retry ({e})")
-                    continue  # relance immédiatement la boucle while
 
-                except Exception as e:
-                    self._dbg(f"no next page ({e})")
-                    total_pages = page_no
-                    more = False
+# ── Rues par ville : requêtes regroupées + préchargement ────────────────
+RECENT_CITIES = DATA_DIR / "recent_cities.json"
 
-            # ── (5) EXPORTS ─────────────────────────────────────────────
-            ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-            parts = [_slug(self.city)]
-            if self.street:
-                parts.append(_slug(self.street))
-            if self.rta:
-                parts.append(_slug(self.rta))
-            prefix = "_".join(parts)
-
-            # --- 1️⃣ chemins DE DESTINATION directement dans le dossier choisi
-            out_json = self.dest_dir / f"doors_{prefix}_{ts}.json"
-            out_csv = self.dest_dir / f"doors_{prefix}_{ts}.csv"
-
-            # ① JSON (toujours, même vide)
-            out_json.write_text(
-                json.dumps(self.doors, ensure_ascii=False, indent=2), encoding="utf-8"
-            )
 
-            # ② CSV
-            if self.doors:
-                all_keys = set().union(*(rec.keys() for rec in self.doors))
-                header = ["city", "street", "rta"] + sorted(all_keys)
-                with out_csv.open("w", newline="", encoding="utf-8") as f:
-                    w = csv.writer(f)
-                    w.writerow(header)
-                    for rec in self.doors:
-                        w.writerow(
-                            [
-                                self.city,
-                                self.street or "",
-                                self.rta or "",
-                                *[rec.get(k, "") for k in sorted(all_keys)],
-                            ]
-                        )
-            else:  # aucune porte
-                with out_csv.open("w", newline="", encoding="utf-8") as f:
-                    csv.writer(f).writerow(["city", "street", "rta"])
+class StreetFetcher:
+    """
+    Rues d'une municipalité sans requêtes Overpass en double : une seule
+    requête en vol par relation, un petit pool de threads
+    (CFG["street_fetch_workers"]) et un cache en mémoire. Chaque demande
+    reçoit son propre Future, relié à la requête partagée : l'annuler ne
+    retire la requête (pas encore partie) que si plus personne ne l'attend.
+    `prefetch` charge d'avance les villes les plus utilisées / récentes,
+    mémorisées dans data/recent_cities.json.
+    """
 
-            # ③ notification GUI + ouverture du dossier
-            self.gui_q.put(("done", str(out_json), str(out_csv), len(self.doors)))
-            open_folder(self.dest_dir)
-            return  # ← il ne faut plus rien après
+    def __init__(self, workers: Optional[int] = None):
+        self._pool = _fut.ThreadPoolExecutor(
+            max_workers=workers or CFG["street_fetch_workers"],
+            thread_name_prefix="streets",
+        )
+        self._lock = threading.Lock()
+        self._inflight: dict[int, _fut.Future] = {}
+        self._waiters: dict[int, int] = {}  # demandes en attente par relation
+        self.cache: dict[int, List[str]] = {}
+
+    def get(self, rel: int) -> _fut.Future:
+        """Future propre à l'appelant des rues de `rel` (cache ou requête)."""
+        out: _fut.Future = _fut.Future()
+        with self._lock:
+            if rel in self.cache:
+                out.set_result(self.cache[rel])
+                return out
+            shared = self._inflight.get(rel)
+            if shared is None:
+                shared = self._inflight[rel] = self._pool.submit(self._fetch, rel)
+                self._waiters[rel] = 0
+            self._waiters[rel] += 1
+        out.add_done_callback(lambda f: f.cancelled() and self._release(rel, shared))
+        shared.add_done_callback(lambda f: self._settle(out, f))
+        return out
 
-            # même si aucune porte n'a été trouvée, écrire un fichier JSON vide
-            json_path.write_text(
-                json.dumps(self.doors, ensure_ascii=False, indent=2), encoding="utf-8"
-            )
+    @staticmethod
+    def _settle(out: _fut.Future, shared: _fut.Future):
+        with contextlib.suppress(_fut.InvalidStateError):  # demande annulée
+            if shared.cancelled():
+                out.cancel()
+            elif shared.exception() is not None:
+                out.set_exception(shared.exception())
+            else:
+                out.set_result(shared.result())
 
-            # ➊ si aucune fiche => CSV minimal + message GUI puis retour
-            if not self.doors:
-                with open(csv_path, "w", newline="", encoding="utf-8") as f:
-                    csv.writer(f).writerow(["city", "street", "rta"])  # en‑tête simple
-                self.gui_q.put(("done", str(json_path), str(csv_path), 0))
+    def _release(self, rel: int, shared: _fut.Future):
+        """Une demande annulée ; la dernière annule la requête pas encore partie."""
+        with self._lock:
+            if self._inflight.get(rel) is not shared:
                 return
+            self._waiters[rel] -= 1
+            if self._waiters[rel] == 0 and shared.cancel():
+                del self._inflight[rel], self._waiters[rel]
 
-            # ➋ construire l'ensemble complet des champs rencontrés
-            all_keys = set().union(*(rec.keys() for rec in self.doors))
-            header = ["city", "street", "rta"] + sorted(all_keys)
-
-            with open(csv_path, "w", newline="", encoding="utf-8") as f:
-                w = csv.writer(f)
-                w.writerow(header)
-                for rec in self.doors:
-                    w.writerow(
-                        [
-                            self.city,
-                            self.street or "",
-                            self.rta or "",
-                            *[rec.get(k, "") for k in sorted(all_keys)],
-                        ]
-                    )
+    def _fetch(self, rel: int) -> List[str]:
+        try:
+            sts = fetch_streets_for_city(rel)
+            with self._lock:
+                self.cache[rel] = sts
+            return sts
+        finally:
+            with self._lock:
+                self._inflight.pop(rel, None)
+                self._waiters.pop(rel, None)
 
-            self.gui_q.put(("done", str(json_path), str(csv_path), len(self.doors)))
+    def prefetch(self, rels):
+        for rel in rels:
+            self.get(rel)
 
-        except Exception as e:
-            self._dbg(f"FATAL ERROR {e}")
-            self.gui_q.put(("error", str(e)))
-        finally:
-            # — EXPORT inconditionnel -----------------------------------------
-            try:
-                if self.doors:
-                    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-                    parts = [_slug(self.city)]
-                    if self.street:
-                        parts.append(_slug(self.street))
-                    if self.rta:
-                        parts.append(_slug(self.rta))
-                    prefix = "_".join(parts)
-
-                    out_json = self.dest_dir / f"doors_{prefix}_{ts}.json"
-                    out_csv = self.dest_dir / f"doors_{prefix}_{ts}.csv"
-
-                    out_json.write_text(
-                        json.dumps(self.doors, ensure_ascii=False, indent=2),
-                        encoding="utf-8",
-                    )
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
 
-                    all_keys = set().union(*(rec.keys() for rec in self.doors))
-                    header = ["city", "street", "rta"] + sorted(all_keys)
-                    with out_csv.open("w", newline="", encoding="utf-8") as f:
-                        w = csv.writer(f)
-                        w.writerow(header)
-                        for rec in self.doors:
-                            w.writerow(
-                                [
-                                    self.city,
-                                    self.street or "",
-                                    self.rta or "",
-                                    *[rec.get(k, "") for k in sorted(all_keys)],
-                                ]
-                            )
+    # ---------- villes récentes -----------------------------------------
+    @staticmethod
+    def load_recent() -> dict[str, dict]:
+        try:
+            return json.loads(RECENT_CITIES.read_text("utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    @classmethod
+    def note_city(cls, city: str) -> dict[str, dict]:
+        """Compte une sélection de `city` (nombre + date) et sauvegarde."""
+        recent = cls.load_recent()
+        e = recent.setdefault(city, {"n": 0, "t": 0})
+        e["n"], e["t"] = e["n"] + 1, time.time()
+        with contextlib.suppress(OSError):
+            RECENT_CITIES.write_text(
+                json.dumps(recent, ensure_ascii=False), encoding="utf-8"
+            )
+        return recent
 
-                    self.gui_q.put(
-                        ("done", str(out_json), str(out_csv), len(self.doors))
-                    )
-                else:
-                    self._dbg("aucune porte collectée — rien à exporter")
-            except Exception as exp:
-                self._dbg(f"❌ export final failed : {exp}")
-            finally:
-                if self.driver:
-                    with contextlib.suppress(Exception):
-                        self._dbg("Quitting Chrome")
-                        self.driver.quit()
+    @staticmethod
+    def likely(recent: dict[str, dict], n: int) -> List[str]:
+        """Les `n` villes les plus utilisées, les plus récentes d'abord."""
+        order = sorted(recent, key=lambda c: (recent[c]["n"], recent[c]["t"]))
+        return order[::-1][:n]
 
 
 # ── Interface graphique ─────────────────────────────────────────────────
 class ScraperGUI:
+    SNAP_FLUSH_MS = 10_000  # rues récupérées écrites par lots dans l'instantané
+
     def __init__(self):
         # Apparence
         ctk.set_appearance_mode("dark")
@@ -1591,11 +5759,17 @@ class ScraperGUI:
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # État interne
-        self.gui_q = queue.Queue()
-        self.pause_evt = threading.Event()
-        self.worker: Optional[SalesforceScraper] = None
+        self.gui_q, self.pause_evt = job_channel()
+        self.warmer: Optional[DriverWarmer] = None
+        self.worker: Optional[SalesforceScraper | ProcessJob] = None
         self.city2rel: Dict[str, int] = {}
         self.city2streets: Dict[str, List[str]] = {}
+        self._last_rta: Optional[str] = None
+        self.street_ix: Dict[str, tuple] = {}  # ville → (rues brutes, dédoublonnées)
+        self.streets = StreetFetcher()
+        self._street_req: Optional[_fut.Future] = None  # ville sélectionnée
+        self._snap_pending: Dict[str, List[str]] = {}  # rues à écrire en un lot
+        self._snap_flush: Optional[str] = None  # id du root.after() prévu
 
         # Variables liées à l'UI
         self.user_var = tk.StringVar()
@@ -1609,17 +5783,21 @@ class ScraperGUI:
         self.city_var = tk.StringVar()
         self.street_var = tk.StringVar()
         self.rta_var = tk.StringVar()
+        self.start_page_var = tk.StringVar()  # reprise d'un run interrompu
         self.employee_code = tk.StringVar()
         self.employee_code = tk.StringVar(value="20459")
 
         # Traces pour filtrage dynamique
         self.city_var.trace_add("write", self._filter_cities)
         self.street_var.trace_add("write", self._filter_streets)
+        self.rta_var.trace_add("write", self._on_rta)
 
         # Construction
         self._build_widgets()
         self._load_or_fetch_cities()
 
+        self._prewarm()
+
         # Boucle de polling des messages du thread
         self.root.after(100, self._poll_queue)
         self.root.mainloop()
@@ -1716,6 +5894,16 @@ class ScraperGUI:
             width=100,
         ).grid(row=0, column=7, **pad, sticky="w")
 
+        ctk.CTkLabel(sel_f, text="Start page (opt.):").grid(
+            row=1, column=0, **pad, sticky="e"
+        )
+        ctk.CTkEntry(
+            sel_f,
+            textvariable=self.start_page_var,
+            placeholder_text="e.g. 12",
+            width=100,
+        ).grid(row=1, column=1, **pad, sticky="w")
+
         # — Boutons Start / Specifics / Pause / Stop —
         btn_f = ctk.CTkFrame(self.root)
         btn_f.pack(pady=8)
@@ -1752,14 +5940,26 @@ class ScraperGUI:
         stats_f.pack(pady=4)
         self.page_lbl = ctk.CTkLabel(stats_f, text="Page: 0")
         self.door_lbl = ctk.CTkLabel(stats_f, text="Doors: 0")
+        self.rate_lbl = ctk.CTkLabel(stats_f, text="Rate: –")
+        self.eta_lbl = ctk.CTkLabel(stats_f, text="ETA: --:--:--")
         self.page_lbl.grid(row=0, column=0, padx=10)
         self.door_lbl.grid(row=0, column=1, padx=10)
+        self.rate_lbl.grid(row=0, column=2, padx=10)
+        self.eta_lbl.grid(row=0, column=3, padx=10)
 
         # — Log console —
         self.log = ctk.CTkTextbox(self.root, width=800, height=340, wrap="none")
         self.log.configure(state="disabled")
         self.log.pack(pady=8)
 
+    def _start_page(self) -> Optional[int]:
+        """Page de reprise saisie (1 si vide), None après un message d'erreur."""
+        raw = self.start_page_var.get().strip() or "1"
+        if not raw.isdigit() or int(raw) < 1:
+            messagebox.showerror("Error", "Start page : entier ≥ 1.")
+            return None
+        return int(raw)
+
     def _full_completion(self):
         """
         1) Ask for a folder.
@@ -1767,6 +5967,9 @@ class ScraperGUI:
         3) When it finishes, automatically run the numbers‐scraper
            against the newly created doors_*.csv (or .json) in that folder.
         """
+        start_page = self._start_page()
+        if start_page is None:
+            return
         # pick a folder
         dst = fd.askdirectory(
             title="Choose destination for doors + numbers", initialdir=downloads_dir()
@@ -1781,15 +5984,18 @@ class ScraperGUI:
 
         # step 1: run the SalesforceScraper
         self.pause_evt.clear()
-        self.worker = SalesforceScraper(
-            self.user_var.get().strip(),
-            self.pwd_var.get().strip(),
-            self.city_var.get().strip(),
-            self.street_var.get().strip().upper() or None,
-            self.rta_var.get().strip() or None,
+        self.worker = make_job(
+            "doors",
             self.gui_q,
             self.pause_evt,
+            user=self.user_var.get().strip(),
+            pwd=self.pwd_var.get().strip(),
+            city=self.city_var.get().strip(),
+            street=self.street_var.get().strip().upper() or None,
+            rta=self.rta_var.get().strip() or None,
             dest_dir=self.destination_folder,
+            warm=self.warmer,
+            start_page=start_page,
         )
 
         if self.worker and self.worker.is_alive():
@@ -1819,6 +6025,14 @@ class ScraperGUI:
         self.full_mode = True
 
     def _load_or_fetch_cities(self):
+        self.rta_index = RtaIndex.load()
+        snap = CitySnapshot.load()  # pas gardé mappé : bloquerait les écritures
+        if snap is not None:
+            self.city2rel = snap.city_map() if len(snap) else {}
+            snap.close()
+        if self.city2rel:
+            self._populate_cities()
+            return
         self.city2rel = fetch_or_load_cities(CITIES_CACHE)
         if self.city2rel:
             self._populate_cities()
@@ -1839,38 +6053,111 @@ class ScraperGUI:
     def _populate_cities(self):
         vals = sorted(self.city2rel.keys())
         self.city_cb.configure(values=vals)
+        # préchargement des villes habituelles, en arrière-plan
+        recent = StreetFetcher.load_recent()
+        likely = StreetFetcher.likely(recent, CFG["street_prefetch"])
+        self.streets.prefetch(self.city2rel[c] for c in likely if c in self.city2rel)
 
     def _on_city(self, *_):
         city = self.city_var.get()
         self.street_cb.set("")
         self.street_cb.configure(values=[], state="disabled")
+        if city not in self.city2rel:
+            return
+        StreetFetcher.note_city(city)
+        if city not in self.city2streets:
+            sts = snapshot_streets(city)
+            if sts is not None:
+                self.city2streets[city] = sts
+        choices = self._street_choices(city)
+        if choices or city in self.city2streets:
+            self.street_cb.configure(values=choices, state="normal")
         if city in self.city2streets:
-            self.street_cb.configure(values=self.city2streets[city], state="normal")
-        else:
-            threading.Thread(
-                target=self._thread_fetch_streets, args=(city,), daemon=True
-            ).start()
+            return
+        if self._street_req and not self._street_req.done():
+            self._street_req.cancel()  # la requête partagée reste due aux autres
+        fut = self._street_req = self.streets.get(self.city2rel[city])
+        if not fut.done():
+            self._log(f"⏳ Récupération rues de {city}…")
+        fut.add_done_callback(
+            lambda f: self.root.after(0, self._streets_ready, city, f)
+        )
 
-    def _thread_fetch_streets(self, city: str):
-        self._log(f"⏳ Récupération rues de {city}…")
+    def _streets_ready(self, city: str, fut: _fut.Future):
+        """Résultat d'un fetch : gardé en cache, affiché si la ville l'est encore."""
+        if fut.cancelled():
+            return
         try:
-            rel = self.city2rel[city]
-            sts = fetch_streets_for_city(rel)
-            self.city2streets[city] = sts
-            self._log(f"✅ {len(sts):,} rues chargées")
+            sts = fut.result()
         except Exception as e:
             self._log(f"❌ Échec rues: {e}")
             sts = []
-        self.root.after(0, lambda: self.street_cb.configure(values=sts, state="normal"))
+        else:
+            self.city2streets[city] = sts
+            self._snap_pending[city] = sts
+            if self._snap_flush is None:
+                self._snap_flush = self.root.after(
+                    self.SNAP_FLUSH_MS, self._flush_snapshot
+                )
+        if city != self.city_var.get():
+            return  # réponse d'une ville qui n'est plus sélectionnée
+        self._log(f"✅ {len(sts):,} rues chargées")
+        self.street_cb.configure(values=self._street_choices(city), state="normal")
+
+    def _flush_snapshot(self):
+        """Écrit les rues récupérées depuis la dernière fois, en un seul lot."""
+        self._snap_flush = None
+        if not self._snap_pending:
+            return
+        if CitySnapshot.record(self.city2rel, self._snap_pending):
+            self._snap_pending = {}
+        else:  # fichier occupé (autre processus) : réessayé plus tard
+            self._snap_flush = self.root.after(self.SNAP_FLUSH_MS, self._flush_snapshot)
+
+    def _rta_cities(self) -> List[str]:
+        """Villes de la RTA postale saisie, d'après l'index ([] sinon)."""
+        rta = RtaIndex.normalize(self.rta_var.get())
+        return self.rta_index.cities(rta) if rta and self.rta_index else []
+
+    def _street_choices(self, city: str) -> List[str]:
+        """
+        Rues proposées, une par rue réelle (variantes OSM regroupées) :
+        celles de la RTA saisie si l'index la connaît.
+        """
+        rta = RtaIndex.normalize(self.rta_var.get())
+        if rta and self.rta_index:
+            in_rta = self.rta_index.streets(rta, city)
+            if in_rta:
+                return StreetIndex(in_rta).names()
+        sts = self.city2streets.get(city, [])
+        ix = self.street_ix.get(city)
+        if ix is None or ix[0] is not sts:
+            ix = self.street_ix[city] = (sts, StreetIndex(sts).names())
+        return ix[1]
+
+    def _on_rta(self, *_):
+        cities = self._rta_cities()
+        self._filter_cities()
+        city = self.city_var.get()
+        choices = self._street_choices(city) if city in self.city2rel else []
+        if choices:
+            self.street_cb.configure(values=choices, state="normal")
+        rta = RtaIndex.normalize(self.rta_var.get())
+        if cities and rta != self._last_rta:  # une fois par RTA, pas par touche
+            self._log(f"📮 RTA {rta} : {', '.join(cities[:8])}")
+        self._last_rta = rta
 
     def _filter_cities(self, *args):
         txt = self.city_var.get().lower()
         vals = [c for c in self.city2rel if txt in c.lower()]
+        in_rta = set(self._rta_cities())
+        if in_rta:
+            vals = [c for c in vals if c in in_rta]
         self.city_cb.configure(values=sorted(vals))
 
     def _filter_streets(self, *args):
         city = self.city_var.get()
-        all_sts = self.city2streets.get(city, [])
+        all_sts = self._street_choices(city)
         txt = self.street_var.get().lower()
         vals = [s for s in all_sts if txt in s.lower()]
         self.street_cb.configure(values=sorted(vals))
@@ -1895,14 +6182,16 @@ class ScraperGUI:
 
         # Reset UI
         self.prog.set(0)
+        self._reset_rate()
         self.log.configure(state="normal")
         self.log.delete("1.0", "end")
         self.log.configure(state="disabled")
 
-        self.detail_scraper = ClicDetailScraper(
-            Path(doors_fp),
+        self.detail_scraper = make_job(
+            "numbers",
             self.gui_q,
             self.pause_evt,
+            doors_path=Path(doors_fp),
             dest_dir=Path(dst_dir),
             clic_user=self.clic_user_var.get().strip(),
             clic_pwd=self.clic_pwd_var.get().strip(),
@@ -1927,6 +6216,9 @@ class ScraperGUI:
             return
         street = self.street_var.get().strip().upper() or None
         rta = self.rta_var.get().strip() or None
+        start_page = self._start_page()
+        if start_page is None:
+            return
 
         dst_dir = fd.askdirectory(
             title="Choisir le dossier de destination", initialdir=downloads_dir()
@@ -1939,24 +6231,30 @@ class ScraperGUI:
         self.page_lbl.configure(text="Page: 0")
         self.door_lbl.configure(text="Doors: 0")
         self.prog.set(0)
+        self._reset_rate()
         self.log.configure(state="normal")
         self.log.delete("1.0", "end")
         self.log.configure(state="disabled")
 
         # Lancer le thread
         self.pause_evt.clear()
-        self.worker = SalesforceScraper(
-            user,
-            pwd,
-            city,
-            street,
-            rta,
+        self.worker = make_job(
+            "doors",
             self.gui_q,
             self.pause_evt,
+            user=user,
+            pwd=pwd,
+            city=city,
+            street=street,
+            rta=rta,
             dest_dir=self.dest_dir,
+            warm=self.warmer,
+            start_page=start_page,
         )
         self._log(
-            f"▶ Starting doors scraping for {city}" + (f" - {street}" if street else "")
+            f"▶ Starting doors scraping for {city}"
+            + (f" - {street}" if street else "")
+            + (f" from page {start_page}" if start_page > 1 else "")
         )
         self.worker.start()
 
@@ -1998,6 +6296,10 @@ class ScraperGUI:
                     self.door_lbl.configure(text=f"Doors: {doors}")
                     if pct is not None:
                         self.prog.set(pct)
+                elif tag == "metrics":
+                    unit, rate, eta = payload
+                    self.rate_lbl.configure(text=f"{unit}/min: {rate:.1f}")
+                    self.eta_lbl.configure(text=f"ETA: {_fmt_eta(eta)}")
                 elif tag == "detail_progress":
                     idx, total = payload
                     pct = idx / total
@@ -2018,10 +6320,11 @@ class ScraperGUI:
                             f"\n▶ Starting Step 2: Getting numbers from {doors_fp.name}"
                         )
                         # fire up the ClicDetailScraper with the same dest folder
-                        self.detail_scraper = ClicDetailScraper(
-                            doors_fp,
+                        self.detail_scraper = make_job(
+                            "numbers",
                             self.gui_q,
                             self.pause_evt,
+                            doors_path=doors_fp,
                             dest_dir=self.destination_folder,
                             clic_user=self.clic_user_var.get().strip(),
                             clic_pwd=self.clic_pwd_var.get().strip(),
@@ -2059,7 +6362,12 @@ class ScraperGUI:
 
         self.root.after(150, self._poll_queue)
 
+    def _reset_rate(self):
+        self.rate_lbl.configure(text="Rate: –")
+        self.eta_lbl.configure(text="ETA: --:--:--")
+
     def _reset_buttons(self):
+        self._prewarm()
         self.get_doors_btn.configure(state="normal")
         self.get_numbers_btn.configure(state="normal")
         self.full_btn.configure(state="normal")
@@ -2067,15 +6375,31 @@ class ScraperGUI:
         self.stop_btn.configure(state="disabled")
         self.prog.set(1)
 
+    def _prewarm(self):
+        """Chrome prêt sur la page de login pour le prochain job (si utile)."""
+        if not CFG["prewarm_driver"] or CFG["job_backend"] != "thread":
+            return
+        if self.warmer is None or self.warmer.taken():
+            self.warmer = DriverWarmer(lambda m: self.gui_q.put(("log", m))).start()
+
     def _on_close(self):
         if self.worker and self.worker.is_alive():
             if messagebox.askyesno("Quit", "Scraper running. Stop and quit?"):
                 self.worker.stop()
             else:
                 return
+        if self.warmer:
+            self.warmer.close()
+        self.streets.shutdown()
+        if self._snap_flush is not None:
+            self.root.after_cancel(self._snap_flush)
+        self._flush_snapshot()
         self.root.destroy()
 
 
 # ─────────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # processus de job dans l'exécutable
+    if len(sys.argv) > 1:
+        sys.exit(cli_main(sys.argv[1:]))
     ScraperGUI()
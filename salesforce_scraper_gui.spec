@@ -5,6 +5,7 @@ a = Analysis(
     ['salesforce_scraper_gui.py'],
     pathex=[],
     binaries=[],
+    # data/ embarque qc_snapshot.bin (villes + rues) : `... snapshot --streets` avant le build
     datas=[('config.json', '.'), ('data', 'data'), ('helpers', 'helpers')],
     hiddenimports=['customtkinter', 'undetected_chromedriver'],
     hookspath=[],
@@ -0,0 +1,29 @@
+"""
+Fixtures communes. Le module principal réécrit config.json à l'import
+(CFG fusionné) : le fichier est remis tel quel juste après.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+CONFIG = ROOT / "config.json"
+sys.path.insert(0, str(ROOT))
+
+_config = CONFIG.read_bytes() if CONFIG.exists() else None
+import salesforce_scraper_gui as sg  # noqa: E402
+
+if _config is not None:
+    CONFIG.write_bytes(_config)
+
+
+@pytest.fixture
+def cfg(monkeypatch):
+    """`cfg(clé=valeur, …)` : réglages CFG restaurés après le test."""
+
+    def set_(**kw):
+        for key, value in kw.items():
+            monkeypatch.setitem(sg.CFG, key, value)
+
+    return set_
@@ -0,0 +1,83 @@
+import pytest
+
+import salesforce_scraper_gui as sg
+
+FIELDS = [
+    {"name": "Id", "label": "Record ID", "type": "id"},
+    {"name": "Actif__c", "label": "Actif", "type": "boolean"},
+    {"name": "Ville__c", "label": "Ville", "type": "string"},
+    {"name": "Rue__c", "label": "Rue", "type": "string"},
+    {"name": "RTA__c", "label": "RTA", "type": "picklist"},
+    {"name": "Adresse__c", "label": "Adresse", "type": "address"},
+    {
+        "name": "Client__c",
+        "label": "Client",
+        "type": "reference",
+        "relationshipName": "Client__r",
+    },
+    {"name": "Unites__c", "label": "Unités", "type": "double"},
+]
+
+
+class FakeApi:
+    def describe(self, sobject):
+        assert sobject == "Residences__c"
+        return {"fields": FIELDS}
+
+
+@pytest.fixture
+def bulk():
+    return sg.BulkDoorQuery(FakeApi())
+
+
+def test_soql_filters_and_columns(bulk):
+    soql = bulk.soql("Laval", "RUE PRINCIPALE", "H7N")
+    assert soql.startswith("SELECT Id, Actif__c, Ville__c, Rue__c, RTA__c, ")
+    assert "Client__r.Name" in soql and "Adresse__c" not in soql
+    assert soql.endswith(
+        "FROM Residences__c WHERE Actif__c = true"
+        " AND Ville__c LIKE '%Laval%'"
+        " AND Rue__c LIKE '%RUE PRINCIPALE%'"
+        " AND RTA__c = 'H7N'"
+    )
+
+
+def test_soql_optional_filters(bulk):
+    soql = bulk.soql("Laval", None, None)
+    assert "Rue__c LIKE" not in soql and "RTA__c =" not in soql
+
+
+def test_soql_escapes_quotes_and_like_wildcards(bulk):
+    soql = bulk.soql("L'Île-Perrot", "RUE 100%_A\\B", "H2X'")
+    assert "Ville__c LIKE '%L\\'Île-Perrot%'" in soql
+    assert "Rue__c LIKE '%RUE 100\\%\\_A\\\\B%'" in soql
+    # égalité de picklist : pas de jokers LIKE à neutraliser
+    assert "RTA__c = 'H2X\\''" in soql
+
+
+def test_unknown_label_is_an_error(bulk):
+    del bulk.by_label["Rue"]
+    with pytest.raises(KeyError):
+        bulk.soql("Laval", "RUE X", None)
+
+
+def test_record_uses_labels(bulk):
+    rec = bulk._record(
+        {
+            "Id": "a0r000000000001AAA",
+            "Actif__c": True,
+            "Ville__c": " Laval ",
+            "Rue__c": "  ",
+            "RTA__c": None,
+            "Client__r": {"Name": "Jean Fizz"},
+            "Unites__c": 4.0,
+        }
+    )
+    assert rec == {
+        "Actif": "Oui",
+        "Ville": "Laval",
+        "Rue": None,
+        "RTA": None,
+        "Client": "Jean Fizz",
+        "Unités": "4.0",
+    }
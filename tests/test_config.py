@@ -0,0 +1,13 @@
+import salesforce_scraper_gui as sg
+
+
+def test_apply_config_rebuilds_door_schema(cfg, monkeypatch):
+    monkeypatch.setattr(sg, "DOOR_SCHEMA", sg.DOOR_SCHEMA)
+    cfg(door_fields=list(sg.DOOR_SCHEMA.fields), sf_page_size=sg.CFG["sf_page_size"])
+    before = sg.DOOR_SCHEMA
+    sg.apply_config({"sf_page_size": 50})
+    assert sg.DOOR_SCHEMA is before and sg.CFG["sf_page_size"] == 50
+    sg.apply_config({"door_fields": ["Client", "Compte client", "Client"]})
+    assert sg.DOOR_SCHEMA.header == ["Client", "Compte client"]
+    rec = sg.DOOR_SCHEMA.make({"Client": "Jean", "Résidence": "12 RUE X"})
+    assert rec.to_dict() == {"Client": "Jean", "Compte client": None}
@@ -0,0 +1,22 @@
+import pytest
+
+import salesforce_scraper_gui as sg
+
+
+@pytest.mark.parametrize(
+    "txt, expected",
+    [
+        ("(1-25)", (1, 25, None)),
+        ("1-25 of 340", (1, 25, 340)),
+        ("1 - 25 sur 1 234", (1, 25, 1234)),
+        ("26-50 of 1,340", (26, 50, 1340)),
+        ("Éléments 201 - 225 sur 4 012", (201, 225, 4012)),
+    ],
+)
+def test_parse_items_range(txt, expected):
+    assert sg._parse_items_range(txt) == expected
+
+
+@pytest.mark.parametrize("txt", ["", None, "Aucun résultat"])
+def test_parse_items_range_without_range(txt):
+    assert sg._parse_items_range(txt) == (None, None, None)
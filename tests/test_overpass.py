@@ -0,0 +1,102 @@
+import pytest
+import requests
+
+import salesforce_scraper_gui as sg
+
+A, B = "https://a.test/api/interpreter", "https://b.test/api/interpreter"
+
+
+class Response:
+    def __init__(self, status=200, body=""):
+        self.status_code = status
+        self.body = body
+        self.encoding = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}")
+
+    @property
+    def content(self):
+        return self.body.encode("utf-8")
+
+    def iter_lines(self, decode_unicode=True):
+        return iter(self.body.splitlines())
+
+
+class Session:
+    """Réponses scriptées par miroir ; une exception est levée telle quelle."""
+
+    def __init__(self, **script):
+        self.script = {url: list(v) for url, v in script.items()}
+        self.calls = []
+
+    def post(self, url, data, timeout, stream):
+        self.calls.append(url)
+        out = self.script[url].pop(0)
+        if isinstance(out, Exception):
+            raise out
+        return out
+
+
+@pytest.fixture
+def client(cfg, monkeypatch):
+    cfg(overpass_retries=2, overpass_backoff_sec=2)
+    sleeps = []
+    monkeypatch.setattr(sg.time, "sleep", sleeps.append)
+    monkeypatch.setattr(sg.random, "uniform", lambda a, b: 1.0)
+    c = sg.OverpassClient([A, B])
+    c.sleeps = sleeps
+    return c
+
+
+def test_fails_over_to_next_mirror_and_remembers_it(client):
+    client.session = Session(
+        **{A: [Response(429)], B: [Response(body="Rue A\t1"), Response(body="x")]}
+    )
+    assert client.rows("q", 10) == [["Rue A", "1"]]
+    assert client.rows("q", 10) == [["x"]]
+    assert client.session.calls == [A, B, B]  # dernier miroir sain en premier
+    assert client.sleeps == []  # bascule sans attente dans un même tour
+
+
+def test_backoff_after_each_full_round(client):
+    client.session = Session(
+        **{
+            A: [Response(504), requests.ConnectionError("reset")],
+            B: [requests.Timeout("lent"), Response(503)],
+        }
+    )
+    with pytest.raises(sg.OverpassError, match="HTTP 503"):
+        client.rows("q", 10)
+    assert client.session.calls == [A, B, A, B]
+    assert client.sleeps == [2, 4]
+
+
+def test_error_page_in_200_tries_next_mirror(client):
+    client.session = Session(
+        **{A: [Response(body="<html>runtime error</html>")], B: [Response(body="1")]}
+    )
+    assert client.rows("q", 10) == [["1"]]
+
+
+def test_xml_remark_error_tries_next_mirror(client):
+    bad = "<osm><remark> runtime error: Query timed out </remark></osm>"
+    good = '<osm><action type="delete"/></osm>'
+    client.session = Session(**{A: [Response(body=bad)], B: [Response(body=good)]})
+    root = client.xml("q", 10)
+    assert root.find("action").get("type") == "delete"
+    assert client.session.calls == [A, B]
+
+
+def test_rejected_query_is_not_retried(client):
+    client.session = Session(**{A: [Response(400)], B: []})
+    with pytest.raises(requests.HTTPError):
+        client.rows("q", 10)
+    assert client.session.calls == [A]
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+import salesforce_scraper_gui as sg
+
+
+@pytest.fixture
+def wq(tmp_path, cfg):
+    cfg(work_lease_sec=300, work_max_attempts=2)
+    q = sg.WorkQueue(tmp_path / "queue.sqlite3")
+    yield q
+    q.db.close()
+
+
+def expire(wq, unit_id):
+    wq.db.execute("UPDATE units SET lease_until = 0 WHERE id = ?", (unit_id,))
+
+
+def row(wq, unit_id):
+    return wq.db.execute(
+        "SELECT state, attempts, owner, error, result FROM units WHERE id = ?",
+        (unit_id,),
+    ).fetchone()
+
+
+def test_lease_oldest_unit_of_requested_kinds(wq):
+    wq.put("accounts", [{"doors_file": "a.csv"}])
+    wq.put("street", [{"street": "RUE A"}, {"street": "RUE B"}])
+    unit = wq.lease("w1", ("street",))
+    assert unit["kind"] == "street" and unit["payload"] == {"street": "RUE A"}
+    assert wq.lease("w2", ("street",))["payload"] == {"street": "RUE B"}
+    assert wq.lease("w3", ("street",)) is None
+    assert wq.lease("w3", ("street", "accounts"))["kind"] == "accounts"
+
+
+def test_heartbeat_extends_own_lease_only(wq):
+    wq.put("street", [{}])
+    unit = wq.lease("w1", ("street",))
+    wq.db.execute("UPDATE units SET lease_until = 1 WHERE id = ?", (unit["id"],))
+    assert wq.heartbeat(unit["id"], "w1")
+    until = wq.db.execute("SELECT lease_until FROM units").fetchone()[0]
+    assert until > sg.time.time() + 200
+    assert not wq.heartbeat(unit["id"], "w2")
+
+
+def test_expired_lease_is_reclaimed(wq):
+    wq.put("street", [{"street": "RUE A"}])
+    unit = wq.lease("w1", ("street",))
+    expire(wq, unit["id"])
+    again = wq.lease("w2", ("street",))
+    assert again["id"] == unit["id"]
+    assert row(wq, unit["id"])[:3] == ("leased", 2, "w2")
+    # l'ancien titulaire a perdu le bail : ni heartbeat ni résultat
+    assert not wq.heartbeat(unit["id"], "w1")
+    wq.finish(unit["id"], "w1", {"doors": 1})
+    assert row(wq, unit["id"])[0] == "leased"
+    wq.finish(unit["id"], "w2", {"doors": 3})
+    state, *_, result = row(wq, unit["id"])
+    assert state == "done" and json.loads(result) == {"doors": 3}
+
+
+def test_expired_lease_fails_after_max_attempts(wq):
+    wq.put("street", [{}])
+    for _ in range(2):
+        unit = wq.lease("w1", ("street",))
+        expire(wq, unit["id"])
+    assert wq.lease("w1", ("street",)) is None
+    assert row(wq, unit["id"])[0::3] == ("failed", "bail expiré")
+    assert wq.counts() == {"failed": 1}
+
+
+def test_finish_error_requeues_until_max_attempts(wq):
+    wq.put("street", [{}])
+    unit = wq.lease("w1", ("street",))
+    wq.finish(unit["id"], "w1", None, "Chrome perdu")
+    assert row(wq, unit["id"])[:2] == ("pending", 1)
+    unit = wq.lease("w1", ("street",))
+    wq.finish(unit["id"], "w1", None, "Chrome perdu")
+    assert row(wq, unit["id"])[:2] == ("failed", 2)
+    assert wq.lease("w1", ("street",)) is None
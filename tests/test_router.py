@@ -0,0 +1,95 @@
+import pytest
+from selenium.common.exceptions import (InvalidSessionIdException,
+                                        NoSuchElementException,
+                                        TimeoutException, WebDriverException)
+
+import salesforce_scraper_gui as sg
+
+SHORT, BOTH, LONG = "1234", "12345678", "123456789"  # Clic+, les deux, CSR
+
+
+class Job:
+    def __init__(self):
+        self.rows, self.progress, self.logs = [], [], []
+
+    def _progress(self, done, total):
+        self.progress.append((done, total))
+
+    def _dbg(self, msg):
+        self.logs.append(msg)
+
+
+@pytest.fixture
+def router(cfg):
+    cfg(account_backends=["clic", "csr"], clic_max_digits=8, csr_min_digits=7)
+    return sg.AccountRouter(Job(), [SHORT, BOTH, LONG])
+
+
+def queues(r):
+    return {n: list(q) for n, q in r.queues.items()}
+
+
+def test_route_to_first_backend_that_can_serve(router):
+    assert queues(router) == {"clic": [SHORT, BOTH], "csr": [LONG]}
+    assert router.failed == [] and router.total == 3
+
+
+def test_account_without_backend_fails_at_once(cfg):
+    cfg(account_backends=["csr"], csr_min_digits=7)
+    r = sg.AccountRouter(Job(), [SHORT, LONG])
+    assert queues(r) == {"csr": [LONG]}
+    assert r.failed == [SHORT] and r.job.progress == [(1, 2)]
+
+
+def test_failure_reroutes_to_untried_backend(router):
+    assert router._take("clic") == SHORT
+    assert router._take("clic") == BOTH
+    router._finish("clic", BOTH, None, 2.0)
+    assert queues(router)["csr"] == [LONG, BOTH]
+    assert router.tried[BOTH] == {"clic"}
+    assert router.stats["clic"].failed == 1 and router.stats["clic"].busy == 2.0
+    assert "échec clic → csr" in router.job.logs[-1]
+    # échec aussi sur CSR : plus rien à essayer
+    router._finish("csr", BOTH, None, 1.0)
+    assert router.failed == [BOTH] and router.job.progress == [(1, 3)]
+
+
+def test_success_keeps_the_record(router):
+    router._finish("clic", SHORT, {"Compte client": SHORT, "Téléphone": "555"}, 1.0)
+    assert router.job.rows[0]["Téléphone"] == "555"
+    assert router.stats["clic"].ok == 1 and router.done == 1
+
+
+def test_idle_lane_takes_accounts_it_can_serve(router):
+    assert router._take("csr") == LONG
+    assert router._take("csr") == BOTH  # pris dans la file de Clic+
+    assert router._take("csr") is None  # SHORT : CSR ne sait pas le servir
+    assert queues(router)["clic"] == [SHORT]
+
+
+def test_disabled_backend_hands_its_queue_over(router):
+    router._disable("clic")
+    assert queues(router) == {"clic": [], "csr": [LONG, BOTH]}
+    assert router.failed == [SHORT]
+
+
+def test_requeue_puts_account_back_first(router):
+    acc = router._take("clic")
+    router._requeue("clic", acc)
+    assert queues(router)["clic"] == [SHORT, BOTH]
+    assert router.done == 0 and not router.tried
+
+
+@pytest.mark.parametrize(
+    "exc, dead",
+    [
+        (InvalidSessionIdException("invalid session id"), True),
+        (WebDriverException("chrome not reachable"), True),
+        (ConnectionRefusedError(), True),
+        (TimeoutException("page lente"), False),
+        (NoSuchElementException("#custId"), False),
+        (ValueError("fiche illisible"), False),
+    ],
+)
+def test_driver_dead(exc, dead):
+    assert sg.driver_dead(exc) is dead
@@ -0,0 +1,42 @@
+import salesforce_scraper_gui as sg
+
+FIZZ = {"column": ["Client", "Compte client"], "contains": "fizz"}
+
+
+def test_first_non_empty_column_decides():
+    f = sg.RowFilter([FIZZ])
+    assert f.rejects({"Client": "", "Compte client": "FIZZ 42"}) == (
+        "Compte client=FIZZ 42"
+    )
+    # Client renseigné : Compte client n'est pas regardé
+    assert f.rejects({"Client": "Jean", "Compte client": "fizz"}) is None
+    assert f.rejects({"Client": "Fizzbuzz inc."}) == "Client=Fizzbuzz inc."
+
+
+def test_partial_row_missing_column_is_undecided():
+    f = sg.RowFilter([FIZZ])
+    row = {"Compte client": "fizz"}  # colonne Client absente de la vue
+    assert f.rejects(row, partial=True) is None
+    # sur la fiche, un champ absent compte comme vide
+    assert f.rejects(row) == "Compte client=fizz"
+    # colonne présente mais vide : la suivante décide, même sur une ligne
+    assert f.rejects({"Client": "", "Compte client": "fizz"}, partial=True)
+
+
+def test_equals_and_regex_rules():
+    f = sg.RowFilter(
+        [
+            {"column": "Dernier statut", "equals": "Débranché"},
+            {"column": "Résidence", "regex": r"^\d+-"},
+        ]
+    )
+    assert f.rejects({"Dernier statut": " débranché "})
+    assert f.rejects({"Dernier statut": "Débranché depuis 2020"}) is None
+    assert f.rejects({"Résidence": "12-300 RUE X"}) == "Résidence=12-300 RUE X"
+    assert f.rejects({"Résidence": "300 RUE X"}) is None
+
+
+def test_rules_default_to_config(cfg):
+    cfg(row_filters=[{"column": "Client", "contains": "test"}])
+    assert sg.RowFilter().rejects({"Client": "TEST"}) == "Client=TEST"
+    assert sg.RowFilter([]).rejects({"Client": "TEST"}) is None
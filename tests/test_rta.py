@@ -0,0 +1,69 @@
+import pytest
+
+import salesforce_scraper_gui as sg
+
+CITY = [f"Rue {n}" for n in "ABCDEFGHIJ"]  # 10 rues dans l'instantané
+
+
+def index_for(streets, tmp_path=None):
+    """Index RTA : H7N = rues A-B, H7P = les autres de `streets`."""
+    ix = sg.RtaIndex(tmp_path / "rta.json" if tmp_path else sg.RTA_INDEX)
+    ix.set_city("Laval", {"H7N": streets[:2], "H7P": streets[2:]})
+    return ix
+
+
+@pytest.fixture
+def env(monkeypatch, cfg):
+    """rta_streets sur un index et un instantané en mémoire."""
+    cfg(rta_index_min_coverage=0.9)
+    state = {"index": None, "streets": CITY}
+    monkeypatch.setattr(sg.RtaIndex, "load", classmethod(lambda c: state["index"]))
+    monkeypatch.setattr(sg, "snapshot_streets", lambda city: state["streets"])
+    return state
+
+
+@pytest.mark.parametrize(
+    "raw, rta",
+    [("h7n", "H7N"), ("H7N 1Y4", "H7N"), (" h7n1y4", "H7N"), ("75261", None)],
+)
+def test_normalize(raw, rta):
+    assert sg.RtaIndex.normalize(raw) == rta
+
+
+def test_lookup_by_rta_and_save_round_trip(tmp_path, cfg):
+    cfg(rta_index="rta.json")
+    ix = index_for(CITY, tmp_path)
+    ix.set_city("Montréal", {"H7N": ["Rue Z"]})
+    assert ix.cities("h7n 1y4") == ["Laval", "Montréal"]
+    assert ix.streets("H7N", "Laval") == ["Rue A", "Rue B"]
+    assert ix.streets("H2X", "Laval") == []  # ville couverte, RTA vide
+    assert ix.streets("H7N", "Gaspé") is None  # ville hors index
+    ix.save()
+    again = sg.RtaIndex.load(tmp_path / "rta.json")
+    assert again.by_city == ix.by_city and again.cities("H7N") == ix.cities("H7N")
+
+
+def test_streets_when_coverage_reaches_threshold(env):
+    # 9 rues sur 10, dont une graphie différente de la même rue
+    env["index"] = index_for(["Rue A", "rue b", *CITY[2:9]])
+    logs = []
+    assert sg.rta_streets("Laval", "H7N 1Y4", logs.append) == ["Rue A", "rue b"]
+    assert "1 rue(s) de Laval sans adresse postale OSM" in logs[0]
+
+
+def test_city_search_below_threshold(env):
+    env["index"] = index_for(CITY[:8])  # 80 %
+    logs = []
+    assert sg.rta_streets("Laval", "H7N", logs.append) is None
+    assert "80%" in logs[0]
+
+
+def test_city_search_without_usable_data(env):
+    env["index"] = index_for(CITY)
+    assert sg.rta_streets("Laval", "75261") is None  # RTA non postale
+    assert sg.rta_streets("Laval", "H2X") is None  # RTA absente de la ville
+    env["streets"] = None  # rues de la ville inconnues
+    assert sg.rta_streets("Laval", "H7N") is None
+    env["index"] = None
+    env["streets"] = CITY
+    assert sg.rta_streets("Laval", "H7N") is None
@@ -0,0 +1,180 @@
+import pytest
+
+import salesforce_scraper_gui as sg
+
+CITIES = {"Laval": 3532125, "Montréal": 1571328, "Gaspé": 7407030}
+STREETS = {"Laval": ["Rue B", "Rue A"], "Montréal": []}
+
+
+@pytest.fixture
+def path(tmp_path, monkeypatch, cfg):
+    """Instantané de test : chemin par défaut de load() et record() détourné."""
+    p = tmp_path / "snap.bin"
+    cfg(city_snapshot="snap.bin")
+    monkeypatch.setattr(sg, "CITY_SNAPSHOT", p)
+    monkeypatch.setattr(sg.CitySnapshot.load.__func__, "__defaults__", (p,))
+    return p
+
+
+def test_write_then_read(path):
+    sg.CitySnapshot.write(path, CITIES, STREETS, data_version=4, synced=123.0)
+    snap = sg.CitySnapshot.load()
+    try:
+        assert snap.city_map() == dict(sorted(CITIES.items()))
+        assert snap.streets("Laval") == ["Rue A", "Rue B"]
+        assert snap.streets("Montréal") == []  # connue, vide
+        assert snap.streets("Gaspé") is None  # jamais récupérée
+        assert snap.streets("Ailleurs") is None
+        assert (snap.data_version, snap.synced, len(snap)) == (4, 123.0, 3)
+    finally:
+        snap.close()
+
+
+def test_updated_bumps_version_and_keeps_other_cities(path):
+    sg.CitySnapshot.write(path, CITIES, STREETS, data_version=4, synced=123.0)
+    snap = sg.CitySnapshot.load()
+    new = snap.updated({"Gaspé": ["Rue C"]}, cities={"Percé": 7407031})
+    try:
+        assert new.data_version == 5 and new.synced == 123.0
+        assert new.streets("Gaspé") == ["Rue C"]
+        assert new.streets("Laval") == ["Rue A", "Rue B"]
+        assert new.city_map()["Percé"] == 7407031
+        assert new.streets("Percé") is None
+    finally:
+        new.close()
+    snap = sg.CitySnapshot.load().updated({}, synced=456.0)
+    assert (snap.data_version, snap.synced) == (6, 456.0)
+    snap.close()
+
+
+def test_failed_replace_leaves_snapshot_readable(path, monkeypatch):
+    sg.CitySnapshot.write(path, CITIES, STREETS)
+    snap = sg.CitySnapshot.load()
+    monkeypatch.setattr(sg.CitySnapshot, "REPLACE_TRIES", 1)
+
+    def locked(src, dst):
+        raise PermissionError("fichier mappé par un autre processus")
+
+    monkeypatch.setattr(sg.os, "replace", locked)
+    with pytest.raises(PermissionError):
+        snap.updated({"Gaspé": ["Rue C"]})
+    assert snap.streets("Laval") == ["Rue A", "Rue B"]  # rouvert tel quel
+    assert snap.data_version == 1
+    snap.close()
+    assert not path.with_suffix(".tmp").exists()
+
+
+def test_record_creates_then_merges(path):
+    assert sg.CitySnapshot.record(CITIES, {"Laval": ["Rue A"]})
+    assert sg.CitySnapshot.record(CITIES, {"Gaspé": ["Rue C"]})
+    snap = sg.CitySnapshot.load()
+    assert snap.streets("Laval") == ["Rue A"] and snap.streets("Gaspé") == ["Rue C"]
+    assert snap.data_version == 2
+    snap.close()
+
+
+def test_load_rejects_missing_or_foreign_files(path, cfg):
+    assert sg.CitySnapshot.load() is None
+    path.write_bytes(b"NOTASNAP" + bytes(64))
+    assert sg.CitySnapshot.load() is None
+    sg.CitySnapshot.write(path, CITIES, STREETS)
+    cfg(city_snapshot="")
+    assert sg.CitySnapshot.load() is None  # instantané désactivé
+
+
+# ---------- snapshot --refresh ------------------------------------------
+ADIFF = """<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6" generator="Overpass API">
+  <action type="modify">
+    <old><way id="1"><nd ref="1" lat="1.0" lon="1.0"/></way></old>
+    <new><way id="1"><nd ref="1" lat="1.0" lon="1.0"/></way></new>
+  </action>
+  <action type="delete">
+    <old><way id="2">
+      <nd ref="3" lat="45.55" lon="-73.75"/>
+      <nd ref="4" lat="45.56" lon="-73.74"/>
+      <nd ref="5" lat="45.57" lon="-73.73"/>
+    </way></old>
+    <new><way id="2" visible="false"/></new>
+  </action>
+</osm>"""
+
+
+class FakeOverpass:
+    """Réponses par requête : ways modifiés, diff augmenté, is_in."""
+
+    def __init__(self):
+        self.queries = []
+
+    def rows(self, query, timeout):
+        self.queries.append(query)
+        if "is_in(45.55,-73.75)" in query:
+            return [[str(3600000000 + CITIES["Laval"])]]
+        return [[str(3600000000 + CITIES["Montréal"])], ["id"]]
+
+    def xml(self, query, timeout):
+        self.queries.append(query)
+        return sg.ET.fromstring(ADIFF)
+
+
+def test_changed_cities_include_deleted_ways(monkeypatch):
+    fake = FakeOverpass()
+    monkeypatch.setattr(sg, "_overpass", fake)
+    assert sg.fetch_changed_cities(0) == {CITIES["Laval"], CITIES["Montréal"]}
+    adiff = next(q for q in fake.queries if "adiff" in q)
+    assert '[adiff:"1970-01-01T00:00:00Z"]' in adiff
+    assert "is_in(45.57,-73.73);" in fake.queries[-1]  # les deux extrémités
+
+
+@pytest.fixture
+def synced(path, monkeypatch):
+    """Instantané synchronisé à t=1000 ; Gaspé sans liste de rues."""
+    sg.CitySnapshot.write(path, CITIES, STREETS, data_version=4, synced=1000.0)
+    changed = {CITIES["Laval"], CITIES["Gaspé"], 42}
+    monkeypatch.setattr(sg, "fetch_changed_cities", lambda since: changed)
+    return path
+
+
+def test_refresh_advances_watermark(synced, monkeypatch):
+    fetched = []
+
+    def streets(rel):
+        fetched.append(rel)
+        return ["Rue A", "Rue Z"]
+
+    monkeypatch.setattr(sg, "fetch_streets_for_city", streets)
+    start = sg.time.time() - sg.SNAPSHOT_SYNC_MARGIN
+    assert sg.refresh_city_snapshot() == sg.EXIT_OK
+    assert fetched == [CITIES["Laval"]]  # Gaspé jamais récupérée : ignorée
+    snap = sg.CitySnapshot.load()
+    assert snap.streets("Laval") == ["Rue A", "Rue Z"]
+    assert snap.data_version == 5 and snap.synced >= start
+    snap.close()
+
+
+def test_refresh_failure_keeps_watermark(synced, monkeypatch):
+    def down(rel):
+        raise sg.OverpassError("miroirs indisponibles")
+
+    monkeypatch.setattr(sg, "fetch_streets_for_city", down)
+    assert sg.refresh_city_snapshot() == sg.EXIT_PARTIAL
+    snap = sg.CitySnapshot.load()
+    assert snap.synced == 1000.0 and snap.streets("Laval") == ["Rue A", "Rue B"]
+    snap.close()
+
+
+def test_refresh_without_diff_keeps_watermark(synced, monkeypatch):
+    def down(since):
+        raise sg.OverpassError("diff indisponible")
+
+    monkeypatch.setattr(sg, "fetch_changed_cities", down)
+    assert sg.refresh_city_snapshot() == sg.EXIT_FAILED
+    snap = sg.CitySnapshot.load()
+    assert (snap.synced, snap.data_version) == (1000.0, 4)
+    snap.close()
+
+
+def test_refresh_needs_a_watermark(path, capsys):
+    sg.CitySnapshot.write(path, CITIES, STREETS)
+    assert sg.refresh_city_snapshot() == sg.EXIT_USAGE
+    assert "no sync watermark" in capsys.readouterr().out
@@ -0,0 +1,100 @@
+import pytest
+
+import salesforce_scraper_gui as sg
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = sg.DoorStore(tmp_path / "doors.sqlite3")
+    yield s
+    s.close()
+
+
+def door(account, client="Jean"):
+    return sg.DOOR_SCHEMA.make({"Compte client": account, "Client": client})
+
+
+def age(store, key, sec):
+    """Recule fetched_at de `sec` secondes."""
+    store._db.execute(
+        "UPDATE doors SET fetched_at = fetched_at - ? WHERE key = ?", (sec, key)
+    )
+
+
+@pytest.mark.parametrize(
+    "href, rec, expected",
+    [
+        ("https://v.my.site.com/a0r5G00000abcDE?srPos=0", None, "a0r5G00000abcDE"),
+        ("/a0r5G00000abcDEQAZ", None, "a0r5G00000abcDE"),
+        ("/apex/Fiche?id=a0r5G00000abcDEQAZ", None, "a0r5G00000abcDE"),
+        ("a0r5G00000abcDEQAZ", None, "a0r5G00000abcDE"),
+        ("/resi/detail", {"Compte client": "12 345-678"}, "acct:12345678"),
+        ("/resi/detail", {}, "/resi/detail"),
+    ],
+)
+def test_door_key(href, rec, expected):
+    assert sg.door_key(href, rec) == expected
+
+
+def test_upsert_keeps_first_seen_and_replaces_record(store):
+    store.upsert("k1", door("1", "Avant"), "Laval", "RUE A", None)
+    first = store._db.execute("SELECT first_seen FROM doors").fetchone()[0]
+    store.upsert("k1", door("1", "Après"), "Laval", None, "H7N")
+    row = store._db.execute(
+        "SELECT street, rta, first_seen, last_seen FROM doors"
+    ).fetchone()
+    assert row[:3] == ("RUE A", "H7N", first) and row[3] >= first
+    assert store.select(["k1"])[0]["Client"] == "Après"
+
+
+def test_unfetched_upsert_only_touches_last_seen(store):
+    store.upsert("k1", door("1", "Lu"), "Laval", None, None)
+    store.upsert("k1", door("1", "Ligne"), "Laval", None, None, fetched=False)
+    assert store.select(["k1"])[0]["Client"] == "Lu"
+    store.upsert("k2", door("2"), "Laval", None, None, fetched=False)
+    assert store.reusable(["k2"], 3600) == {}  # jamais lue : rien à reprendre
+
+
+def test_reusable_freshness_window(store):
+    store.upsert("fresh", door("1"), "Laval", None, None)
+    store.upsert("stale", door("2"), "Laval", None, None)
+    age(store, "stale", 7200)
+    got = store.reusable(["fresh", "stale", "absent"], 3600)
+    assert list(got) == ["fresh"]
+    assert got["fresh"]["Compte client"] == "1"
+    assert store.reusable(["fresh"], 0) == {}  # 0 : pas de fenêtre
+    assert store.reusable([], 3600) == {}
+
+
+def test_select_follows_key_order(store):
+    for k in ("a", "b", "c"):
+        store.upsert(k, door(k), "Laval", None, None)
+    got = store.select(["c", "x", "a"])
+    assert [r["Compte client"] for r in got] == ["c", "a"]
+
+
+def test_reusable_on_matching_signature(store):
+    store.upsert("same", door("1"), "Laval", None, None, signature="s1")
+    store.upsert("moved", door("2"), "Laval", None, None, signature="s2")
+    store.upsert("unsigned", door("3"), "Laval", None, None)
+    for k in ("same", "moved", "unsigned"):
+        age(store, k, 30 * 86400)
+    sigs = {"same": "s1", "moved": "autre", "unsigned": None}
+    assert list(store.reusable(list(sigs), 3600, sigs)) == ["same"]
+    # hors fenêtre (0) : seule la signature compte
+    assert list(store.reusable(list(sigs), 0, sigs)) == ["same"]
+
+
+def test_unfetched_upsert_keeps_signature(store):
+    store.upsert("k", door("1"), "Laval", None, None, signature="s1")
+    store.upsert("k", door("1"), "Laval", None, None, fetched=False, signature="s2")
+    assert list(store.reusable(["k"], 0, {"k": "s1"})) == ["k"]
+
+
+def test_row_signature_columns(cfg):
+    cells = {"Client": "Jean", "Modifié": "2026-01-02", "Rang": "3"}
+    cfg(signature_columns=[])
+    assert sg._row_signature(cells) == sg._row_signature(dict(reversed(cells.items())))
+    assert sg._row_signature(cells) != sg._row_signature({**cells, "Rang": "4"})
+    cfg(signature_columns=["Modifié"])
+    assert sg._row_signature(cells) == sg._row_signature({**cells, "Rang": "4"})
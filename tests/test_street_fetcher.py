@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+import salesforce_scraper_gui as sg
+
+
+@pytest.fixture
+def overpass(monkeypatch):
+    """fetch_streets_for_city factice, bloqué jusqu'à `release.set()`."""
+
+    class Fake:
+        def __init__(self):
+            self.calls = []
+            self.release = threading.Event()
+            self.fail = False
+
+        def __call__(self, rel):
+            self.calls.append(rel)
+            assert self.release.wait(5)
+            if self.fail:
+                raise sg.OverpassError("miroirs indisponibles")
+            return [f"RUE {rel}"]
+
+    fake = Fake()
+    monkeypatch.setattr(sg, "fetch_streets_for_city", fake)
+    return fake
+
+
+@pytest.fixture
+def fetcher():
+    f = sg.StreetFetcher(workers=1)
+    yield f
+    f.shutdown()
+
+
+def test_concurrent_requests_share_one_query(overpass, fetcher):
+    a, b = fetcher.get(7), fetcher.get(7)
+    assert a is not b
+    overpass.release.set()
+    assert a.result(5) == b.result(5) == ["RUE 7"]
+    assert fetcher.get(7).result(0) == ["RUE 7"]  # cache
+    assert overpass.calls == [7]
+
+
+def test_error_reaches_every_waiter(overpass, fetcher):
+    overpass.fail = True
+    a, b = fetcher.get(7), fetcher.get(7)
+    overpass.release.set()
+    for f in (a, b):
+        with pytest.raises(sg.OverpassError):
+            f.result(5)
+    assert overpass.calls == [7] and 7 not in fetcher.cache
+
+
+def test_cancel_keeps_query_while_someone_waits(overpass, fetcher):
+    busy = fetcher.get(1)  # occupe le seul worker
+    a, b = fetcher.get(2), fetcher.get(2)
+    assert a.cancel()
+    overpass.release.set()
+    assert b.result(5) == ["RUE 2"] and busy.result(5) == ["RUE 1"]
+    assert overpass.calls == [1, 2]
+
+
+def test_last_cancel_drops_queued_query(overpass, fetcher):
+    busy = fetcher.get(1)
+    a, b = fetcher.get(2), fetcher.get(2)
+    assert a.cancel() and b.cancel()
+    assert 2 not in fetcher._inflight
+    overpass.release.set()
+    busy.result(5)
+    assert fetcher.get(2).result(5) == ["RUE 2"]  # nouvelle requête
+    assert overpass.calls == [1, 2]
@@ -0,0 +1,70 @@
+import pytest
+
+import salesforce_scraper_gui as sg
+
+
+@pytest.mark.parametrize(
+    "name, key",
+    [
+        ("Av. St-Denis", ("AVENUE", "SAINT DENIS")),
+        ("Avenue Saint Denis", ("AVENUE", "SAINT DENIS")),
+        ("Boul. Ste-Rose", ("BOULEVARD", "SAINTE ROSE")),
+        ("Rue Sherbrooke O", ("RUE", "SHERBROOKE OUEST")),
+        ("Rue Sherbrooke Ouest", ("RUE", "SHERBROOKE OUEST")),
+        ("Montée Saint-François E", ("MONTEE", "SAINT FRANCOIS EST")),
+        ("Rue de la Gauchetière", ("RUE", "DE LA GAUCHETIERE")),
+        ("Saint-Denis", ("", "SAINT DENIS")),
+        ("Rue", ("", "RUE")),  # un mot seul n'est pas un type
+        ("Rue E", ("RUE", "E")),  # ni une direction
+    ],
+)
+def test_street_key(name, key):
+    assert sg.street_key(name) == key
+
+
+def test_variants_are_one_street():
+    ix = sg.StreetIndex(
+        ["Av. St-Denis", "Avenue Saint-Denis", "Avenue Saint Denis", "Rue Ontario"]
+    )
+    assert ix.names() == ["Avenue Saint-Denis", "Rue Ontario"]
+    assert ix.search_forms() == ["AVENUE SAINT-DENIS", "RUE ONTARIO"]
+    assert ix.search_form("Av. St-Denis") == "AVENUE SAINT-DENIS"
+    assert sorted(ix.variants("AVENUE ST DENIS")) == [
+        "Av. St-Denis",
+        "Avenue Saint Denis",
+        "Avenue Saint-Denis",
+    ]
+
+
+def test_directions_merge_but_stay_apart_from_each_other():
+    ix = sg.StreetIndex(
+        ["Rue Sherbrooke O", "Rue Sherbrooke Ouest", "Rue Sherbrooke E"]
+    )
+    assert ix.names() == ["Rue Sherbrooke E", "Rue Sherbrooke Ouest"]
+
+
+def test_untyped_name_joins_unique_typed_street():
+    ix = sg.StreetIndex(["Saint-Denis", "Rue Saint-Denis"])
+    assert ix.names() == ["Rue Saint-Denis"]
+    assert ix.search_form("Saint-Denis") == "RUE SAINT-DENIS"
+    # ambigu : Rue et Avenue du même nom, le nom seul reste à part
+    ix = sg.StreetIndex(["Saint-Denis", "Rue Saint-Denis", "Avenue Saint-Denis"])
+    assert len(ix.names()) == 3
+
+
+def test_untyped_name_joins_through_articles():
+    ix = sg.StreetIndex(["Gauchetière", "Rue de la Gauchetière"])
+    assert ix.names() == ["Rue de la Gauchetière"]
+
+
+def test_articles_keep_typed_streets_apart():
+    ix = sg.StreetIndex(["Rue Le Royer", "Rue Royer"])
+    assert ix.names() == ["Rue Le Royer", "Rue Royer"]
+    ix = sg.StreetIndex(["Royer", "Rue Le Royer", "Rue Royer"])
+    assert ix.names() == ["Rue Le Royer", "Rue Royer"]  # Royer → Rue Royer
+
+
+def test_unknown_name_searches_as_typed():
+    ix = sg.StreetIndex(["Rue Ontario"])
+    assert ix.search_form(" Rue Inconnue ") == "RUE INCONNUE"
+    assert ix.variants("Rue Inconnue") == []